@@ -14,7 +14,19 @@ setup(
         "dev": [
             "ipdb",
             "pylint",
-        ]
+        ],
+        "async": [
+            "aiohttp",
+        ],
+        "fast-json": [
+            "orjson",
+        ],
+        "streaming": [
+            "ijson",
+        ],
+        "parquet": [
+            "pyarrow",
+        ],
     },
     entry_points="""
           [console_scripts]
@@ -36,6 +36,7 @@ def main():
                 catalog=parsed_args.catalog or discover(),
                 state=state or {},
                 start_date=parsed_args.config["start_date"],
+                config=parsed_args.config,
             )
 
 
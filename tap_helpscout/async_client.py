@@ -0,0 +1,110 @@
+import asyncio
+from typing import Any, Mapping
+
+import backoff
+from singer import get_logger, metrics
+
+from . import exceptions as errors
+from .client import BASE_URL, HelpScoutClient, raise_for_status_code
+
+try:
+    import aiohttp
+
+    CONNECTION_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+except ImportError:  # pragma: no cover
+    aiohttp = None
+    CONNECTION_ERRORS = (asyncio.TimeoutError,)
+
+LOGGER = get_logger()
+
+
+class AsyncHelpScoutClient:
+    """asyncio counterpart of `HelpScoutClient` built on aiohttp.
+
+    Access tokens and the rate limiter are shared with the wrapped
+    `HelpScoutClient`, so requests sent by both clients are authenticated and
+    paced together. The session is bound to the event loop the client is
+    entered in.
+    """
+
+    def __init__(self, client: HelpScoutClient, max_connections: int = 100):
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for async requests, install tap-helpscout[async]")
+        self.client = client
+        self.rate_limiter = client.rate_limiter
+        self.max_connections = max_connections
+        self.__session = None
+
+    async def __aenter__(self):
+        self.__session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections, force_close=not self.client.keep_alive),
+            timeout=aiohttp.ClientTimeout(
+                sock_connect=self.client.connect_timeout, sock_read=self.client.read_timeout
+            ),
+        )
+        return self
+
+    async def __aexit__(self, exception_type, exception_value, traceback):
+        await self.__session.close()
+
+    @backoff.on_exception(
+        wait_gen=backoff.expo,
+        exception=(
+            errors.Http500Error,
+            errors.Http503Error,
+            errors.Http504Error,
+            *CONNECTION_ERRORS,
+        ),
+        max_tries=7,
+        factor=3,
+    )
+    # The wait after a 429 response is applied by the rate limiter from the Retry-After header
+    @backoff.on_exception(wait_gen=backoff.constant, exception=errors.Http429Error, max_tries=7, interval=0)
+    async def request(self, method: str, path: str, url: str = "", **kwargs) -> Mapping[Any, Any]:
+        """Makes an HTTP Request based on given params.
+
+        Args:
+            method (str): Http method
+            path (str): endpoint for Http request
+            url (str): Base url for Http request
+
+        Returns:
+            Returns a json object for a successful http request
+        """
+        if not url and path:
+            url = BASE_URL + path
+
+        endpoint = kwargs.pop("endpoint", None)
+
+        # The token is only refreshed on expiry, blocking the loop for that single request
+        kwargs["headers"] = {**kwargs.get("headers", {}), **self.client.get_auth_headers()}
+
+        if method == "POST":
+            kwargs["headers"]["Content-Type"] = "application/json"
+
+        delay = self.rate_limiter.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        with metrics.http_request_timer(endpoint) as timer:
+            async with self.__session.request(method, url, **kwargs) as response:
+                timer.tags[metrics.Tag.http_status_code] = response.status
+                self.rate_limiter.update(response.headers)
+                if 200 <= response.status < 300:
+                    # 201, 202 and 204 responses may have no body
+                    body = await response.read()
+                    return self.client.codec.loads(body) if body else None
+
+        if response.status == 429:
+            retry_after = self.rate_limiter.pause(response.headers)
+            LOGGER.warning(f"Rate limit reached, retrying {path or url} after {retry_after} seconds")
+
+        raise_for_status_code(response.status)
+
+    async def get(self, path: str, **kwargs):
+        """Initiates HTTP requests for GET method."""
+        return await self.request("GET", path=path, **kwargs)
+
+    async def post(self, path: str, **kwargs):
+        """Initiates HTTP requests for POST method."""
+        return await self.request("POST", path=path, **kwargs)
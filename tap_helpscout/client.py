@@ -1,12 +1,31 @@
 import json
+import threading
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Mapping
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
 
 import backoff
 import requests
+import urllib3
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 
-from singer import metrics
+from singer import get_logger, metrics
 from . import exceptions as errors
+from .helpers import get_bool_config, get_float_config, get_int_config
+from .json_codec import STREAM_DECODE_ERRORS, get_codec, iter_items
+from .rate_limit import RateLimiter
+
+LOGGER = get_logger()
+
+BASE_URL = "https://api.helpscout.net/v2"
+
+# requests waits indefinitely without a timeout, a stalled socket would hang the sync
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 300
+
+# Errors raised while a streamed body is read, the page request is sent again
+STREAM_ERRORS = (requests.RequestException, urllib3.exceptions.HTTPError, OSError, *STREAM_DECODE_ERRORS)
+STREAM_MAX_TRIES = 7
 
 
 def raise_for_error(response: requests.Response) -> None:
@@ -28,6 +47,11 @@ def raise_for_error(response: requests.Response) -> None:
             raise errors.HttpClientException(_) from None
 
 
+def raise_for_status_code(status_code: int) -> None:
+    """Raises the exception associated with an HTTP error status code."""
+    raise getattr(errors, f"Http{status_code}Error", errors.HttpClientException(message="Undefined Exception"))
+
+
 class HelpScoutClient:
     def __init__(self, config_path: str, config: Dict, dev_mode: bool = False):
         self.__config_path = config_path
@@ -39,16 +63,65 @@ class HelpScoutClient:
         self.__dev_mode = dev_mode
         # This is to make sure a new access token gets generated on every extraction
         self.__expires = datetime.now(timezone.utc) - timedelta(seconds=10)
-        self.__session = requests.Session()
         self.__base_url = None
+        self.connect_timeout = get_float_config(config, "connect_timeout", DEFAULT_CONNECT_TIMEOUT)
+        self.read_timeout = get_float_config(config, "read_timeout", DEFAULT_READ_TIMEOUT)
+        self.keep_alive = get_bool_config(config, "keep_alive", True)
+        self.codec = get_codec(config.get("json_codec"))
+        # Every concurrent worker needs its own connection to avoid queueing on the pool
+        workers = get_int_config(config, "stream_workers", 1) * max(
+            get_int_config(config, "page_workers", 1), get_int_config(config, "child_workers", 1)
+        )
+        self.pool_maxsize = get_int_config(config, "pool_maxsize", max(DEFAULT_POOLSIZE, workers))
+        self.__adapter = HTTPAdapter(
+            pool_connections=get_int_config(config, "pool_connections", DEFAULT_POOLSIZE),
+            pool_maxsize=self.pool_maxsize,
+        )
+        self.__session = requests.Session()
+        self.__session.mount("https://", self.__adapter)
+        self.__session.mount("http://", self.__adapter)
+        if not self.keep_alive:
+            self.__session.headers["Connection"] = "close"
+        # Serializes token refreshes when pages are fetched from multiple threads
+        self.__token_lock = threading.Lock()
+        # Shared by every thread using this client so concurrent requests stay under the account limit
+        self.rate_limiter = RateLimiter(get_int_config(config, "rate_limit_per_minute", 0))
 
     def __enter__(self):
         self.get_access_token()
         return self
 
     def __exit__(self, exception_type, exception_value, traceback):
+        self.log_pool_stats()
         self.__session.close()
 
+    def get_pool_stats(self) -> Dict[str, int]:
+        """Returns the number of requests sent and connections opened by the
+        session's connection pools.
+
+        Requests of `AsyncHelpScoutClient` go through its own aiohttp
+        connector and are not counted.
+        """
+        requests_sent = connections_opened = 0
+        for key in self.__adapter.poolmanager.pools.keys():
+            pool = self.__adapter.poolmanager.pools.get(key)
+            if pool is not None:
+                requests_sent += pool.num_requests
+                connections_opened += pool.num_connections
+        return {
+            "requests": requests_sent,
+            "connections_opened": connections_opened,
+            "connections_reused": max(requests_sent - connections_opened, 0),
+        }
+
+    def log_pool_stats(self) -> None:
+        """Logs the connection pool usage of the run."""
+        stats = self.get_pool_stats()
+        LOGGER.info(
+            f"Connection pool usage: {stats['requests']} requests, "
+            f"{stats['connections_opened']} connections opened, {stats['connections_reused']} reused"
+        )
+
     @backoff.on_exception(
         wait_gen=backoff.expo,
         exception=(errors.Http500Error, errors.Http503Error, errors.Http504Error, errors.Http429Error),
@@ -69,12 +142,22 @@ class HelpScoutClient:
         if self.__access_token and self.__expires > datetime.now(timezone.utc):
             return
 
+        with self.__token_lock:
+            # Another thread may have refreshed the token while this one was waiting on the lock
+            if self.__access_token and self.__expires > datetime.now(timezone.utc):
+                return
+            self.__refresh_access_token()
+
+    def __refresh_access_token(self):
+        """Exchanges the refresh token for a new access token and persists both
+        to the config file."""
         headers = {}
         if self.__user_agent:
             headers["User-Agent"] = self.__user_agent
 
         response = self.__session.post(
             url="https://api.helpscout.net/v2/oauth2/token",
+            timeout=(self.connect_timeout, self.read_timeout),
             headers=headers,
             data={
                 "grant_type": "refresh_token",
@@ -105,12 +188,20 @@ class HelpScoutClient:
 
     @backoff.on_exception(
         wait_gen=backoff.expo,
-        exception=(errors.Http500Error, errors.Http503Error, errors.Http504Error, errors.Http429Error),
+        exception=(
+            errors.Http500Error,
+            errors.Http503Error,
+            errors.Http504Error,
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+        ),
         max_tries=7,
         factor=3,
     )
-    def request(self, method: str, path: str, url: str = "", **kwargs) -> Mapping[Any, Any]:
-        """Makes an HTTP Request based on given params.
+    # The wait after a 429 response is applied by the rate limiter from the Retry-After header
+    @backoff.on_exception(wait_gen=backoff.constant, exception=errors.Http429Error, max_tries=7, interval=0)
+    def send(self, method: str, path: str, url: str = "", **kwargs) -> Optional[requests.Response]:
+        """Sends an HTTP Request based on given params.
 
         Args:
             method (str): Http method
@@ -118,12 +209,12 @@ class HelpScoutClient:
             url (str): Base url for Http request
 
         Returns:
-            Returns a json object for a successful http request
+            Returns the response of a successful http request
         """
         self.get_access_token()
 
         if not url and self.__base_url is None:
-            self.__base_url = "https://api.helpscout.net/v2"
+            self.__base_url = BASE_URL
 
         if not url and path:
             url = self.__base_url + path
@@ -144,14 +235,84 @@ class HelpScoutClient:
         if method == "POST":
             kwargs["headers"]["Content-Type"] = "application/json"
 
+        self.rate_limiter.acquire()
         with metrics.http_request_timer(endpoint) as timer:
-            response = self.__session.request(method, url, **kwargs)
+            response = self.__session.request(
+                method, url, timeout=(self.connect_timeout, self.read_timeout), **kwargs
+            )
             timer.tags[metrics.Tag.http_status_code] = response.status_code
+        self.rate_limiter.update(response.headers)
+
+        if 200 <= response.status_code < 300:
+            return response
 
-        if response.status_code == 200:
-            return response.json()
+        if response.status_code == 429:
+            retry_after = self.rate_limiter.pause(response.headers)
+            LOGGER.warning(f"Rate limit reached, retrying {path or url} after {retry_after} seconds")
 
         raise_for_error(response)
+        return None
+
+    def request(self, method: str, path: str, url: str = "", **kwargs) -> Mapping[Any, Any]:
+        """Makes an HTTP Request based on given params.
+
+        Args:
+            method (str): Http method
+            path (str): endpoint for Http request
+            url (str): Base url for Http request
+
+        Returns:
+            Returns a json object for a successful http request
+        """
+        response = self.send(method, path, url, **kwargs)
+        # 201, 202 and 204 responses may have no body
+        if response is not None and response.content:
+            return self.codec.decode_response(response)
+        return None
+
+    def stream_items(self, path: str, items_prefix: str, **kwargs) -> Iterator[Tuple[str, Any]]:
+        """Sends a GET request and parses the response body as it is
+        received.
+
+        Yields ("item", record) for each element found at `items_prefix` and
+        ("page", document) once the body is consumed, where the document holds
+        every other part of the response. A body cut short is requested again
+        with backoff, the items already yielded from it are skipped so none of
+        them is yielded twice.
+        """
+        yielded = 0
+        for attempt in range(1, STREAM_MAX_TRIES + 1):
+            response = self.send("GET", path, stream=True, **kwargs)
+            if response is None:
+                return
+            # Items yielded from an earlier attempt at the body
+            to_skip = yielded
+            try:
+                with response:
+                    response.raw.decode_content = True
+                    for kind, value in iter_items(response.raw, items_prefix):
+                        if kind == "item":
+                            if to_skip > 0:
+                                to_skip -= 1
+                                continue
+                            yielded += 1
+                        yield kind, value
+                return
+            except STREAM_ERRORS as err:
+                if attempt == STREAM_MAX_TRIES:
+                    raise
+                wait = backoff.full_jitter(3 * 2 ** (attempt - 1))
+                LOGGER.warning(f"Reading {path} failed after {yielded} items ({err}), retrying in {wait:.1f} seconds")
+                time.sleep(wait)
+
+    def get_auth_headers(self) -> Dict:
+        """Returns the authorization and user agent headers of an API request,
+        refreshing the access token when it has expired."""
+        self.get_access_token()
+        headers = {"Authorization": f"Bearer {self.__access_token}"}
+        if self.__user_agent:
+            headers["User-Agent"] = self.__user_agent
+        return headers
 
     def get(self, path: str, **kwargs):
         """Initiates HTTP requests for GET method."""
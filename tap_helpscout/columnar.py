@@ -0,0 +1,142 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from singer.utils import strptime_to_utc
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+PARQUET_COMPRESSIONS = ("gzip", "none", "snappy", "zstd")
+
+# Converts a transformed record value to the value of its arrow type
+Converter = Callable[[Any], Any]
+
+
+def parse_datetime(value: str) -> datetime:
+    # Transformed timestamps are written as YYYY-MM-DDTHH:MM:SS.ffffffZ
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return strptime_to_utc(value)
+
+
+def to_json(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def get_json_string_type() -> Tuple["pyarrow.DataType", Converter]:
+    return pyarrow.string(), to_json
+
+
+# Arrow types and converters of the scalar JSON types, date-time strings are timestamps,
+# built on use as pyarrow is optional
+SCALAR_TYPES = {
+    "date-time": lambda: (pyarrow.timestamp("us", tz="UTC"), parse_datetime),
+    "string": lambda: (pyarrow.string(), None),
+    "integer": lambda: (pyarrow.int64(), None),
+    "number": lambda: (pyarrow.float64(), None),
+    "boolean": lambda: (pyarrow.bool_(), None),
+}
+
+
+def get_arrow_type(schema: Dict) -> Tuple["pyarrow.DataType", Optional[Converter]]:
+    """Returns the arrow type of a JSON schema node and the converter its
+    values need, None when they are stored as they are.
+
+    Objects map to structs and arrays to lists. Nodes without a single
+    non-null type, and objects without properties, are stored as JSON
+    strings.
+    """
+    if "anyOf" in schema:
+        subschemas = [subschema for subschema in schema["anyOf"] if subschema.get("type") not in ("null", ["null"])]
+        if len(subschemas) == 1:
+            return get_arrow_type(subschemas[0])
+        return get_json_string_type()
+    if "type" not in schema:
+        return get_json_string_type()
+    types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+    types = [typ for typ in types if typ != "null"]
+    if not types:
+        return pyarrow.null(), None
+    if len(types) > 1:
+        return get_json_string_type()
+    typ = types[0]
+    if typ == "object" and schema.get("properties"):
+        return get_struct_type(schema["properties"])
+    if typ == "array":
+        item_type, item_converter = get_arrow_type(schema.get("items", {}))
+        if item_converter is None:
+            return pyarrow.list_(item_type), None
+        return pyarrow.list_(item_type), lambda value: [None if row is None else item_converter(row) for row in value]
+    if typ == "string" and schema.get("format") == "date-time":
+        typ = "date-time"
+    return SCALAR_TYPES.get(typ, get_json_string_type)()
+
+
+def get_struct_type(properties: Dict) -> Tuple["pyarrow.DataType", Optional[Converter]]:
+    fields, converters = [], {}
+    for key, subschema in properties.items():
+        arrow_type, converter = get_arrow_type(subschema)
+        fields.append(pyarrow.field(key, arrow_type))
+        if converter:
+            converters[key] = converter
+    if not converters:
+        return pyarrow.struct(fields), None
+
+    def convert_object(value: Dict) -> Dict:
+        return {
+            key: row if row is None or key not in converters else converters[key](row)
+            for key, row in value.items()
+        }
+
+    return pyarrow.struct(fields), convert_object
+
+
+class ColumnLayout:
+    """The arrow schema of a stream and the converter of each column,
+    derived once from the stream's JSON schema."""
+
+    def __init__(self, schema: Dict) -> None:
+        if pyarrow is None:
+            raise ImportError("pyarrow is required for batch_format parquet, install tap-helpscout[parquet]")
+        fields = []
+        self.columns: List[Tuple[str, Optional[Converter]]] = []
+        for key, subschema in schema.get("properties", {}).items():
+            arrow_type, converter = get_arrow_type(subschema)
+            fields.append(pyarrow.field(key, arrow_type))
+            self.columns.append((key, converter))
+        self.schema = pyarrow.schema(fields)
+
+
+class ParquetBatch:
+    """A batch accumulating the records of a stream column by column,
+    written as a Parquet file when it is closed."""
+
+    def __init__(self, path: Path, compression: str, layout: ColumnLayout) -> None:
+        self.path = path
+        self.compression = compression
+        self.layout = layout
+        self.values: List[List] = [[] for _ in layout.columns]
+        self.rows = 0
+        # Known once the batch is written, Parquet batches rotate on rows only
+        self.bytes = 0
+
+    def write(self, record: Dict) -> None:
+        for values, (key, converter) in zip(self.values, self.layout.columns):
+            value = record.get(key)
+            values.append(value if value is None or converter is None else converter(value))
+        self.rows += 1
+
+    def close(self) -> None:
+        table = pyarrow.Table.from_arrays(
+            [pyarrow.array(values, type=field.type) for values, field in zip(self.values, self.layout.schema)],
+            schema=self.layout.schema,
+        )
+        pyarrow.parquet.write_table(table, self.path, compression=self.compression)
+        self.bytes = table.nbytes
+        self.values = []
@@ -0,0 +1,78 @@
+import sqlite3
+import threading
+
+import singer
+
+logger = singer.get_logger()
+
+
+class FingerprintStore:
+    """Persists a fingerprint of each parent record's child records in a
+    SQLite file, to skip the child syncs of parents whose fingerprint did not
+    change.
+
+    A changed fingerprint is staged by `changed` and only replaces the stored
+    one when `commit` is called after the parent's child records were
+    written, so the child records of an interrupted sync are requested again.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints (parent_id PRIMARY KEY, fingerprint TEXT, staged TEXT)"
+        )
+        self.connection.commit()
+        self.checked = self.unchanged = self.committed = 0
+
+    def __enter__(self) -> "FingerprintStore":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def changed(self, parent_id, fingerprint: str) -> bool:
+        """Returns whether the fingerprint of a parent differs from the stored
+        one, and stages it when it does."""
+        with self._lock:
+            self.checked += 1
+            row = self.connection.execute(
+                "SELECT fingerprint FROM fingerprints WHERE parent_id = ?", (parent_id,)
+            ).fetchone()
+            if row and row[0] == fingerprint:
+                self.unchanged += 1
+                return False
+            self.connection.execute("INSERT OR IGNORE INTO fingerprints (parent_id) VALUES (?)", (parent_id,))
+            self.connection.execute(
+                "UPDATE fingerprints SET staged = ? WHERE parent_id = ?", (fingerprint, parent_id)
+            )
+            self.connection.commit()
+            return True
+
+    def commit(self, parent_id) -> None:
+        """Stores the staged fingerprint of a parent whose child records were
+        written."""
+        with self._lock:
+            cursor = self.connection.execute(
+                "UPDATE fingerprints SET fingerprint = staged, staged = NULL"
+                " WHERE parent_id = ? AND staged IS NOT NULL",
+                (parent_id,),
+            )
+            self.connection.commit()
+            self.committed += cursor.rowcount
+
+    def close(self) -> None:
+        """Closes the SQLite connection."""
+        self.connection.close()
+
+    def log_stats(self) -> None:
+        """Logs the parents checked against the store, the child syncs skipped
+        for unchanged ones, each saving at least the request of its first
+        page, and the fingerprints stored."""
+        logger.info(
+            f"Fingerprints {self.path}: checked={self.checked}, unchanged={self.unchanged}, "
+            f"requests_saved={self.unchanged}, committed={self.committed}"
+        )
@@ -1,5 +1,7 @@
 import os
+import re
 from datetime import datetime
+from typing import Dict
 
 
 def get_abs_path(path: str):
@@ -7,17 +9,75 @@ def get_abs_path(path: str):
     return os.path.join(os.path.dirname(os.path.realpath(__file__)), path)
 
 
+def get_int_config(config: Dict, key: str, default: int) -> int:
+    """Returns an integer config value, config values may be passed as strings."""
+    value = (config or {}).get(key)
+    if value in (None, ""):
+        return default
+    return int(value)
+
+
+def get_float_config(config: Dict, key: str, default: float) -> float:
+    """Returns a numeric config value, config values may be passed as strings."""
+    value = (config or {}).get(key)
+    if value in (None, ""):
+        return default
+    return float(value)
+
+
+def get_str_config(config: Dict, key: str, default: str = None) -> str:
+    """Returns a string config value, an empty string counts as unset."""
+    value = (config or {}).get(key)
+    if value in (None, ""):
+        return default
+    return value
+
+
+def get_bool_config(config: Dict, key: str, default: bool = False) -> bool:
+    """Returns a boolean config value, config values may be passed as strings."""
+    value = (config or {}).get(key)
+    if value in (None, ""):
+        return default
+    if isinstance(value, str):
+        return value.lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+# Formats accepted by parse_date, all are UTC
+DATE_FORMATS = (
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%Y-%m-%dT%H:%M:%S+00:00",
+    "%Y-%m-%dT%H:%M:%S.%f+00:00",
+    "%Y-%m-%d",
+)
+
+# Zero padded layouts of DATE_FORMATS, parsed without strptime
+ISO_8601 = re.compile(r"(\d{4})-(\d{2})-(\d{2})(?:T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?(?:Z|\+00:00))?")
+
+
 def parse_date(date_value):
     """Pass in string-formatted-datetime, parse the value, and return it as an
-    un-formatted datetime object."""
-    date_formats = {
-        "%Y-%m-%dT%H:%M:%S.%fZ",
-        "%Y-%m-%dT%H:%M:%SZ",
-        "%Y-%m-%dT%H:%M:%S.%f+00:00",
-        "%Y-%m-%dT%H:%M:%S+00:00",
-        "%Y-%m-%d",
-    }
-    for date_format in date_formats:
+    un-formatted datetime object.
+
+    The result is a naive datetime in UTC, so values of any of the
+    `DATE_FORMATS` compare correctly. Record values are nearly all distinct,
+    callers parse a bookmark once and keep the result rather than caching.
+    """
+    match = ISO_8601.fullmatch(date_value)
+    if match:
+        year, month, day, hour, minute, second, fraction = match.groups()
+        try:
+            if hour is None:
+                return datetime(int(year), int(month), int(day))
+            return datetime(
+                int(year), int(month), int(day), int(hour), int(minute), int(second),
+                int(fraction.ljust(6, "0")) if fraction else 0,
+            )
+        except ValueError:
+            return None
+    # Values strptime accepts without zero padding
+    for date_format in DATE_FORMATS:
         try:
             return datetime.strptime(date_value, date_format)
         except ValueError:
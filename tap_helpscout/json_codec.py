@@ -0,0 +1,128 @@
+import json
+import sys
+from decimal import Decimal
+from typing import Any, BinaryIO, Dict, Iterator, Tuple
+
+import singer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ijson
+
+    # Raised on a body cut short or corrupted while it is parsed
+    STREAM_DECODE_ERRORS = (ijson.JSONError,)
+except ImportError:  # pragma: no cover
+    ijson = None
+    STREAM_DECODE_ERRORS = ()
+
+
+class JsonCodec:
+    """Standard library JSON backend, records are written through singer."""
+
+    name = "json"
+
+    def loads(self, data: bytes) -> Any:
+        """Decodes a JSON document."""
+        return json.loads(data)
+
+    def decode_response(self, response) -> Any:
+        """Decodes the JSON body of a `requests` response."""
+        return response.json()
+
+    def dumps(self, value: Any) -> bytes:
+        """Serializes a JSON document."""
+        return json.dumps(value, default=_default).encode()
+
+    def dump_record(self, stream: str, record: Dict) -> bytes:
+        """Serializes a singer RECORD message terminated by a newline."""
+        return (singer.format_message(singer.RecordMessage(stream=stream, record=record)) + "\n").encode()
+
+    def write_record(self, stream: str, record: Dict) -> None:
+        """Writes a singer RECORD message to stdout."""
+        singer.write_record(stream, record)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+class OrjsonCodec(JsonCodec):
+    """orjson backend, decodes raw response bytes and serializes RECORD
+    messages straight to bytes on stdout."""
+
+    name = "orjson"
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+    def decode_response(self, response) -> Any:
+        return orjson.loads(response.content)
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=_default)
+
+    def dump_record(self, stream: str, record: Dict) -> bytes:
+        return orjson.dumps(
+            {"type": "RECORD", "stream": stream, "record": record},
+            default=_default,
+            option=orjson.OPT_APPEND_NEWLINE,
+        )
+
+    def write_record(self, stream: str, record: Dict) -> None:
+        # singer messages are flushed after each write, so the text layer holds no pending output
+        sys.stdout.buffer.write(self.dump_record(stream, record))
+        sys.stdout.buffer.flush()
+
+
+CODECS = {JsonCodec.name: JsonCodec(), OrjsonCodec.name: OrjsonCodec() if orjson else None}
+
+
+def get_codec(name: str = None) -> JsonCodec:
+    """Returns the JSON codec for a `json_codec` config value.
+
+    `auto` selects orjson when it is installed and falls back to the
+    standard library, which is also the default.
+    """
+    name = name or JsonCodec.name
+    if name == "auto":
+        name = OrjsonCodec.name if orjson else JsonCodec.name
+    if name not in CODECS:
+        raise ValueError(f"Unsupported json_codec {name}, expected one of auto, {', '.join(CODECS)}")
+    if CODECS[name] is None:
+        raise ImportError(f"{name} is required for json_codec {name}, install tap-helpscout[fast-json]")
+    return CODECS[name]
+
+
+def iter_items(stream: BinaryIO, items_prefix: str) -> Iterator[Tuple[str, Any]]:
+    """Incrementally parses a JSON document from a byte stream.
+
+    Yields ("item", value) for each element of the array at `items_prefix`
+    as soon as it is parsed, e.g. `_embedded.conversations.item`, then
+    ("page", document) with the rest of the document, in which that array
+    is left empty. Only one element is held in memory at a time.
+    """
+    if ijson is None:
+        raise ImportError("ijson is required for stream_pages, install tap-helpscout[streaming]")
+    document = ijson.ObjectBuilder()
+    item = None
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if item is not None:
+            item.event(event, value)
+            if prefix == items_prefix and event in ("end_map", "end_array"):
+                yield "item", item.value
+                item = None
+        elif prefix == items_prefix:
+            if event in ("start_map", "start_array"):
+                item = ijson.ObjectBuilder()
+                item.event(event, value)
+            else:
+                yield "item", value
+        else:
+            document.event(event, value)
+    yield "page", document.value
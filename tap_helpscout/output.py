@@ -0,0 +1,413 @@
+import gzip
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple, Union
+
+import singer
+from singer.bookmarks import ensure_bookmark_path
+
+from tap_helpscout.columnar import PARQUET_COMPRESSIONS, ColumnLayout, ParquetBatch
+from tap_helpscout.helpers import get_float_config, get_int_config
+from tap_helpscout.json_codec import JsonCodec, get_codec
+
+LOGGER = singer.get_logger()
+
+# Seconds buffered messages may wait before they are written
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+DEFAULT_BATCH_DIR = "batches"
+DEFAULT_BATCH_MAX_ROWS = 100000
+DEFAULT_BATCH_MAX_BYTES = 256 * 1024 * 1024
+BATCH_COMPRESSIONS = {"jsonl": ("gzip", "none"), "parquet": PARQUET_COMPRESSIONS}
+
+
+class MessageWriter:
+    """Writes the singer messages of a sync to stdout.
+
+    With `buffer_bytes`, serialized RECORD messages are buffered and written
+    together once the buffer holds that many bytes or its oldest message is
+    `flush_interval` seconds old. The buffer is always written before a
+    SCHEMA or STATE message, so a bookmark never reaches the target ahead of
+    its records. Without it every message is written and flushed on its own,
+    as `singer.write_record` does.
+    """
+
+    def __init__(self, codec: JsonCodec = None, buffer_bytes: int = 0,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL) -> None:
+        self.codec = codec or get_codec()
+        self.buffer_bytes = buffer_bytes
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._buffer: List[bytes] = []
+        self._buffered_bytes = 0
+        self._buffered_at = None
+        self._flusher = None
+        self._closed = threading.Event()
+        self.records_written = 0
+        # Unbuffered records are written by the codec and are not counted, the bytes are only
+        # logged when every message written is counted
+        self.bytes_written = 0
+        self.counts_all_bytes = bool(buffer_bytes)
+        self.seconds_blocked = 0.0
+
+    def write_record(self, stream: str, record: Dict) -> None:
+        """Writes or buffers a RECORD message."""
+        if not self.buffer_bytes:
+            with self._lock:
+                start = time.perf_counter()
+                self.codec.write_record(stream, record)
+                self.seconds_blocked += time.perf_counter() - start
+                self.records_written += 1
+            return
+        data = self.codec.dump_record(stream, record)
+        with self._lock:
+            self.records_written += 1
+            self._buffer.append(data)
+            self._buffered_bytes += len(data)
+            if self._buffered_at is None:
+                self._buffered_at = time.monotonic()
+                self._start_flusher()
+            if self._buffered_bytes >= self.buffer_bytes:
+                self.flush()
+
+    def write_schema(self, stream: str, schema: Dict, key_properties, bookmark_properties=None) -> None:
+        """Writes a SCHEMA message after the buffered records."""
+        with self._lock:
+            self.flush()
+            self._write_message(singer.SchemaMessage(
+                stream=stream, schema=schema, key_properties=key_properties, bookmark_properties=bookmark_properties
+            ))
+
+    def write_state(self, state: Dict) -> None:
+        """Writes a STATE message after the buffered records."""
+        with self._lock:
+            self.flush()
+            self._write_message(singer.StateMessage(value=state))
+
+    def end_stream(self, stream: str) -> None:
+        """Called once a stream's sync has written all its records, which
+        are not held per stream."""
+
+    def flush(self) -> None:
+        """Writes the buffered RECORD messages to stdout."""
+        with self._lock:
+            if not self._buffer:
+                return
+            data = b"".join(self._buffer)
+            self._buffer.clear()
+            self._buffered_bytes = 0
+            self._buffered_at = None
+            self._write_bytes(data)
+
+    def close(self) -> None:
+        """Writes the buffered messages and stops the background flusher."""
+        self._closed.set()
+        self.flush()
+        if self._flusher:
+            self._flusher.join()
+            self._flusher = None
+
+    def log_stats(self) -> None:
+        """Logs the messages written to stdout, their bytes when every one of
+        them is counted, and the time spent blocked on it."""
+        bytes_written = f"{self.bytes_written} bytes written, " if self.counts_all_bytes else ""
+        LOGGER.info(
+            f"Output: {self.records_written} records, {bytes_written}{self.seconds_blocked:.3f}s blocked on stdout"
+        )
+
+    def _write_message(self, message) -> None:
+        self._write_bytes((singer.format_message(message) + "\n").encode())
+
+    def _write_bytes(self, data: bytes) -> None:
+        # Singer messages written by other code are flushed, the text layer holds no pending output
+        start = time.perf_counter()
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+        self.seconds_blocked += time.perf_counter() - start
+        self.bytes_written += len(data)
+
+    def _start_flusher(self) -> None:
+        # Buffered records are written on time even while the sync waits on the API
+        if self._flusher is None and not self._closed.is_set():
+            self._flusher = threading.Thread(target=self._flush_periodically, name="message-writer", daemon=True)
+            self._flusher.start()
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self.flush_interval / 2):
+            with self._lock:
+                if self._buffered_at is not None and time.monotonic() - self._buffered_at >= self.flush_interval:
+                    self.flush()
+
+
+class JsonlBatch:
+    """A JSONL batch file being written for a stream."""
+
+    def __init__(self, path: Path, compression: str, codec: JsonCodec) -> None:
+        self.path = path
+        self.codec = codec
+        self.file = gzip.open(path, "wb") if compression == "gzip" else open(path, "wb")
+        self.rows = 0
+        self.bytes = 0
+
+    def write(self, record: Dict) -> None:
+        data = self.codec.dumps(record) + b"\n"
+        self.file.write(data)
+        self.rows += 1
+        self.bytes += len(data)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class BatchWriter(MessageWriter):
+    """Writes the records of each stream to rotating JSONL or Parquet batch
+    files and emits a singer BATCH message for each finalized file.
+
+    A batch is finalized once it holds `max_rows` records or, for JSONL,
+    `max_bytes` uncompressed bytes, when its stream's sync ends and when the
+    writer is closed. Parquet
+    batches hold their records in columns typed after the stream's SCHEMA
+    message, so records are never serialized to JSON. A STATE message is
+    held back until every batch open when it was written is finalized, so
+    a bookmark never reaches the target ahead of the records it covers.
+    """
+
+    def __init__(self, codec: JsonCodec = None, batch_dir: str = DEFAULT_BATCH_DIR,
+                 max_rows: int = DEFAULT_BATCH_MAX_ROWS, max_bytes: int = DEFAULT_BATCH_MAX_BYTES,
+                 compression: str = "gzip", batch_format: str = "jsonl") -> None:
+        super().__init__(codec)
+        if batch_format not in BATCH_COMPRESSIONS:
+            raise ValueError(
+                f"Unsupported batch_format {batch_format}, expected one of {', '.join(BATCH_COMPRESSIONS)}"
+            )
+        if compression not in BATCH_COMPRESSIONS[batch_format]:
+            raise ValueError(
+                f"Unsupported batch_compression {compression} for {batch_format}, "
+                f"expected one of {', '.join(BATCH_COMPRESSIONS[batch_format])}"
+            )
+        self.batch_dir = Path(batch_dir)
+        self.batch_dir.mkdir(parents=True, exist_ok=True)
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.batch_format = batch_format
+        self._layouts: Dict[str, ColumnLayout] = {}
+        self._run_id = time.strftime("%Y%m%dT%H%M%S")
+        self._sequence = 0
+        self._batches: Dict[str, Union[JsonlBatch, ParquetBatch]] = {}
+        # STATE messages waiting on the batches open when they were written, oldest first
+        self._pending_states: List[Tuple[bytes, Set[Path]]] = []
+        # Records go to the batch files, every message written to stdout is counted
+        self.counts_all_bytes = True
+        self.batches_written = 0
+        self.batch_bytes = 0
+
+    def write_record(self, stream: str, record: Dict) -> None:
+        with self._lock:
+            batch = self._batches.get(stream)
+            if batch is None:
+                batch = self._batches[stream] = self._open_batch(stream)
+            batch.write(record)
+            self.records_written += 1
+            if batch.rows >= self.max_rows or batch.bytes >= self.max_bytes:
+                self._finalize(stream)
+
+    def write_schema(self, stream: str, schema: Dict, key_properties, bookmark_properties=None) -> None:
+        if self.batch_format == "parquet":
+            with self._lock:
+                self._layouts[stream] = ColumnLayout(schema)
+        super().write_schema(stream, schema, key_properties, bookmark_properties)
+
+    def write_state(self, state: Dict) -> None:
+        message = (singer.format_message(singer.StateMessage(value=state)) + "\n").encode()
+        with self._lock:
+            open_paths = {batch.path for batch in self._batches.values()}
+            if not open_paths:
+                self._write_bytes(message)
+            elif self._pending_states and self._pending_states[-1][1] == open_paths:
+                # A later state waiting on the same batches supersedes the earlier one
+                self._pending_states[-1] = (message, open_paths)
+            else:
+                self._pending_states.append((message, open_paths))
+
+    def end_stream(self, stream: str) -> None:
+        """Finalizes the open batch of a stream whose sync ended, so the
+        states waiting on it are written before the writer is closed."""
+        with self._lock:
+            if stream in self._batches:
+                self._finalize(stream)
+
+    def close(self) -> None:
+        with self._lock:
+            for stream in list(self._batches):
+                self._finalize(stream)
+        super().close()
+
+    def log_stats(self) -> None:
+        super().log_stats()
+        LOGGER.info(
+            f"Batches: {self.batches_written} {self.batch_format} files, {self.batch_bytes} uncompressed bytes"
+        )
+
+    def _open_batch(self, stream: str) -> Union[JsonlBatch, ParquetBatch]:
+        self._sequence += 1
+        name = f"{stream}-{self._run_id}-{self._sequence:06d}"
+        if self.batch_format == "parquet":
+            return ParquetBatch(self.batch_dir / f"{name}.parquet", self.compression, self._layouts[stream])
+        suffix = ".jsonl.gz" if self.compression == "gzip" else ".jsonl"
+        return JsonlBatch(self.batch_dir / f"{name}{suffix}", self.compression, self.codec)
+
+    def _finalize(self, stream: str) -> None:
+        batch = self._batches.pop(stream)
+        batch.close()
+        message = {
+            "type": "BATCH",
+            "stream": stream,
+            "encoding": {"format": self.batch_format, "compression": self.compression},
+            "manifest": [batch.path.resolve().as_uri()],
+        }
+        self._write_bytes(self.codec.dumps(message) + b"\n")
+        self.batches_written += 1
+        self.batch_bytes += batch.bytes
+        # Write the newest state whose batches are all finalized, older ones are superseded
+        ready = None
+        for index, (_, paths) in enumerate(self._pending_states):
+            paths.discard(batch.path)
+            if not paths:
+                ready = index
+        if ready is not None:
+            self._write_bytes(self._pending_states[ready][0])
+            del self._pending_states[:ready + 1]
+
+
+class StateManager:
+    """Coalesces the bookmark updates of a sync into fewer STATE messages.
+
+    `update` writes the state at most every `interval_seconds` seconds or
+    `interval_records` records written, whichever comes first, and keeps it
+    pending otherwise. `write` is used at stream boundaries and writes the
+    state along with any pending update. With neither interval set every
+    update is written. Bookmarks only move after their records are written
+    and the writer never writes a STATE message ahead of the records before
+    it, so a pending state is always safe to write.
+
+    Streams synced in parallel share one state, which is only changed and
+    serialized under the manager's lock.
+    """
+
+    def __init__(self, writer: MessageWriter, interval_seconds: float = 0.0, interval_records: int = 0) -> None:
+        self.writer = writer
+        self.interval_seconds = interval_seconds
+        self.interval_records = interval_records
+        self._lock = threading.RLock()
+        self._pending = None
+        self._written_at = time.monotonic()
+        self._records_at = writer.records_written
+        self.updates = 0
+        self.states_written = 0
+
+    def update(self, state: Dict) -> None:
+        """Writes the updated state once an interval has passed since the
+        last STATE message."""
+        with self._lock:
+            self.updates += 1
+            self._pending = state
+            if self._is_due():
+                self._write()
+
+    def write_bookmark(self, state: Dict, tap_stream_id: str, value, partition: str = None) -> None:
+        """Sets the bookmark of a stream, or of one of its partitions under
+        `partition_bookmarks`, and updates the state."""
+        with self._lock:
+            if partition is None:
+                state = ensure_bookmark_path(state, ["bookmarks", tap_stream_id])
+                state["bookmarks"][tap_stream_id] = value
+            else:
+                state = ensure_bookmark_path(state, ["partition_bookmarks", tap_stream_id, partition])
+                state["partition_bookmarks"][tap_stream_id][partition] = value
+            self.update(state)
+
+    def write_checkpoint(self, state: Dict, name: str, tap_stream_id: str, value) -> None:
+        """Sets or, with a `None` value, removes the checkpoint of a stream
+        under `name` and updates the state."""
+        with self._lock:
+            checkpoints = state.setdefault(name, {})
+            if value is None:
+                checkpoints.pop(tap_stream_id, None)
+            else:
+                checkpoints[tap_stream_id] = value
+            if not checkpoints:
+                state.pop(name)
+            self.update(state)
+
+    def set_stream_syncing(self, state: Dict, tap_stream_id: str, syncing: bool) -> None:
+        """Adds or removes a stream from the streams synced in parallel,
+        listed in `currently_syncing_streams`, and writes the state."""
+        with self._lock:
+            streams = set(state.get("currently_syncing_streams", []))
+            if syncing:
+                streams.add(tap_stream_id)
+            else:
+                streams.discard(tap_stream_id)
+            if streams:
+                state["currently_syncing_streams"] = sorted(streams)
+            else:
+                state.pop("currently_syncing_streams", None)
+            self.write(state)
+
+    def write(self, state: Dict) -> None:
+        """Writes the state now."""
+        with self._lock:
+            self._pending = state
+            self._write()
+
+    def flush(self) -> None:
+        """Writes the pending state, if any."""
+        with self._lock:
+            if self._pending is not None:
+                self._write()
+
+    def log_stats(self) -> None:
+        """Logs the bookmark updates and the STATE messages written for
+        them."""
+        LOGGER.info(f"State: {self.updates} bookmark updates, {self.states_written} STATE messages written")
+
+    def _is_due(self) -> bool:
+        if not self.interval_seconds and not self.interval_records:
+            return True
+        if self.interval_seconds and time.monotonic() - self._written_at >= self.interval_seconds:
+            return True
+        return bool(self.interval_records) and self.writer.records_written - self._records_at >= self.interval_records
+
+    def _write(self) -> None:
+        self.writer.write_state(self._pending)
+        self._pending = None
+        self._written_at = time.monotonic()
+        self._records_at = self.writer.records_written
+        self.states_written += 1
+
+
+def get_writer(config: Dict) -> MessageWriter:
+    """Returns the message writer for the `output_mode` config value,
+    `records` (default) or `batch`."""
+    config = config or {}
+    codec = get_codec(config.get("json_codec"))
+    output_mode = config.get("output_mode") or "records"
+    if output_mode == "batch":
+        return BatchWriter(
+            codec,
+            config.get("batch_dir") or DEFAULT_BATCH_DIR,
+            get_int_config(config, "batch_max_rows", DEFAULT_BATCH_MAX_ROWS),
+            get_int_config(config, "batch_max_bytes", DEFAULT_BATCH_MAX_BYTES),
+            config.get("batch_compression") or "gzip",
+            config.get("batch_format") or "jsonl",
+        )
+    if output_mode != "records":
+        raise ValueError(f"Unsupported output_mode {output_mode}, expected one of records, batch")
+    return MessageWriter(
+        codec,
+        get_int_config(config, "output_buffer_bytes", 0),
+        get_float_config(config, "output_flush_interval", DEFAULT_FLUSH_INTERVAL),
+    )
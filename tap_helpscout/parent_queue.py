@@ -0,0 +1,100 @@
+import sqlite3
+import threading
+from typing import Iterator, List
+
+import singer
+
+logger = singer.get_logger()
+
+# Pending parent ids read from the queue at a time
+READ_SIZE = 1000
+
+
+class ParentQueue:
+    """Persists the parent ids child streams are synced from in a SQLite file.
+
+    Each id written by `put` is pending for every child stream of the queue
+    until `complete` marks it synced for one of them, so a child sync that was
+    interrupted resumes with the parents it had not synced yet. Commits are
+    made for each change, the file is kept in WAL mode so they do not wait on
+    the disk.
+    """
+
+    def __init__(self, path: str, streams: List[str]) -> None:
+        self.path = path
+        self.streams = streams
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS parent_ids"
+            " (stream TEXT NOT NULL, parent_id NOT NULL, done INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (stream, parent_id))"
+        )
+        self.connection.commit()
+        self.added = self.completed = 0
+
+    def __enter__(self) -> "ParentQueue":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def put(self, parent_id) -> None:
+        """Adds a parent id pending for every child stream, a parent synced
+        before is pending again."""
+        with self._lock:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO parent_ids (stream, parent_id, done) VALUES (?, ?, 0)",
+                [(stream, parent_id) for stream in self.streams],
+            )
+            self.connection.commit()
+            self.added += 1
+
+    def pending(self, stream: str) -> Iterator:
+        """Yields the parent ids pending for a child stream in the order they
+        were added, reading `READ_SIZE` of them at a time."""
+        last_row = 0
+        while True:
+            with self._lock:
+                rows = self.connection.execute(
+                    "SELECT rowid, parent_id FROM parent_ids WHERE stream = ? AND done = 0 AND rowid > ?"
+                    " ORDER BY rowid LIMIT ?",
+                    (stream, last_row, READ_SIZE),
+                ).fetchall()
+            if not rows:
+                return
+            for last_row, parent_id in rows:
+                yield parent_id
+
+    def complete(self, stream: str, parent_id) -> None:
+        """Marks a parent id as synced for a child stream."""
+        with self._lock:
+            self.connection.execute(
+                "UPDATE parent_ids SET done = 1 WHERE stream = ? AND parent_id = ?", (stream, parent_id)
+            )
+            self.connection.commit()
+            self.completed += 1
+
+    def count(self, stream: str, done: bool = False) -> int:
+        """Returns the number of pending, or synced, parent ids of a child
+        stream."""
+        with self._lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM parent_ids WHERE stream = ? AND done = ?", (stream, int(done))
+            ).fetchone()[0]
+
+    def clear(self, stream: str) -> None:
+        """Removes the parent ids of a child stream."""
+        with self._lock:
+            self.connection.execute("DELETE FROM parent_ids WHERE stream = ?", (stream,))
+            self.connection.commit()
+
+    def close(self) -> None:
+        """Closes the SQLite connection."""
+        self.connection.close()
+
+    def log_stats(self) -> None:
+        """Logs the parent ids added to and completed in the queue."""
+        logger.info(f"Parent queue {self.path}: added={self.added}, completed={self.completed}")
@@ -0,0 +1,277 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    TypeVar,
+    Union,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_DONE = object()
+
+
+class StageTimings:
+    """Accumulates the time spent in each stage of a stream's record
+    pipeline.
+
+    `fetch` is the time spent on HTTP requests, `wait` the time the consumer
+    was blocked waiting for the next page fetched on a background thread, `transform` the time spent
+    transforming records and `write` the time spent writing messages.
+    """
+
+    STAGES = ("fetch", "wait", "transform", "write")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.seconds = dict.fromkeys(self.STAGES, 0.0)
+
+    @contextmanager
+    def time(self, stage: str):
+        """Adds the time spent in the context to the given stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.seconds[stage] += elapsed
+
+    def iterate(self, items: Iterator[T], stage: str) -> Iterator[T]:
+        """Yields the items of an iterator, adding the time spent waiting on
+        each of them to the given stage."""
+        try:
+            while True:
+                with self.time(stage):
+                    item = next(items, _DONE)
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            close = getattr(items, "close", None)
+            if close:
+                close()
+
+    def log(self, logger, tap_stream_id: str) -> None:
+        """Logs the accumulated stage timings of a stream."""
+        timings = ", ".join(f"{stage}={self.seconds[stage]:.3f}s" for stage in self.STAGES)
+        logger.info(f"Pipeline timings for {tap_stream_id}: {timings}")
+
+
+def ordered_map(func: Callable[[T], R], items: Iterable[T], workers: int) -> Iterator[R]:
+    """Applies `func` to each item on a thread pool and yields the results in
+    the order of `items`.
+
+    At most `workers` results are pending or held in memory at any time, a
+    new item is only submitted once the oldest pending result is consumed.
+    """
+    pending = deque()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ordered-map")
+    try:
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+async def async_ordered_map(func: Callable[[T], Awaitable[R]], items: Union[Iterable[T], AsyncIterable[T]],
+                            workers: int) -> AsyncIterator[R]:
+    """Runs `func` on each item as concurrent tasks and yields the results in
+    the order of `items`, with at most `workers` tasks pending at any time."""
+    if not isinstance(items, AsyncIterable):
+        items = _iterate(items)
+    pending = deque()
+    try:
+        async for item in items:
+            pending.append(asyncio.ensure_future(func(item)))
+            if len(pending) >= workers:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def _iterate(items: Iterable[T]) -> AsyncIterator[T]:
+    for item in items:
+        yield item
+
+
+async def iterate_in_executor(items: Iterable[T]) -> AsyncIterator[T]:
+    """Iterates a blocking iterable from a coroutine, each item is read on
+    the loop's default executor so the requests in flight keep running
+    while the next one is waited for."""
+    loop = asyncio.get_event_loop()
+    iterator = iter(items)
+    while True:
+        item = await loop.run_in_executor(None, next, iterator, _DONE)
+        if item is _DONE:
+            return
+        yield item
+
+
+def iterate_async(items: AsyncIterator[T]) -> Iterator[T]:
+    """Iterates an async iterator from synchronous code on a private event
+    loop.
+
+    The loop only runs while the next item is awaited, combine with
+    `read_ahead` to keep requests in flight while items are processed.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(items.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(items.aclose())
+        loop.close()
+
+
+def _put_until_stopped(buffer: queue.Queue, stop: threading.Event, item) -> bool:
+    """Puts an item in a bounded queue, waiting while it is full until
+    `stop` is set, returns whether the item was queued."""
+    while not stop.is_set():
+        try:
+            buffer.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _produce_pages(pages: Iterator[Dict], buffer: queue.Queue, stop: threading.Event) -> None:
+    """Queues each page with no error, then `_DONE` with the error that ended
+    the iteration if any, and closes `pages`."""
+    try:
+        for page in pages:
+            if not _put_until_stopped(buffer, stop, (page, None)):
+                return
+        _put_until_stopped(buffer, stop, (_DONE, None))
+    except Exception as exc:  # pylint: disable=broad-except
+        _put_until_stopped(buffer, stop, (_DONE, exc))
+    finally:
+        close = getattr(pages, "close", None)
+        if close:
+            close()
+
+
+def read_ahead(pages: Iterator[Dict], depth: int) -> Iterator[Dict]:
+    """Consumes `pages` on a background thread, staying up to `depth` pages
+    ahead of the caller.
+
+    The bounded queue caps the number of buffered pages. Exceptions raised
+    while fetching are re-raised to the caller in order.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    producer = threading.Thread(
+        target=_produce_pages, args=(pages, buffer, stop), name="page-read-ahead", daemon=True
+    )
+    producer.start()
+    try:
+        while True:
+            page, error = buffer.get()
+            if error is not None:
+                raise error
+            if page is _DONE:
+                return
+            yield page
+    finally:
+        stop.set()
+        producer.join()
+
+
+class HandoffCancelled(Exception):
+    """Raised to the consumer of a `Handoff` cancelled by its producer."""
+
+
+class Handoff:
+    """Hands items from a producer to a consumer running on a background
+    thread through a bounded queue.
+
+    `put` blocks while `depth` items are queued, holding the producer back to
+    the consumer's pace. An exception raised by the consumer is re-raised to
+    the producer by the next `put` and by `close`.
+    """
+
+    def __init__(self, consume: Callable[[Iterator[T]], None], depth: int, name: str) -> None:
+        self.buffer = queue.Queue(maxsize=depth)
+        self.stopped = threading.Event()
+        self.cancelled = threading.Event()
+        self.error = None
+        self.consumer = threading.Thread(target=self._consume, args=(consume,), name=name, daemon=True)
+        self.consumer.start()
+
+    def _items(self) -> Iterator[T]:
+        while True:
+            try:
+                item = self.buffer.get(timeout=0.1)
+            except queue.Empty:
+                if self.cancelled.is_set():
+                    raise HandoffCancelled()
+                continue
+            if item is _DONE:
+                return
+            yield item
+
+    def _consume(self, consume: Callable[[Iterator[T]], None]) -> None:
+        try:
+            consume(self._items())
+        except Exception as exc:  # pylint: disable=broad-except
+            self.error = exc
+        finally:
+            self.stopped.set()
+
+    def _raise_error(self) -> None:
+        if self.error is not None and not isinstance(self.error, HandoffCancelled):
+            raise self.error
+
+    def put(self, item: T) -> None:
+        """Queues an item for the consumer, waiting while the queue is full."""
+        while not self.stopped.is_set():
+            try:
+                self.buffer.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        self._raise_error()
+
+    def close(self) -> None:
+        """Waits until the consumer has processed every queued item."""
+        self.put(_DONE)
+        self.consumer.join()
+        self._raise_error()
+
+    def cancel(self) -> None:
+        """Stops the consumer without processing the items left in the queue,
+        it sees `HandoffCancelled` raised from its iterator."""
+        self.cancelled.set()
+        while not self.buffer.empty():
+            try:
+                self.buffer.get_nowait()
+            except queue.Empty:
+                break
+        self.consumer.join()
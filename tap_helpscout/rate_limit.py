@@ -0,0 +1,104 @@
+import threading
+import time
+from typing import Mapping, Optional
+
+LIMIT_HEADER = "X-RateLimit-Limit-Minute"
+REMAINING_HEADER = "X-RateLimit-Remaining-Minute"
+RESET_HEADER = "X-RateLimit-Reset"
+RETRY_AFTER_HEADERS = ("X-RateLimit-Retry-After", "Retry-After")
+
+# Help Scout rate limits are applied per minute
+WINDOW_SECONDS = 60
+
+
+def get_header_number(headers: Mapping, names) -> Optional[float]:
+    """Returns the first numeric header value found among `names`."""
+    for name in names:
+        value = headers.get(name)
+        if value not in (None, ""):
+            try:
+                return float(value)
+            except ValueError:
+                continue
+    return None
+
+
+class RateLimiter:
+    """Token bucket pacing requests under Help Scout's per-minute rate limit.
+
+    The bucket is refilled continuously at `limit / 60` tokens per second and
+    is corrected with the remaining quota reported on every response. A
+    single instance is shared by every thread using the same client, each
+    request reserves a token under the lock and then sleeps until its slot.
+    """
+
+    def __init__(self, requests_per_minute: Optional[int] = None) -> None:
+        self._lock = threading.Lock()
+        self.limit = None
+        self.tokens = 0.0
+        self._updated_at = time.monotonic()
+        self._resume_at = 0.0
+        if requests_per_minute:
+            self.limit = self.tokens = float(requests_per_minute)
+
+    @property
+    def rate(self) -> float:
+        """Tokens added to the bucket per second."""
+        return self.limit / WINDOW_SECONDS
+
+    def _refill(self, now: float) -> None:
+        if self.limit:
+            self.tokens = min(self.limit, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def acquire(self) -> None:
+        """Blocks until the next request may be sent."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def reserve(self) -> float:
+        """Reserves a token for the next request and returns the number of
+        seconds to wait before sending it."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._resume_at)
+            if self.limit:
+                self._refill(now)
+                self.tokens -= 1
+                if self.tokens < 0:
+                    # Wait for the token reserved by this request to be refilled
+                    start = max(start, now - self.tokens / self.rate)
+        return start - now
+
+    def update(self, headers: Mapping) -> None:
+        """Synchronizes the bucket with the rate limit headers of a
+        response."""
+        limit = get_header_number(headers, (LIMIT_HEADER,))
+        remaining = get_header_number(headers, (REMAINING_HEADER,))
+        reset = get_header_number(headers, (RESET_HEADER,))
+        with self._lock:
+            now = time.monotonic()
+            if limit:
+                if not self.limit:
+                    self.tokens = limit
+                    self._updated_at = now
+                self.limit = limit
+            if remaining is not None:
+                self._refill(now)
+                self.tokens = min(self.tokens, remaining)
+                if remaining <= 0 and reset:
+                    self._resume_at = max(self._resume_at, now + reset)
+
+    def pause(self, headers: Mapping, default: float = WINDOW_SECONDS) -> float:
+        """Holds back every request for the retry delay of a 429 response and
+        returns the delay."""
+        retry_after = get_header_number(headers, RETRY_AFTER_HEADERS)
+        if retry_after is None:
+            retry_after = default
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._resume_at = max(self._resume_at, now + retry_after)
+            self.tokens = min(self.tokens, 0.0)
+        return retry_after
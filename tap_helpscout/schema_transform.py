@@ -0,0 +1,249 @@
+import re
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Tuple
+
+import singer
+from singer.transform import (
+    NO_INTEGER_DATETIME_PARSING,
+    Transformer,
+    breadcrumb_path,
+    string_to_datetime,
+)
+
+# Zero padded UTC timestamps, the layout returned by the Help Scout API
+ISO_DATETIME = re.compile(r"(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?(?:Z|\+00:00)")
+
+# A compiled schema node, called with the value, its path in the record and
+# the transformer tracking removed fields
+Plan = Callable[[object, Tuple, Transformer], object]
+
+
+class Mismatch(Exception):
+    """Raised by a compiled plan when a value does not match its schema."""
+
+
+def transform_datetime(value):
+    """Equivalent of `Transformer._transform_datetime` followed by its
+    `None` check, parses the API timestamp layout without dateutil."""
+    if value is None or value == "":
+        raise Mismatch
+    if isinstance(value, str):
+        match = ISO_DATETIME.fullmatch(value)
+        if match:
+            year, month, day, hour, minute, second, fraction = match.groups()
+            # singer only zero pads years of 1000 or more on every platform
+            if year >= "1000":
+                try:
+                    datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+                except ValueError:
+                    pass
+                else:
+                    return f"{year}-{month}-{day}T{hour}:{minute}:{second}.{(fraction or '').ljust(6, '0')}Z"
+    value = string_to_datetime(value)
+    if value is None:
+        raise Mismatch
+    return value
+
+
+def transform_null(value):
+    if value is None or value == "":
+        return None
+    raise Mismatch
+
+
+def transform_string(value):
+    if value is None:
+        raise Mismatch
+    try:
+        return str(value)
+    except Exception as err:
+        raise Mismatch from err
+
+
+def transform_integer(value):
+    if isinstance(value, str):
+        value = value.replace(",", "")
+    try:
+        return int(value)
+    except Exception as err:
+        raise Mismatch from err
+
+
+def transform_number(value):
+    if isinstance(value, str):
+        value = value.replace(",", "")
+    try:
+        return float(value)
+    except Exception as err:
+        raise Mismatch from err
+
+
+def transform_boolean(value):
+    if isinstance(value, str) and value.lower() == "false":
+        return False
+    try:
+        return bool(value)
+    except Exception as err:
+        raise Mismatch from err
+
+
+SCALARS = {
+    "null": transform_null,
+    "string": transform_string,
+    "integer": transform_integer,
+    "number": transform_number,
+    "boolean": transform_boolean,
+}
+
+
+class SchemaTransformer(Transformer):
+    """Drop-in `singer.Transformer` that compiles each schema and its
+    selection metadata once into a plan of nested closures.
+
+    Records are filtered and coerced exactly as `Transformer.transform`
+    does, without walking the schema or looking up metadata per record.
+    Schema constructs the plan does not compile (`patternProperties`,
+    `singer.decimal`) and records that fail the schema go through
+    `Transformer`, so errors are raised by singer.
+    """
+
+    # Plans are shared by every transformer of the run, keyed by the schema
+    # and metadata objects, which are kept referenced so their ids are not reused
+    plans = {}
+    plans_lock = threading.Lock()
+
+    def transform(self, data, schema, metadata=None):
+        if self.pre_hook or self.integer_datetime_fmt != NO_INTEGER_DATETIME_PARSING:
+            return super().transform(data, schema, metadata)
+        key = (id(schema), id(metadata))
+        entry = self.plans.get(key)
+        if entry is None:
+            with self.plans_lock:
+                entry = self.plans.setdefault(key, (schema, metadata, self.compile_selection(metadata),
+                                                    self.compile(schema)))
+        _, _, selection, plan = entry
+        if selection is None:
+            data = self.filter_data_by_metadata(data, metadata)
+        else:
+            for field_name, path in selection:
+                if field_name in data:
+                    data.pop(field_name)
+                    self.filtered.add(path)
+        try:
+            return plan(data, (), self)
+        except Mismatch:
+            return super().transform(data, schema, metadata)
+
+    @staticmethod
+    def compile_selection(metadata: Dict):
+        """Returns the top level fields `filter_data_by_metadata` removes, or
+        None when the metadata selects nested fields and must be applied by
+        singer."""
+        selection = []
+        for breadcrumb in metadata or {}:
+            if len(breadcrumb) > 2:
+                return None
+            if len(breadcrumb) != 2:
+                continue
+            selected = singer.metadata.get(metadata, breadcrumb, "selected")
+            inclusion = singer.metadata.get(metadata, breadcrumb, "inclusion")
+            if inclusion != "automatic" and (selected is False or inclusion == "unsupported"):
+                selection.append((breadcrumb[1], breadcrumb_path(breadcrumb)))
+        return selection
+
+    @classmethod
+    def compile(cls, schema: Dict) -> Plan:
+        """Compiles a schema node as `Transformer.transform_recur` applies
+        it."""
+        if "anyOf" in schema:
+            return cls.compile_union([cls.compile(subschema) for subschema in schema["anyOf"]])
+        if "type" not in schema:
+            return lambda data, path, transformer: data
+        types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        # null is always tried last
+        types = [typ for typ in types if typ != "null"] + ["null"] * ("null" in types)
+        return cls.compile_union([cls.compile_type(typ, schema) for typ in types])
+
+    @staticmethod
+    def compile_union(plans) -> Plan:
+        if len(plans) == 1:
+            return plans[0]
+
+        def transform_union(data, path, transformer):
+            for plan in plans:
+                try:
+                    return plan(data, path, transformer)
+                except Mismatch:
+                    continue
+            raise Mismatch
+
+        return transform_union
+
+    @classmethod
+    def compile_type(cls, typ: str, schema: Dict) -> Plan:
+        """Compiles one type of a schema node, in the order of checks of
+        `Transformer._transform`."""
+        if typ == "null":
+            return lambda data, path, transformer: transform_null(data)
+        if schema.get("format") == "date-time":
+            return lambda data, path, transformer: transform_datetime(data)
+        if schema.get("format") == "singer.decimal" or (typ == "object" and schema.get("patternProperties")):
+            return cls.compile_fallback(typ, schema)
+        if typ == "object":
+            return cls.compile_object(schema.get("properties", {}))
+        if typ == "array":
+            return cls.compile_array(cls.compile(schema["items"]))
+        if typ in SCALARS:
+            scalar = SCALARS[typ]
+            return lambda data, path, transformer: scalar(data)
+
+        def transform_unknown(data, path, transformer):
+            raise Mismatch
+
+        return transform_unknown
+
+    @classmethod
+    def compile_object(cls, properties: Dict) -> Plan:
+        if not properties:
+
+            def transform_any_object(data, path, transformer):
+                if not isinstance(data, dict):
+                    raise Mismatch
+                return data
+
+            return transform_any_object
+        plans = {key: cls.compile(subschema) for key, subschema in properties.items()}
+
+        def transform_object(data, path, transformer):
+            if not isinstance(data, dict):
+                raise Mismatch
+            result = {}
+            for key, value in data.items():
+                plan = plans.get(key)
+                if plan is None:
+                    transformer.removed.add(".".join(map(str, path + (key,))))
+                else:
+                    result[key] = plan(value, path + (key,), transformer)
+            return result
+
+        return transform_object
+
+    @staticmethod
+    def compile_array(plan: Plan) -> Plan:
+        def transform_array(data, path, transformer):
+            if not isinstance(data, list):
+                raise Mismatch
+            return [plan(row, path + (index,), transformer) for index, row in enumerate(data)]
+
+        return transform_array
+
+    @staticmethod
+    def compile_fallback(typ: str, schema: Dict) -> Plan:
+        def transform_generic(data, path, transformer):
+            success, value = transformer._transform(data, typ, schema, list(path))
+            if not success:
+                raise Mismatch
+            return value
+
+        return transform_generic
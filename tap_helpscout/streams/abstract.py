@@ -1,21 +1,45 @@
+import asyncio
+import json
 from abc import ABC, abstractmethod
-from typing import Dict, Iterator, List, Set, Tuple
-from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Set, Tuple
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
 
 import singer
-from singer import Transformer, metrics, write_state
-from singer.bookmarks import ensure_bookmark_path
+from singer import Transformer, metrics
 from singer.metadata import get_standard_metadata, to_list, to_map, write
 
-from tap_helpscout.helpers import parse_date
-from tap_helpscout.transform import transform_json
+from tap_helpscout.async_client import AsyncHelpScoutClient
+from tap_helpscout.helpers import get_bool_config, get_float_config, get_int_config, parse_date
+from tap_helpscout.json_codec import get_codec
+from tap_helpscout.output import MessageWriter, StateManager
+from tap_helpscout.pipeline import (
+    StageTimings,
+    async_ordered_map,
+    iterate_async,
+    iterate_in_executor,
+    ordered_map,
+    read_ahead,
+)
+from tap_helpscout.schema_transform import SchemaTransformer
+from tap_helpscout.transform import get_convert_cache_stats, get_kept_fields, transform_record
 
 logger = singer.get_logger()
 
+WINDOW_TARGET_RECORDS = 5000
+MIN_WINDOW = timedelta(minutes=1)
+# Bounds of the factor applied to a completed window's size to size the next one
+WINDOW_SCALE = (0.25, 4.0)
+WINDOW_DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
 
 class BaseStream(ABC):
     """Base class representing generic stream methods and meta-attributes."""
 
+    # Field of the search query restricting the records to a time window, for streams
+    # whose backfills can be split into windows
+    window_query_field = None
+
     @property
     @abstractmethod
     def replication_method(self) -> str:
@@ -83,87 +107,505 @@ class BaseStream(ABC):
         order to allow for sources that have duplicate stream names.
         """
 
-    def __init__(self, client=None, start_date=None) -> None:
+    # Child streams whose records can be embedded in this stream's API responses
+    embeddable_child_streams = []
+    # Child streams whose sync of a parent is skipped while the parent's `child_fingerprint_fields`
+    # are unchanged, the fields change whenever the parent's child records change
+    fingerprinted_child_streams = []
+    child_fingerprint_fields = ()
+
+    def __init__(self, client=None, start_date=None, config=None, writer: MessageWriter = None,
+                 state_manager: StateManager = None) -> None:
         self.client = client
         self.start_date = start_date
-
-    def get_bookmark(self, state: Dict) -> str:
-        """Retrieves bookmark value for a given stream from state file."""
+        self.config = config or {}
+        # Request params are updated per request, each stream object needs its own copy
+        self.params = dict(self.params)
+        # Number of pages fetched concurrently once the total page count is known
+        self.page_workers = get_int_config(self.config, "page_workers", 1)
+        # Number of pages fetched ahead of record processing on a background thread
+        self.read_ahead_pages = get_int_config(self.config, "read_ahead_pages", 0)
+        # Number of parent ids whose child records are fetched concurrently
+        self.child_workers = get_int_config(self.config, "child_workers", 1)
+        # Fetch pages with the asyncio client, keeping up to `async_concurrency` requests in flight
+        self.async_requests = get_bool_config(self.config, "async_requests")
+        self.async_concurrency = get_int_config(self.config, "async_concurrency", 100)
+        # Parse and transform records one at a time as the response body is received
+        self.stream_pages = get_bool_config(self.config, "stream_pages")
+        # Days covered by the first time window of a windowed query, the following windows are
+        # sized to hold about `window_target_records` records
+        self.window_days = get_float_config(self.config, "window_days", 0)
+        self.window_target_records = get_int_config(self.config, "window_target_records", WINDOW_TARGET_RECORDS)
+        # Pages read between checkpoints of the max bookmark, an interrupted sync resumes from the last one
+        self.checkpoint_pages = get_int_config(self.config, "checkpoint_pages", 0)
+        # Receivers of the written parent ids in place of the returned set, see `sync_stream`
+        self.child_handoffs = []
+        # Persistent queue of the parent ids of a child stream, see `sync_with_parent_queue`
+        self.parent_queue = None
+        # Fingerprint stores of the parents of a child stream, and of this stream as a parent
+        self.parent_fingerprints = self.child_fingerprints = None
+        self.codec = get_codec(self.config.get("json_codec"))
+        # Shared by the streams of a sync, so all messages go through one buffer
+        self.writer = writer or MessageWriter(self.codec)
+        # Shared by the streams of a sync, bookmark updates are coalesced into STATE messages
+        self.state_manager = state_manager or StateManager(self.writer)
+        self.compiled_transform = get_bool_config(self.config, "compiled_transform")
+        # Record fields transformed in the record path, set from the catalog when syncing
+        self.kept_fields = None
+        self.timings = StageTimings()
+        # (stream, schema, metadata) of the child stream whose records are embedded in responses
+        self.embedded_child = None
+
+    def set_embedded_child(self, child_stream: "BaseStream", schema: Dict, stream_metadata: Dict) -> None:
+        """Requests the child stream records embedded in this stream's
+        responses and routes them to the child stream."""
+        self.embedded_child = (child_stream, schema, stream_metadata)
+        child_stream.kept_fields = child_stream.get_kept_fields(schema, stream_metadata)
+        self.params = {**self.params, "embed": child_stream.data_key}
+
+    def get_kept_fields(self, schema: Dict, stream_metadata: Dict) -> Set[str]:
+        """Returns the record fields selected in the catalog, along with the
+        fields the record path needs. Other fields are pruned before records
+        are converted."""
+        selected_fields = {self.replication_key, *self.key_properties} - {None}
+        for field_name in schema.get("properties", {}):
+            field_metadata = (stream_metadata or {}).get(("properties", field_name), {})
+            inclusion = field_metadata.get("inclusion")
+            if inclusion == "automatic" or (field_metadata.get("selected") is not False and inclusion != "unsupported"):
+                selected_fields.add(field_name)
+        if self.embedded_child:
+            selected_fields.add(f"embedded_{self.embedded_child[0].data_key}")
+        if self.child_fingerprints:
+            selected_fields.update(self.child_fingerprint_fields)
+        return get_kept_fields(self.tap_stream_id, selected_fields)
+
+    def get_bookmark(self, state: Dict, partition: str = None) -> str:
+        """Retrieves bookmark value for a given stream from state file, a
+        partition without a bookmark starts from the stream bookmark."""
+        if partition is not None:
+            bookmark = state.get("partition_bookmarks", {}).get(self.tap_stream_id, {}).get(partition)
+            if bookmark:
+                return bookmark
         return state.get("bookmarks", {}).get(self.tap_stream_id, self.start_date)
 
-    def write_bookmark(self, state: Dict, value: str) -> None:
+    def write_bookmark(self, state: Dict, value: str, partition: str = None) -> None:
         """Writes bookmark value for a given stream to state file."""
-        state = ensure_bookmark_path(state, ["bookmarks", self.tap_stream_id])
-        state["bookmarks"][self.tap_stream_id] = value
-        write_state(state)
+        self.state_manager.write_bookmark(state, self.tap_stream_id, value, partition)
 
-    def make_request_params(self, state) -> str:
-        """Generates request params required to send an API request."""
+    def make_request_params(self, state, bookmark: str = None) -> str:
+        """Generates request params required to send an API request, querying
+        the records modified since `bookmark` in place of the stream
+        bookmark when given."""
         if self.replication_query_field:
-            self.params[self.replication_query_field] = self.get_bookmark(state)
+            self.params[self.replication_query_field] = bookmark or self.get_bookmark(state)
         if self.tap_stream_id == "happiness_ratings_report":
             # start and end params filters out records based on ratingCreatedAt field
             self.params["start"] = self.get_bookmark(state)
             self.params["end"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
         return '&'.join([f'{key}={value}' for (key, value) in self.params.items()])
 
-    def get_records(self, state: Dict, parent_id=None) -> Iterator[Dict]:
-        """Retrieves records from API as paginated streams"""
+    def get_page_info(self, data: Dict) -> Tuple[int, int]:
+        """Returns the current page number and the total number of pages of a
+        response."""
+        if self.tap_stream_id == "happiness_ratings_report":
+            return data["page"], data["pages"]
+        return data["page"]["number"], data["page"]["totalPages"]
+
+    def fetch_page(self, path: str, query_string: str, page: int) -> Dict:
+        """Requests a single page of records from the API."""
+        query_string_tmp = f"{query_string}&page={page}"
+        logger.info(f'URL for {self.tap_stream_id}: https://api.helpscout.net/v2{path}?'
+                    f'{query_string_tmp}')
+        with self.timings.time("fetch"):
+            return self.client.get(path, params=query_string_tmp, endpoint=self.tap_stream_id)
+
+    async def fetch_page_async(self, client: AsyncHelpScoutClient, path: str, query_string: str,
+                               page: int) -> Dict:
+        """Requests a single page of records from the API with the asyncio
+        client."""
+        query_string_tmp = f"{query_string}&page={page}"
+        logger.info(f'URL for {self.tap_stream_id}: https://api.helpscout.net/v2{path}?'
+                    f'{query_string_tmp}')
+        with self.timings.time("fetch"):
+            return await client.get(path, params=query_string_tmp, endpoint=self.tap_stream_id)
+
+    async def get_pages_async(self, client: AsyncHelpScoutClient, state: Dict, parent_id=None,
+                              query_string: str = None, first_page: Dict = None) -> AsyncIterator[Dict]:
+        """Retrieves the raw API responses page by page with the asyncio
+        client, fetching the pages after the first one concurrently and
+        starting with `first_page` when it was already requested."""
+        path = self.path.format(parent_id) if parent_id else self.path
+        query_string = query_string or self.make_request_params(state)
+        if first_page is not None:
+            data = first_page
+        else:
+            data = await self.fetch_page_async(client, path, query_string, 1)
+        yield data
+        page, total_pages = self.get_page_info(data)
+        if page == 0:
+            return
+        async for data in async_ordered_map(
+            lambda page_number: self.fetch_page_async(client, path, query_string, page_number),
+            range(page + 1, total_pages + 1),
+            self.async_concurrency,
+        ):
+            yield data
+
+    async def iterate_pages_async(self, state: Dict, parent_id=None, query_string: str = None,
+                                  first_page: Dict = None) -> AsyncIterator[Dict]:
+        """Retrieves the raw API responses with a new asyncio client."""
+        async with AsyncHelpScoutClient(self.client, self.async_concurrency) as client:
+            async for data in self.get_pages_async(client, state, parent_id, query_string, first_page):
+                yield data
+
+    def get_pages(self, state: Dict, parent_id=None, query_string: str = None,
+                  first_page: Dict = None) -> Iterator[Dict]:
+        """Retrieves the raw API responses page by page, starting with
+        `first_page` when it was already requested."""
+        if self.async_requests:
+            yield from iterate_async(self.iterate_pages_async(state, parent_id, query_string, first_page))
+            return
         page = total_pages = 1
         path = self.path.format(parent_id) if parent_id else self.path
-        query_string = self.make_request_params(state)
+        query_string = query_string or self.make_request_params(state)
+        while page <= total_pages:
+            data = first_page if page == 1 and first_page is not None else self.fetch_page(path, query_string, page)
+            yield data
+            page, total_pages = self.get_page_info(data)
+            if page == 0:
+                break
+            page += 1
+            if self.page_workers > 1 and page <= total_pages:
+                # The total page count is known after the first page, fetch the rest concurrently
+                # while still yielding records in page order
+                yield from ordered_map(
+                    lambda page_number: self.fetch_page(path, query_string, page_number),
+                    range(page, total_pages + 1),
+                    self.page_workers,
+                )
+                break
+
+    def get_items_prefix(self) -> str:
+        """Returns the path of the records array in a response, in the ijson
+        prefix notation."""
+        if self.tap_stream_id == "happiness_ratings_report":
+            return f"{self.data_key}.item"
+        return f"_embedded.{self.data_key}.item"
+
+    def get_streamed_records(self, state: Dict, parent_id=None, query_string: str = None) -> Iterator[Dict]:
+        """Retrieves records from API as paginated streams, parsing and
+        transforming each record as the response body is received."""
+        page = total_pages = 1
+        path = self.path.format(parent_id) if parent_id else self.path
+        query_string = query_string or self.make_request_params(state)
         while page <= total_pages:
             query_string_tmp = f"{query_string}&page={page}"
             logger.info(f'URL for {self.tap_stream_id}: https://api.helpscout.net/v2{path}?'
                         f'{query_string_tmp}')
-            data = self.client.get(path, params=query_string_tmp, endpoint=self.tap_stream_id)
-            yield from self.transform_records(data)
-            page = data["page"] if self.tap_stream_id == "happiness_ratings_report" else \
-                data["page"]["number"]
-            total_pages = data["pages"] if self.tap_stream_id == "happiness_ratings_report" else \
-                data["page"]["totalPages"]
+            data = None
+            items = self.client.stream_items(
+                path, self.get_items_prefix(), params=query_string_tmp, endpoint=self.tap_stream_id
+            )
+            for kind, value in items:
+                if kind == "page":
+                    data = value
+                    continue
+                with self.timings.time("transform"):
+                    record = self.transform_raw_record(value)
+                yield record
+            if data is None:
+                break
+            page, total_pages = self.get_page_info(data)
             if page == 0:
                 break
             page += 1
 
+    def get_records(self, state: Dict, parent_id=None, query_string: str = None,
+                    first_page: Dict = None) -> Iterator[Dict]:
+        """Retrieves records from API as paginated streams"""
+        if self.window_days and self.window_query_field and parent_id is None and query_string is None:
+            yield from self.get_windowed_records(state)
+            return
+        if self.stream_pages:
+            yield from self.get_streamed_records(state, parent_id, query_string)
+            return
+        # The progress of a stream's own query is checkpointed every `checkpoint_pages` pages
+        checkpointing = (
+            self.checkpoint_pages and self.replication_query_field and parent_id is None and query_string is None
+        )
+        checkpoint = self.get_page_checkpoint(state) if checkpointing else None
+        max_bookmark = checkpoint.get("max_bookmark") if checkpoint else None
+        if max_bookmark:
+            # Records are sorted by modification time, the ones not written before the interruption,
+            # including those modified since, are all modified at or after the checkpointed bookmark
+            query_string = self.make_request_params(state, max_bookmark)
+        pages = self.get_pages(state, parent_id, query_string, first_page)
+        if self.read_ahead_pages > 0:
+            # Pages are only waited on when fetched on a background thread, otherwise the
+            # time is spent fetching them and already counted
+            pages = self.timings.iterate(read_ahead(pages, self.read_ahead_pages), "wait")
+        record_pages = self.transform_pages(pages)
+        if checkpointing:
+            record_pages = self.checkpoint_record_pages(state, record_pages, max_bookmark)
+        for records in record_pages:
+            yield from records
+
+    def transform_pages(self, pages: Iterable[Dict]) -> Iterator[List[Dict]]:
+        """Yields the transformed records of each page."""
+        for data in pages:
+            with self.timings.time("transform"):
+                records = self.transform_records(data)
+            yield records
+
+    def checkpoint_record_pages(self, state: Dict, record_pages: Iterator[List[Dict]],
+                                max_bookmark: str = None) -> Iterator[List[Dict]]:
+        """Yields the records of each page and checkpoints the max bookmark of
+        the written records, starting from `max_bookmark`, every
+        `checkpoint_pages` pages."""
+        max_bookmark_date = parse_date(max_bookmark) if max_bookmark else None
+        for pages_read, records in enumerate(record_pages, 1):
+            yield records
+            for record in records:
+                value = record.get(self.replication_key)
+                if value:
+                    value_date = parse_date(value)
+                    if max_bookmark_date is None or value_date > max_bookmark_date:
+                        max_bookmark, max_bookmark_date = value, value_date
+            if max_bookmark and pages_read % self.checkpoint_pages == 0:
+                # Resumed once the last record of the page was written
+                self.state_manager.write_checkpoint(state, "page_checkpoints", self.tap_stream_id, {
+                    "bookmark": self.get_bookmark(state),
+                    "max_bookmark": max_bookmark,
+                })
+
+    def get_page_checkpoint(self, state: Dict) -> Dict:
+        """Returns the page checkpoint of an interrupted sync of the stream,
+        if it was taken for the query of the current bookmark."""
+        checkpoint = state.get("page_checkpoints", {}).get(self.tap_stream_id)
+        if checkpoint and checkpoint.get("bookmark") == self.get_bookmark(state):
+            return checkpoint
+        return None
+
+    def get_windowed_records(self, state: Dict) -> Iterator[Dict]:
+        """Retrieves the records modified from the bookmark until now with a
+        paginated query per time window, in window order.
+
+        Windows are sized from the `totalElements` of their first page to
+        hold about `window_target_records` records: a window holding more
+        than twice as many is split before its other pages are requested, and
+        the next window is scaled after the current one. The end of each
+        completed window is checkpointed in `window_checkpoints`, an
+        interrupted sync resumes at the window that did not complete.
+        """
+        checkpoint = state.get("window_checkpoints", {}).get(self.tap_stream_id)
+        start = parse_date(checkpoint or self.get_bookmark(state))
+        end = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+        window = timedelta(days=self.window_days)
+        while start < end:
+            window_end = min(start + window, end)
+            query = (
+                f"({self.window_query_field}:[{start.strftime(WINDOW_DATE_FORMAT)} TO "
+                f"{window_end.strftime(WINDOW_DATE_FORMAT)}])"
+            )
+            query_string = f"{self.make_request_params(state)}&query={quote(query)}"
+            first_page = self.fetch_page(self.path, query_string, 1)
+            scale = self.window_target_records / max(first_page["page"].get("totalElements", 0), 1)
+            if scale < 0.5 and window_end - start > MIN_WINDOW:
+                window = max((window_end - start) * scale, MIN_WINDOW)
+                continue
+            yield from self.get_records(state, query_string=query_string, first_page=first_page)
+            # Resumed once the last record of the window was written
+            self.state_manager.write_checkpoint(
+                state, "window_checkpoints", self.tap_stream_id, window_end.strftime(WINDOW_DATE_FORMAT)
+            )
+            window = max((window_end - start) * min(max(scale, WINDOW_SCALE[0]), WINDOW_SCALE[1]), MIN_WINDOW)
+            start = window_end
+
     def transform_records(self, data: Dict) -> List:
         """Transforms keys in extracted data"""
         if self.tap_stream_id == "happiness_ratings_report":
-            return transform_json(data, self.data_key, self.tap_stream_id)[self.data_key]
+            records = data[self.data_key]
         elif "_embedded" in data:
-            return transform_json(data["_embedded"], self.data_key, self.tap_stream_id)[self.data_key]
+            records = data["_embedded"][self.data_key]
         else:
             return []
+        return [self.transform_raw_record(record) for record in records]
+
+    def transform_raw_record(self, record: Dict) -> Dict:
+        """Transforms the keys of an extracted record, pruned to the kept
+        fields."""
+        embedded_kept_fields = self.embedded_child[0].kept_fields if self.embedded_child else None
+        return transform_record(record, self.tap_stream_id, self.kept_fields, embedded_kept_fields)
+
+    def get_transformer(self) -> Transformer:
+        """Returns the transformer applying the schema and field selection to
+        records."""
+        return SchemaTransformer() if self.compiled_transform else Transformer()
+
+    def get_transformed_records(self, transformer: Transformer, state: Dict, schema: Dict,
+                                stream_metadata: Dict, parent_id=None) -> Iterator[Tuple[Dict, Dict]]:
+        """Yields each extracted record along with its schema transformed
+        version."""
+        for record in self.get_records(state, parent_id):
+            yield self.transform_record(transformer, record, schema, stream_metadata, parent_id)
+
+    def transform_record(self, transformer: Transformer, record: Dict, schema: Dict, stream_metadata: Dict,
+                         parent_id=None) -> Tuple[Dict, Dict]:
+        """Returns an extracted record along with its schema transformed
+        version."""
+        # Insert the parentId into each child record
+        if parent_id:
+            record[f"{self.parent}_id"] = parent_id
+        if self.embedded_child:
+            # Embedded child records are not part of this stream's schema
+            embedded_records = record.pop(f"embedded_{self.embedded_child[0].data_key}", [])
+        # The transformer drops deselected fields from the extracted record too
+        fingerprint_values = (
+            {field: record.get(field) for field in self.child_fingerprint_fields} if self.child_fingerprints else {}
+        )
+        with self.timings.time("transform"):
+            transformed_record = transformer.transform(record, schema, stream_metadata)
+        if self.embedded_child:
+            record[f"embedded_{self.embedded_child[0].data_key}"] = embedded_records
+        record.update(fingerprint_values)
+        return record, transformed_record
+
+    def write_records(self, state: Dict, records: Iterable[Tuple[Dict, Dict]], is_parent=False,
+                      partition: str = None) -> Set:
+        """Writes the transformed records newer than the bookmark and saves the
+        new bookmark, of `partition` when the records are one partition of
+        the stream."""
+        parent_ids = set()
+        current_bookmark = max_bookmark_value = self.get_bookmark(state, partition)
+        # Bookmarks are parsed once, the parsed max bookmark is kept with its value
+        current_bookmark_date = max_bookmark_date = parse_date(current_bookmark)
+        if partition is None:
+            max_bookmark_value, max_bookmark_date = self.get_resumed_max_bookmark(
+                state, max_bookmark_value, max_bookmark_date
+            )
+        with metrics.record_counter(self.tap_stream_id) as counter:
+            for record, transformed_record in records:
+                if self.replication_key and self.replication_key in transformed_record:
+                    record_bookmark = transformed_record[self.replication_key]
+                    record_date = parse_date(record_bookmark)
+                    if record_date >= current_bookmark_date:
+                        self.write_record(transformed_record)
+                        counter.increment()
+                        if record[self.replication_key] != record_bookmark:
+                            # The transformer may format the value differently
+                            record_date = parse_date(record[self.replication_key])
+                        if max_bookmark_date < record_date:
+                            max_bookmark_value = record[self.replication_key]
+                            max_bookmark_date = record_date
+                        if is_parent:
+                            self.add_parent_id(record, parent_ids)
+                        if self.embedded_child:
+                            self.write_embedded_records(state, record)
+                else:
+                    self.write_record(transformed_record)
+                    counter.increment()
+            if self.replication_method == "INCREMENTAL":
+                self.write_bookmark(state, max_bookmark_value, partition)
+        return parent_ids
+
+    def get_resumed_max_bookmark(self, state: Dict, max_bookmark_value: str,
+                                 max_bookmark_date: datetime) -> Tuple[str, datetime]:
+        """Returns the max bookmark value and date of the stream, raised to
+        the one of the page checkpoint, or to the end of the last completed
+        time window, of an interrupted sync being resumed."""
+        checkpoint = self.get_page_checkpoint(state) if self.checkpoint_pages else None
+        # Records of the pages or windows read before the interruption are not requested again
+        resumed_values = [checkpoint and checkpoint.get("max_bookmark")]
+        if self.window_days and self.window_query_field:
+            resumed_values.append(state.get("window_checkpoints", {}).get(self.tap_stream_id))
+        for value in filter(None, resumed_values):
+            value_date = parse_date(value)
+            if value_date > max_bookmark_date:
+                max_bookmark_value, max_bookmark_date = value, value_date
+        return max_bookmark_value, max_bookmark_date
+
+    def add_parent_id(self, record: Dict, parent_ids: Set) -> None:
+        """Passes the id of a written parent record on to the child streams,
+        unless its fingerprint is unchanged."""
+        if not self.is_child_sync_needed(record):
+            return
+        if self.child_handoffs:
+            # Handed to the child streams, or their parent queue, while this stream is still paginated
+            for handoff in self.child_handoffs:
+                handoff.put(record["id"])
+        else:
+            # Store the parent id to sync the child streams
+            parent_ids.add(record["id"])
+
+    def write_embedded_records(self, state: Dict, record: Dict) -> None:
+        """Writes the child records embedded in a parent record with the parent
+        id injected."""
+        child_stream, schema, stream_metadata = self.embedded_child
+        parent_id = record["id"]
+        with self.get_transformer() as transformer:
+            child_records = []
+            for child_record in record.pop(f"embedded_{child_stream.data_key}", []):
+                child_record[f"{child_stream.parent}_id"] = parent_id
+                with child_stream.timings.time("transform"):
+                    child_records.append((child_record, transformer.transform(child_record, schema, stream_metadata)))
+            child_stream.write_records(state, child_records)
 
     def process_records(self, state: Dict, schema: Dict, stream_metadata: Dict, is_parent=False,
                         parent_id=None) -> Set:
         """Processes and writes transformed data"""
-
-        parent_ids = set()
-        current_bookmark = max_bookmark_value = self.get_bookmark(state)
-        with Transformer() as transformer:
-            with metrics.record_counter(self.tap_stream_id) as counter:
-                for record in self.get_records(state, parent_id):
-                    if parent_id:
-                        record[f"{self.parent}_id"] = parent_id
-                    transformed_record = transformer.transform(record, schema, stream_metadata)
-                    # Insert the parentId into each child record
-                    if self.replication_key and self.replication_key in transformed_record:
-                        record_bookmark = transformed_record[self.replication_key]
-                        if parse_date(record_bookmark) >= parse_date(current_bookmark):
-                            singer.write_record(self.tap_stream_id, transformed_record)
-                            counter.increment()
-                            if parse_date(max_bookmark_value) < parse_date(record[self.replication_key]):
-                                max_bookmark_value = record[self.replication_key]
-                            if is_parent:
-                                # Store the parent id to sync the child streams
-                                parent_ids.add(record["id"])
-                    else:
-                        singer.write_record(self.tap_stream_id, transformed_record)
-                        counter.increment()
-                if self.replication_method == "INCREMENTAL":
-                    self.write_bookmark(state, max_bookmark_value)
-        return parent_ids
+        with self.get_transformer() as transformer:
+            records = self.get_transformed_records(transformer, state, schema, stream_metadata, parent_id)
+            return self.write_records(state, records, is_parent)
+
+    def fetch_child_records(self, state: Dict, schema: Dict, stream_metadata: Dict,
+                            parent_id) -> List[Tuple[Dict, Dict]]:
+        """Fetches and transforms all the child records of a parent id."""
+        logger.info(
+            f"Starting sync for child stream {self.tap_stream_id} of parent"
+            f" {self.parent} for "
+            f"Id {parent_id}"
+        )
+        with self.get_transformer() as transformer:
+            return list(self.get_transformed_records(transformer, state, schema, stream_metadata, parent_id))
+
+    async def fetch_child_records_async(self, client: AsyncHelpScoutClient, state: Dict, schema: Dict,
+                                        stream_metadata: Dict, parent_id) -> List[Tuple[Dict, Dict]]:
+        """Fetches and transforms all the child records of a parent id with the
+        asyncio client."""
+        logger.info(
+            f"Starting sync for child stream {self.tap_stream_id} of parent"
+            f" {self.parent} for "
+            f"Id {parent_id}"
+        )
+        child_records = []
+        with self.get_transformer() as transformer:
+            async for data in self.get_pages_async(client, state, parent_id):
+                with self.timings.time("transform"):
+                    records = self.transform_records(data)
+                for record in records:
+                    child_records.append(self.transform_record(transformer, record, schema, stream_metadata, parent_id))
+        return child_records
+
+    async def sync_children_async(self, state: Dict, schema: Dict, stream_metadata: Dict, parent_ids) -> None:
+        """Fetches the child records of all parent ids concurrently and writes
+        them in parent order."""
+        async with AsyncHelpScoutClient(self.client, self.async_concurrency) as client:
+
+            async def fetch_child_records(parent_id):
+                records = await self.fetch_child_records_async(client, state, schema, stream_metadata, parent_id)
+                return parent_id, records
+
+            if isinstance(parent_ids, Iterator):
+                # Ids handed over while the parent is paginated or read from the parent queue block
+                parent_ids = iterate_in_executor(parent_ids)
+            async for parent_id, records in async_ordered_map(fetch_child_records, parent_ids, self.async_concurrency):
+                self.write_records(state, records)
+                self.complete_parent(parent_id)
+
+    def write_record(self, record: Dict) -> None:
+        """Writes a transformed record to stdout."""
+        with self.timings.time("write"):
+            self.writer.write_record(self.tap_stream_id, record)
 
     def sync(self, state: Dict, schema: Dict, stream_metadata: Dict, parent_ids=None, is_child=False):
         """
@@ -175,15 +617,64 @@ class BaseStream(ABC):
         6. Checks if the current stream as children. If yes, repeats same process for child stream
         """
         is_parent = bool(self.child_streams)
+        self.kept_fields = self.get_kept_fields(schema, stream_metadata)
         if not is_child:
-            return self.process_records(state, schema, stream_metadata, is_parent)
-        for parent_id in parent_ids:
-            logger.info(
-                f"Starting sync for child stream {self.tap_stream_id} of parent"
-                f" {self.parent} for "
-                f"Id {parent_id}"
-            )
-            self.process_records(state, schema, stream_metadata, is_parent, parent_id)
+            parent_ids = self.process_records(state, schema, stream_metadata, is_parent)
+            if self.window_days and self.window_query_field:
+                # The bookmark covers every window now
+                self.state_manager.write_checkpoint(state, "window_checkpoints", self.tap_stream_id, None)
+            if self.checkpoint_pages:
+                self.state_manager.write_checkpoint(state, "page_checkpoints", self.tap_stream_id, None)
+            self.log_stats()
+            return parent_ids
+        if self.async_requests:
+            asyncio.run(self.sync_children_async(state, schema, stream_metadata, parent_ids))
+        elif self.child_workers > 1:
+            # Child records of several parents are fetched concurrently, they are written
+            # from this thread in parent order so bookmarks are handled as in a sequential sync
+            for parent_id, records in ordered_map(
+                lambda parent_id: (parent_id, self.fetch_child_records(state, schema, stream_metadata, parent_id)),
+                parent_ids,
+                self.child_workers,
+            ):
+                self.write_records(state, records, is_parent)
+                self.complete_parent(parent_id)
+        else:
+            for parent_id in parent_ids:
+                logger.info(
+                    f"Starting sync for child stream {self.tap_stream_id} of parent"
+                    f" {self.parent} for "
+                    f"Id {parent_id}"
+                )
+                self.process_records(state, schema, stream_metadata, is_parent, parent_id)
+                self.complete_parent(parent_id)
+        self.log_stats()
+
+    def complete_parent(self, parent_id) -> None:
+        """Marks a parent id as synced in the parent queue and stores its
+        fingerprint, once all its child records were written."""
+        if self.parent_queue:
+            self.parent_queue.complete(self.tap_stream_id, parent_id)
+        if self.parent_fingerprints:
+            self.parent_fingerprints.commit(parent_id)
+
+    def is_child_sync_needed(self, record: Dict) -> bool:
+        """Returns whether the child records of a written parent record are
+        synced, they are skipped while its fingerprint is unchanged."""
+        if self.child_fingerprints is None:
+            return True
+        fingerprint = json.dumps([record.get(field) for field in self.child_fingerprint_fields], sort_keys=True)
+        return self.child_fingerprints.changed(record["id"], fingerprint)
+
+    def log_stats(self) -> None:
+        """Logs the pipeline timings of the stream and the key conversion cache
+        counters."""
+        self.timings.log(logger, self.tap_stream_id)
+        stats = get_convert_cache_stats()
+        logger.info(
+            f"Key conversion cache: hits={stats['hits']}, misses={stats['misses']}, "
+            f"size={stats['size']}, hit_rate={stats['hit_rate']:.1%}"
+        )
 
     @classmethod
     def get_metadata(cls, schema: Dict) -> Dict[str, str]:
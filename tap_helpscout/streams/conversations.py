@@ -1,4 +1,18 @@
+from typing import Dict, List, Set, Tuple
+
+import singer
+
+from tap_helpscout.helpers import get_int_config, parse_date
+from tap_helpscout.pipeline import ordered_map
+
 from .abstract import IncrementalStream
+from .mailboxes import MailBoxes
+
+logger = singer.get_logger()
+
+SHARD_MODES = ("mailbox", "mailbox_status")
+# Statuses a mailbox partition is split into, together they cover `status=all`
+STATUSES = ("active", "pending", "closed", "spam")
 
 
 class Conversations(IncrementalStream):
@@ -10,7 +24,90 @@ class Conversations(IncrementalStream):
     replication_key_type = "datetime"
     valid_replication_keys = ("updated_at",)
     replication_query_field = "modifiedSince"
+    window_query_field = "modifiedAt"
     data_key = "conversations"
     params = {"status": "all", "sortField": "modifiedAt", "sortOrder": "asc"}
     child_streams = ["conversation_threads"]
+    embeddable_child_streams = ["conversation_threads"]
+    fingerprinted_child_streams = ["conversation_threads"]
+    # The payload has no timestamp of the last thread, a new thread of the customer or a user
+    # changes the count and a customer reply the waiting time, tag or status updates change neither
+    child_fingerprint_fields = ("threads", "customer_waiting_since")
     is_child = False
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Sync a partition per mailbox, or per mailbox and status, each with its own bookmark
+        self.shard_by = self.config.get("shard_conversations")
+        if self.shard_by and self.shard_by not in SHARD_MODES:
+            raise ValueError(
+                f"Unsupported shard_conversations {self.shard_by}, expected one of {', '.join(SHARD_MODES)}"
+            )
+        # Number of partitions synced concurrently
+        self.partition_workers = get_int_config(self.config, "partition_workers", 1)
+
+    def get_partitions(self) -> List[Tuple[str, Dict]]:
+        """Lists the mailboxes and returns the key and request params of each
+        partition."""
+        # The listing is not checkpointed and writes no state, its page cursor is not part of the sync
+        config = {key: value for key, value in self.config.items() if key != "checkpoint_pages"}
+        mailboxes = MailBoxes(self.client, self.start_date, config, self.writer)
+        partitions = []
+        for mailbox in mailboxes.get_records({}):
+            if self.shard_by == "mailbox_status":
+                partitions.extend(
+                    (f"{mailbox['id']}:{status}", {"mailbox": mailbox["id"], "status": status}) for status in STATUSES
+                )
+            else:
+                partitions.append((str(mailbox["id"]), {"mailbox": mailbox["id"]}))
+        return partitions
+
+    def sync_partition(self, state: Dict, schema: Dict, stream_metadata: Dict, partition: str,
+                       partition_params: Dict) -> Set:
+        """Writes the records of a partition modified since its bookmark and
+        saves its new bookmark."""
+        logger.info(f"Starting sync for stream {self.tap_stream_id} partition {partition}")
+        params = {**self.params, self.replication_query_field: self.get_bookmark(state, partition), **partition_params}
+        query_string = "&".join(f"{key}={value}" for key, value in params.items())
+        with self.get_transformer() as transformer:
+            records = (
+                self.transform_record(transformer, record, schema, stream_metadata)
+                for record in self.get_records(state, query_string=query_string)
+            )
+            return self.write_records(state, records, True, partition)
+
+    def sync(self, state: Dict, schema: Dict, stream_metadata: Dict, parent_ids=None, is_child=False):
+        """Syncs the conversations partition by partition when sharding is
+        configured.
+
+        A failed partition does not stop the others, their bookmarks are saved
+        and the first failure is raised once every partition was synced. The
+        stream bookmark is set to the least recent partition bookmark.
+        """
+        if not self.shard_by:
+            return super().sync(state, schema, stream_metadata, parent_ids, is_child)
+        self.kept_fields = self.get_kept_fields(schema, stream_metadata)
+        partitions = self.get_partitions()
+        failures = []
+
+        def sync_partition(partition):
+            key, partition_params = partition
+            try:
+                return self.sync_partition(state, schema, stream_metadata, key, partition_params)
+            except Exception as err:
+                logger.error(f"Sync of stream {self.tap_stream_id} partition {key} failed: {err}")
+                failures.append(err)
+                return set()
+
+        if self.partition_workers > 1:
+            results = ordered_map(sync_partition, partitions, self.partition_workers)
+        else:
+            results = map(sync_partition, partitions)
+        parent_ids = set().union(*results)
+        self.log_stats()
+        if failures:
+            raise failures[0]
+        if partitions:
+            bookmarks = [self.get_bookmark(state, key) for key, _ in partitions]
+            self.write_bookmark(state, min(bookmarks, key=parse_date))
+        return parent_ids
@@ -10,6 +10,7 @@ class Customers(IncrementalStream):
     replication_key_type = "datetime"
     valid_replication_keys = ("updated_at",)
     replication_query_field = "modifiedSince"
+    window_query_field = "modifiedAt"
     data_key = "customers"
     params = {"sortField": "modifiedAt", "sortOrder": "asc"}
     is_child = False
@@ -1,52 +1,265 @@
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
 
 from singer import (
     Catalog,
     get_logger,
     metadata,
     set_currently_syncing,
-    write_schema,
-    write_state,
 )
 
 from .client import HelpScoutClient
+from .fingerprints import FingerprintStore
+from .helpers import get_bool_config, get_float_config, get_int_config, get_str_config
+from .output import StateManager, get_writer
+from .parent_queue import ParentQueue
+from .pipeline import Handoff
 from .streams import STREAMS
+from .streams.abstract import BaseStream
 
 logger = get_logger()
 
 
-def sync(client: HelpScoutClient, catalog: Catalog, state: Dict, start_date: str) -> None:
+def sync(client: HelpScoutClient, catalog: Catalog, state: Dict, start_date: str, config: Dict = None) -> None:
     """Starts performing sync operation for selected streams."""
+    config = config or {}
+    writer = get_writer(config)
+    state_manager = StateManager(
+        writer,
+        get_float_config(config, "state_interval_seconds", 0.0),
+        get_int_config(config, "state_interval_records", 0),
+    )
+    try:
+        sync_streams(client, catalog, state, start_date, config, state_manager)
+    finally:
+        # The pending bookmarks only cover records already written
+        state_manager.flush()
+        writer.close()
+        writer.log_stats()
+        state_manager.log_stats()
+
+
+def sync_streams(client: HelpScoutClient, catalog: Catalog, state: Dict, start_date: str, config: Dict,
+                 state_manager: StateManager) -> None:
+    """Syncs the selected streams, writing their messages with the writer of
+    `state_manager`."""
+    stream_workers = get_int_config(config, "stream_workers", 1)
+    if stream_workers > 1:
+        sync_streams_parallel(client, catalog, state, start_date, config, state_manager, stream_workers)
+        return
     for stream in catalog.get_selected_streams(state):
-        tap_stream_id = stream.tap_stream_id
-        stream_schema = stream.schema.to_dict()
-        stream_metadata = metadata.to_map(stream.metadata)
         # Skip syncing child streams, they'll be synced as part of parent streams
-        if STREAMS[tap_stream_id].is_child:
+        if STREAMS[stream.tap_stream_id].is_child:
             continue
-        logger.info(f"Starting sync for stream {tap_stream_id}")
-        stream_obj = STREAMS[tap_stream_id](client, start_date)
-        state = set_currently_syncing(state, tap_stream_id)
-        write_state(state)
-        write_schema(tap_stream_id, stream_schema, stream_obj.key_properties, stream.replication_key)
-        parent_ids = stream_obj.sync(state, stream_schema, stream_metadata)
-        # Starts the sync for child streams associated with current parent stream
-        if parent_ids and stream_obj.child_streams:
-            for child in stream_obj.child_streams:
-                child_stream = catalog.get_stream(child)
-                # Sync only if the child stream is selected
-                if child_stream.is_selected():
-                    child_stream_id = child_stream.tap_stream_id
-                    child_stream_schema = child_stream.schema.to_dict()
-                    child_stream_metadata = metadata.to_map(child_stream.metadata)
-                    child_stream_obj = STREAMS[child_stream_id](client, start_date)
-                    write_schema(
-                        child_stream_id,
-                        child_stream_schema,
-                        child_stream_obj.key_properties,
-                        child_stream.replication_key,
-                    )
-                    child_stream_obj.sync(state, child_stream_schema, child_stream_metadata, parent_ids, True)
+        state = set_currently_syncing(state, stream.tap_stream_id)
+        state_manager.write(state)
+        sync_stream(client, catalog, stream, state, start_date, config, state_manager)
+
+    state = set_currently_syncing(state, None)
+    state_manager.write(state)
+
+
+def sync_streams_parallel(client: HelpScoutClient, catalog: Catalog, state: Dict, start_date: str, config: Dict,
+                          state_manager: StateManager, stream_workers: int) -> None:
+    """Syncs up to `stream_workers` parent streams, each with its child
+    streams, concurrently.
 
+    The streams share the client and its rate limiter, and write through the
+    same writer, which keeps the messages of each stream in order. The
+    streams being synced are listed in `currently_syncing_streams` and
+    resume first after an interruption.
+    """
+    syncing_streams = state.get("currently_syncing_streams", [])
+    streams = sorted(
+        (stream for stream in catalog.get_selected_streams(state) if not STREAMS[stream.tap_stream_id].is_child),
+        key=lambda stream: stream.tap_stream_id not in syncing_streams,
+    )
     state = set_currently_syncing(state, None)
-    write_state(state)
+
+    def sync_parallel_stream(stream):
+        state_manager.set_stream_syncing(state, stream.tap_stream_id, True)
+        sync_stream(client, catalog, stream, state, start_date, config, state_manager)
+        state_manager.set_stream_syncing(state, stream.tap_stream_id, False)
+
+    executor = ThreadPoolExecutor(max_workers=stream_workers, thread_name_prefix="stream-sync")
+    futures = [executor.submit(sync_parallel_stream, stream) for stream in streams]
+    try:
+        for future in futures:
+            future.result()
+    finally:
+        # Streams not started yet are dropped when one of them fails
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+    state_manager.write(state)
+
+
+def sync_stream(client: HelpScoutClient, catalog: Catalog, stream, state: Dict, start_date: str, config: Dict,
+                state_manager: StateManager) -> None:
+    """Syncs a parent stream followed by its selected child streams."""
+    writer = state_manager.writer
+    tap_stream_id = stream.tap_stream_id
+    stream_schema = stream.schema.to_dict()
+    stream_metadata = metadata.to_map(stream.metadata)
+    logger.info(f"Starting sync for stream {tap_stream_id}")
+    stream_obj = STREAMS[tap_stream_id](client, start_date, config, writer, state_manager)
+    writer.write_schema(tap_stream_id, stream_schema, stream_obj.key_properties, stream.replication_key)
+    embedded_child_streams = set()
+    if get_bool_config(config, "embed_threads"):
+        for child in stream_obj.embeddable_child_streams:
+            child_stream = catalog.get_stream(child)
+            # Child records are written along with their parent records
+            if child_stream and child_stream.is_selected():
+                child_stream_schema = child_stream.schema.to_dict()
+                child_stream_obj = STREAMS[child](client, start_date, config, writer, state_manager)
+                writer.write_schema(
+                    child,
+                    child_stream_schema,
+                    child_stream_obj.key_properties,
+                    child_stream.replication_key,
+                )
+                stream_obj.set_embedded_child(
+                    child_stream_obj, child_stream_schema, metadata.to_map(child_stream.metadata)
+                )
+                embedded_child_streams.add(child)
+    # Child streams synced from the ids of the written parent records
+    synced_children = [
+        child for child in stream_obj.child_streams
+        if child not in embedded_child_streams and catalog.get_stream(child) and catalog.get_stream(child).is_selected()
+    ]
+    parent_queue_path = get_str_config(config, "parent_queue_path")
+    if synced_children and not parent_queue_path:
+        # A sync resumed mid-pagination does not have the ids of the parents on earlier pages
+        stream_obj.checkpoint_pages = 0
+    fingerprints_path = get_str_config(config, "child_fingerprints_path")
+    if synced_children and fingerprints_path and set(synced_children) <= set(stream_obj.fingerprinted_child_streams):
+        stream_obj.child_fingerprints = FingerprintStore(fingerprints_path)
+    try:
+        sync_parent_stream(
+            client, catalog, stream_obj, stream_schema, stream_metadata, synced_children, state, start_date, config,
+            state_manager,
+        )
+    finally:
+        if stream_obj.child_fingerprints:
+            stream_obj.child_fingerprints.log_stats()
+            stream_obj.child_fingerprints.close()
+
+
+def sync_parent_stream(client: HelpScoutClient, catalog: Catalog, stream_obj: BaseStream, stream_schema: Dict,
+                       stream_metadata: Dict, synced_children: List[str], state: Dict, start_date: str, config: Dict,
+                       state_manager: StateManager) -> None:
+    """Syncs a parent stream and the child streams synced from the ids of its
+    written records."""
+    parent_queue_path = get_str_config(config, "parent_queue_path")
+    child_queue_size = get_int_config(config, "child_queue_size", 0)
+    if synced_children and (parent_queue_path or child_queue_size > 0):
+        children = [
+            get_child_stream(client, catalog, stream_obj, child, start_date, config, state_manager)
+            for child in synced_children
+        ]
+        if parent_queue_path:
+            sync_with_parent_queue(
+                stream_obj, stream_schema, stream_metadata, children, state, state_manager, parent_queue_path
+            )
+        else:
+            sync_with_child_handoffs(stream_obj, stream_schema, stream_metadata, children, state, child_queue_size)
+            for child_stream_obj, _, _ in children:
+                end_stream(child_stream_obj, state_manager)
+        end_stream(stream_obj, state_manager)
+        return
+    parent_ids = stream_obj.sync(state, stream_schema, stream_metadata)
+    end_stream(stream_obj, state_manager)
+    # Starts the sync for child streams associated with current parent stream
+    if parent_ids:
+        for child in synced_children:
+            child_stream_obj, child_stream_schema, child_stream_metadata = get_child_stream(
+                client, catalog, stream_obj, child, start_date, config, state_manager
+            )
+            child_stream_obj.sync(state, child_stream_schema, child_stream_metadata, parent_ids, True)
+            end_stream(child_stream_obj, state_manager)
+
+
+def end_stream(stream_obj: BaseStream, state_manager: StateManager) -> None:
+    """Ends the output of a synced stream and of its embedded child stream,
+    then writes the pending state."""
+    state_manager.writer.end_stream(stream_obj.tap_stream_id)
+    if stream_obj.embedded_child:
+        state_manager.writer.end_stream(stream_obj.embedded_child[0].tap_stream_id)
+    state_manager.flush()
+
+
+def get_child_stream(client: HelpScoutClient, catalog: Catalog, stream_obj: BaseStream, child: str, start_date: str,
+                     config: Dict, state_manager: StateManager) -> Tuple[BaseStream, Dict, Dict]:
+    """Creates a child stream of `stream_obj` and writes its SCHEMA message,
+    returns it with its schema and metadata."""
+    child_stream = catalog.get_stream(child)
+    child_stream_schema = child_stream.schema.to_dict()
+    child_stream_obj = STREAMS[child](client, start_date, config, state_manager.writer, state_manager)
+    child_stream_obj.parent_fingerprints = stream_obj.child_fingerprints
+    state_manager.writer.write_schema(
+        child,
+        child_stream_schema,
+        child_stream_obj.key_properties,
+        child_stream.replication_key,
+    )
+    return child_stream_obj, child_stream_schema, metadata.to_map(child_stream.metadata)
+
+
+def sync_with_child_handoffs(stream_obj: BaseStream, stream_schema: Dict, stream_metadata: Dict,
+                             children: List[Tuple[BaseStream, Dict, Dict]], state: Dict, queue_size: int) -> None:
+    """Syncs a parent stream while its child streams sync the written parent
+    ids, each on its own thread fed through a queue of `queue_size` ids.
+
+    The parent waits while a queue is full, so the ids held in memory stay
+    bounded. The child streams are stopped when the parent fails, and a
+    failed child stream stops the parent.
+    """
+    stream_obj.child_handoffs = [
+        Handoff(
+            lambda parent_ids, child=child: child[0].sync(state, child[1], child[2], parent_ids, True),
+            queue_size,
+            f"{child[0].tap_stream_id}-handoff",
+        )
+        for child in children
+    ]
+    try:
+        stream_obj.sync(state, stream_schema, stream_metadata)
+        for handoff in stream_obj.child_handoffs:
+            handoff.close()
+    except BaseException:
+        for handoff in stream_obj.child_handoffs:
+            handoff.cancel()
+        raise
+
+
+def sync_with_parent_queue(stream_obj: BaseStream, stream_schema: Dict, stream_metadata: Dict,
+                           children: List[Tuple[BaseStream, Dict, Dict]], state: Dict, state_manager: StateManager,
+                           path: str) -> None:
+    """Syncs a parent stream, then its child streams from the parent ids
+    persisted in the SQLite file at `path`.
+
+    The file is referenced from `parent_queues` in the state until a child
+    stream has synced every parent id, a sync that was interrupted resumes
+    the child streams with the parents they had not synced yet, along with
+    the ones written by the new parent sync.
+    """
+    streams = [child_stream_obj.tap_stream_id for child_stream_obj, _, _ in children]
+    with ParentQueue(path, streams) as parent_queue:
+        for stream in streams:
+            if state.get("parent_queues", {}).get(stream) == path:
+                logger.info(f"Resuming {stream} with {parent_queue.count(stream)} pending parent ids from {path}")
+            else:
+                # Left over from a sync whose state was not kept
+                parent_queue.clear(stream)
+            state_manager.write_checkpoint(state, "parent_queues", stream, path)
+        stream_obj.child_handoffs = [parent_queue]
+        stream_obj.sync(state, stream_schema, stream_metadata)
+        end_stream(stream_obj, state_manager)
+        for child_stream_obj, child_stream_schema, child_stream_metadata in children:
+            stream = child_stream_obj.tap_stream_id
+            child_stream_obj.parent_queue = parent_queue
+            child_stream_obj.sync(state, child_stream_schema, child_stream_metadata, parent_queue.pending(stream), True)
+            parent_queue.clear(stream)
+            state_manager.write_checkpoint(state, "parent_queues", stream, None)
+            end_stream(child_stream_obj, state_manager)
+        parent_queue.log_stats()
@@ -1,10 +1,33 @@
 import re
+from functools import lru_cache
+
+# _embedded sub-nodes copied up to their record
+DENESTED_NODES = ["attachments", "address", "chats", "emails", "phones", "social_profiles", "websites", "properties"]
+
+# Payloads reuse a small set of key names, the cache is bounded so unusual
+# keys (e.g. custom field names) cannot grow it without limit
+CONVERT_CACHE_SIZE = 4096
+WORD_BOUNDARY = re.compile("(.)([A-Z][a-z]+)")
+CASE_BOUNDARY = re.compile("([a-z0-9])([A-Z])")
 
 
 # Convert camelCase to snake_case
+@lru_cache(maxsize=CONVERT_CACHE_SIZE)
 def convert(name):
-    reg_sub = re.sub("(.)([A-Z][a-z]+)", r"\1_\2", name)
-    return re.sub("([a-z0-9])([A-Z])", r"\1_\2", reg_sub).lower()
+    reg_sub = WORD_BOUNDARY.sub(r"\1_\2", name)
+    return CASE_BOUNDARY.sub(r"\1_\2", reg_sub).lower()
+
+
+# Hit rate counters of the key conversion cache
+def get_convert_cache_stats():
+    info = convert.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+    }
 
 
 # Convert keys in json array
@@ -48,12 +71,17 @@ def denest_embedded_nodes(this_json, path=None):
     if path is None:
         return this_json
     i = 0
-    nodes = ["attachments", "address", "chats", "emails", "phones", "social_profiles", "websites", "properties"]
+    nodes = DENESTED_NODES
     for record in this_json[path]:
         if "_embedded" in record:
             for node in nodes:
                 if node in record["_embedded"]:
                     this_json[path][i][node] = this_json[path][i]["_embedded"][node]
+            # Threads embedded in conversations (embed=threads) carry their own embedded nodes,
+            # they are kept apart from the `threads` count of the conversation
+            if "threads" in record["_embedded"]:
+                threads = denest_embedded_nodes(record["_embedded"], "threads")["threads"]
+                this_json[path][i]["embedded_threads"] = threads
         i = i + 1
     return this_json
 
@@ -97,6 +125,19 @@ def transform_team_users(this_json, path):
     return this_json
 
 
+# Fields the stream specific transforms derive other fields from
+DERIVED_FROM = {
+    "conversations": {"user_updated_at", "customer_waiting_since"},
+    "happiness_ratings_report": {"id", "threadid"},
+    "team_members": {"id"},
+}
+
+
+# Fields kept when a record is pruned to the selected fields, in snake_case
+def get_kept_fields(stream_name, selected_fields):
+    return set(selected_fields) | DERIVED_FROM.get(stream_name, set())
+
+
 # Run all transforms: de-nests _embedded, removes _embedded/_links, and
 # Converts camelCase to snake_case for field_name keys.
 def transform_json(this_json, path, stream_name):
@@ -110,3 +151,58 @@ def transform_json(this_json, path, stream_name):
     elif stream_name == "team_members":
         return transform_team_users(converted_json, path)
     return converted_json
+
+
+# Convert keys and remove _links and _embedded nodes of a nested value
+def convert_value(value):
+    if isinstance(value, dict):
+        return {convert(key): convert_value(val) for key, val in value.items() if key not in {"_embedded", "_links"}}
+    if isinstance(value, list):
+        return [convert_value(item) for item in value]
+    return value
+
+
+# Single pass equivalent of denest_embedded_nodes, remove_embedded_links and
+# convert_json for one record, only the output dict is allocated.
+# Keys outside `kept_fields` are skipped before their values are converted,
+# `embedded_kept_fields` applies to embedded threads
+def convert_record(record, kept_fields=None, embedded_kept_fields=None):
+    denested = {}
+    if "_embedded" in record:
+        embedded = record["_embedded"]
+        for node in DENESTED_NODES:
+            if node in embedded and (kept_fields is None or node in kept_fields):
+                denested[node] = convert_value(embedded[node])
+        if "threads" in embedded and (kept_fields is None or "embedded_threads" in kept_fields):
+            denested["embedded_threads"] = [
+                convert_record(thread, embedded_kept_fields) for thread in embedded["threads"]
+            ]
+    out = {}
+    for key, value in record.items():
+        if key in {"_embedded", "_links"}:
+            continue
+        new_key = convert(key)
+        if kept_fields is not None and new_key not in kept_fields:
+            continue
+        # De-nested nodes replace an existing key in place
+        out[new_key] = denested.pop(key) if key in denested else convert_value(value)
+    for key, value in denested.items():
+        out[convert(key)] = value
+    return out
+
+
+# Single pass equivalent of transform_json for one record of a page, including
+# the stream specific derived fields. `kept_fields` come from get_kept_fields
+def transform_record(record, stream_name, kept_fields=None, embedded_kept_fields=None):
+    out = convert_record(record, kept_fields, embedded_kept_fields)
+    if stream_name == "conversations":
+        user_updated_at = out.get("user_updated_at")
+        customer_waiting_since = out.get("customer_waiting_since", {}).get("time")
+        out["updated_at"] = max(i for i in [user_updated_at, customer_waiting_since] if i is not None)
+    elif stream_name == "happiness_ratings_report":
+        if "id" in out:
+            out["conversation_id"] = out.pop("id")
+        out["thread_id"] = out.pop("threadid")
+    elif stream_name == "team_members":
+        out["user_id"] = out["id"]
+    return out
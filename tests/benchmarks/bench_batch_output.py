@@ -0,0 +1,60 @@
+"""Compares writing transformed conversations to JSONL and Parquet batch
+files, and the size of the files written.
+
+Run with `python tests/benchmarks/bench_batch_output.py`.
+"""
+import io
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from fixtures import conversations_page
+from singer import Transformer, metadata
+
+from tap_helpscout import columnar
+from tap_helpscout.discover import get_schemas
+from tap_helpscout.json_codec import CODECS
+from tap_helpscout.output import BatchWriter
+from tap_helpscout.transform import transform_record
+
+
+def write_batches(records, schema, **kwargs):
+    with tempfile.TemporaryDirectory() as batch_dir, mock.patch("sys.stdout", io.TextIOWrapper(io.BytesIO())):
+        writer = BatchWriter(batch_dir=batch_dir, **kwargs)
+        writer.write_schema("conversations", schema, ["id"])
+        start = time.perf_counter()
+        for record in records:
+            writer.write_record("conversations", record)
+        writer.close()
+        elapsed = time.perf_counter() - start
+        size = sum(path.stat().st_size for path in Path(batch_dir).iterdir())
+    return elapsed, size
+
+
+def main():
+    schemas, schema_metadata = get_schemas()
+    schema = schemas["conversations"]
+    stream_metadata = metadata.to_map(schema_metadata["conversations"])
+    page = [
+        Transformer().transform(transform_record(record, "conversations"), schema, stream_metadata)
+        for record in conversations_page(100)["_embedded"]["conversations"]
+    ]
+    records = page * 200
+    cases = [
+        (f"jsonl {codec.name} {compression}", {"codec": codec, "compression": compression})
+        for codec in CODECS.values() if codec is not None
+        for compression in ("none", "gzip")
+    ]
+    if columnar.pyarrow is not None:
+        cases += [
+            (f"parquet {compression}", {"batch_format": "parquet", "compression": compression})
+            for compression in ("none", "snappy", "zstd")
+        ]
+    for name, kwargs in cases:
+        elapsed, size = write_batches(records, schema, **kwargs)
+        print(f"{name:20} {len(records) / elapsed:9.0f} records/s  {size / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
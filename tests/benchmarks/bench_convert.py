@@ -0,0 +1,43 @@
+"""Compares uncached key conversion with the cached, precompiled one on a
+conversation page with embedded threads.
+
+Run with `python tests/benchmarks/bench_convert.py`.
+"""
+import re
+import timeit
+from unittest import mock
+
+from fixtures import conversations_page
+
+from tap_helpscout import transform
+
+
+# The key conversion before it was cached
+def uncached_convert(name):
+    reg_sub = re.sub("(.)([A-Z][a-z]+)", r"\1_\2", name)
+    return re.sub("([a-z0-9])([A-Z])", r"\1_\2", reg_sub).lower()
+
+
+def transform_page(page):
+    return [transform.transform_record(record, "conversations") for record in page["_embedded"]["conversations"]]
+
+
+def bench(func, number=50):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+
+
+def main():
+    page = conversations_page(threads=4)
+    with mock.patch.object(transform, "convert", uncached_convert):
+        uncached = bench(lambda: transform_page(page))
+    transform.convert.cache_clear()
+    cached = bench(lambda: transform_page(page))
+    stats = transform.get_convert_cache_stats()
+    print("25 conversations with 4 embedded threads each")
+    print(f"  uncached {uncached:7.3f} ms")
+    print(f"  cached   {cached:7.3f} ms  speedup {uncached / cached:5.2f}x")
+    print(f"  cache    {stats['size']} keys, hit rate {stats['hit_rate']:.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Compares the JSON codecs on decoding Help Scout pages and encoding singer
+RECORD messages.
+
+Run with `python tests/benchmarks/bench_json_codec.py`.
+"""
+import json
+import timeit
+
+from fixtures import conversations_page, customers_page, threads_page
+
+from tap_helpscout.json_codec import CODECS
+from tap_helpscout.transform import transform_json
+
+PAGES = {
+    "conversations (embedded threads)": ("conversations", conversations_page(threads=4)),
+    "conversation_threads": ("threads", threads_page()),
+    "customers": ("customers", customers_page()),
+}
+
+
+def bench(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+
+
+def main():
+    codecs = [codec for codec in CODECS.values() if codec is not None]
+    for name, (data_key, page) in PAGES.items():
+        raw = json.dumps(page).encode()
+        records = transform_json(json.loads(raw)["_embedded"], data_key, data_key)[data_key]
+        print(f"{name}: {len(raw) / 1024:.0f} KiB page, {len(records)} records")
+        baseline = None
+        for codec in codecs:
+            decode = bench(lambda: codec.loads(raw), 200)
+            encode = bench(lambda: [codec.dump_record(data_key, record) for record in records], 200)
+            total = decode + encode
+            baseline = baseline or total
+            print(
+                f"  {codec.name:8} decode {decode:7.3f} ms  encode {encode:7.3f} ms  "
+                f"speedup {baseline / total:5.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
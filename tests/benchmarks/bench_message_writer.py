@@ -0,0 +1,49 @@
+"""Compares writing RECORD messages one by one with the buffered message
+writer, to a pipe drained by a child process.
+
+Run with `python tests/benchmarks/bench_message_writer.py`.
+"""
+import io
+import subprocess
+import sys
+import time
+from unittest import mock
+
+from fixtures import conversations_page
+
+from tap_helpscout.json_codec import CODECS
+from tap_helpscout.output import MessageWriter
+from tap_helpscout.transform import transform_record
+
+
+def write_records(records, writer):
+    consumer = subprocess.Popen([sys.executable, "-c", "import sys; sys.stdin.buffer.read()"], stdin=subprocess.PIPE)
+    stdout = io.TextIOWrapper(consumer.stdin, encoding="utf-8")
+    with mock.patch("sys.stdout", stdout):
+        start = time.perf_counter()
+        for record in records:
+            writer.write_record("conversations", record)
+        writer.close()
+        elapsed = time.perf_counter() - start
+    consumer.stdin.close()
+    consumer.wait()
+    return elapsed
+
+
+def main():
+    page = [
+        transform_record(record, "conversations") for record in conversations_page(100)["_embedded"]["conversations"]
+    ]
+    records = page * 200
+    for codec in [codec for codec in CODECS.values() if codec is not None]:
+        for buffer_bytes in (0, 64 * 1024, 1024 * 1024):
+            writer = MessageWriter(codec, buffer_bytes=buffer_bytes)
+            elapsed = write_records(records, writer)
+            print(
+                f"{codec.name:7} buffer {buffer_bytes // 1024:5} KiB  {len(records) / elapsed:9.0f} records/s  "
+                f"blocked {writer.seconds_blocked:6.3f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Compares parse_date with the previous strptime loop on bookmark values of
+each supported format.
+
+Run with `python tests/benchmarks/bench_parse_date.py`.
+"""
+import timeit
+from datetime import datetime, timedelta
+
+from tap_helpscout.helpers import DATE_FORMATS, parse_date
+
+
+# parse_date before the ISO-8601 fast path
+def strptime_date(date_value):
+    date_formats = set(DATE_FORMATS)
+    for date_format in date_formats:
+        try:
+            return datetime.strptime(date_value, date_format)
+        except ValueError:
+            continue
+
+
+def bench(func, values, number=20):
+    return min(timeit.repeat(lambda: [func(value) for value in values], number=number, repeat=5)) / number
+
+
+def main():
+    instants = [datetime(2023, 1, 1) + timedelta(seconds=97 * i, microseconds=i) for i in range(5000)]
+    for date_format in DATE_FORMATS:
+        values = [instant.strftime(date_format) for instant in instants]
+        before = bench(strptime_date, values) / len(values) * 1e6
+        after = bench(parse_date, values) / len(values) * 1e6
+        print(f"{date_format:28} strptime {before:6.2f} us  fast path {after:6.2f} us  speedup {before / after:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
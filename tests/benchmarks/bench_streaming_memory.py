@@ -0,0 +1,46 @@
+"""Compares the peak memory of transforming a whole page with streaming its
+records one at a time.
+
+Run with `python tests/benchmarks/bench_streaming_memory.py`.
+"""
+import io
+import json
+import tracemalloc
+
+from fixtures import conversations_page
+
+from tap_helpscout.json_codec import iter_items
+from tap_helpscout.transform import transform_json
+
+
+def whole_page(raw):
+    data = json.loads(raw)
+    for record in transform_json(data["_embedded"], "conversations", "conversations")["conversations"]:
+        yield record
+
+
+def streamed(raw):
+    for kind, value in iter_items(io.BytesIO(raw), "_embedded.conversations.item"):
+        if kind == "item":
+            yield transform_json({"conversations": [value]}, "conversations", "conversations")["conversations"][0]
+
+
+def peak_memory(func, raw):
+    tracemalloc.start()
+    for _ in func(raw):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    for size, threads in ((25, 0), (25, 20), (50, 50)):
+        raw = json.dumps(conversations_page(size, threads)).encode()
+        print(f"{size} conversations with {threads} embedded threads, {len(raw) / 1024:.0f} KiB page")
+        for name, func in (("whole page", whole_page), ("streamed", streamed)):
+            print(f"  {name:10} peak {peak_memory(func, raw) / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Compares the three pass transform_json with the fused single pass record
+transform.
+
+Run with `python tests/benchmarks/bench_transform.py`.
+"""
+import timeit
+
+from fixtures import conversations_page, customers_page, fresh, threads_page
+
+from tap_helpscout.transform import get_kept_fields, transform_json, transform_record
+
+PAGES = {
+    "conversations": ("conversations", "conversations", conversations_page()),
+    "conversations (embedded threads)": ("conversations", "conversations", conversations_page(threads=4)),
+    "conversation_threads": ("threads", "conversation_threads", threads_page()),
+    "customers": ("customers", "customers", customers_page()),
+}
+
+
+def bench(func, setup, number=50):
+    # transform_json mutates its input, every run gets a fresh copy outside the timing
+    total = 0.0
+    for _ in range(number):
+        data = setup()
+        total += timeit.timeit(lambda: func(data), number=1)
+    return total / number * 1000
+
+
+def main():
+    for name, (data_key, stream_name, page) in PAGES.items():
+        records = len(page["_embedded"][data_key])
+        three_pass = bench(lambda data: transform_json(data, data_key, stream_name), lambda: fresh(page["_embedded"]))
+        fused = bench(lambda data: [transform_record(record, stream_name) for record in data[data_key]],
+                      lambda: fresh(page["_embedded"]))
+        print(
+            f"{name}: {records} records  transform_json {three_pass:7.3f} ms  fused {fused:7.3f} ms  "
+            f"speedup {three_pass / fused:5.2f}x"
+        )
+    # A catalog selecting a few columns, the rest is pruned before conversion
+    page = conversations_page(threads=4)
+    kept_fields = get_kept_fields("conversations", {"id", "number", "subject", "status", "updated_at"})
+    fused = bench(lambda data: [transform_record(record, "conversations") for record in data["conversations"]],
+                  lambda: page["_embedded"])
+    pruned = bench(lambda data: [transform_record(record, "conversations", kept_fields)
+                                 for record in data["conversations"]], lambda: page["_embedded"])
+    print(f"conversations, 5 fields selected: fused {fused:7.3f} ms  pruned {pruned:7.3f} ms  "
+          f"speedup {fused / pruned:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
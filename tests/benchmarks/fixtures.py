@@ -0,0 +1,157 @@
+"""Representative Help Scout API pages used by the benchmarks."""
+import copy
+
+
+def person(person_id, person_type="user"):
+    return {
+        "id": person_id,
+        "type": person_type,
+        "first": "Jane",
+        "last": "Doe",
+        "photoUrl": f"https://d33v4339jhl8k0.cloudfront.net/users/{person_id}.jpg",
+        "email": f"jane.doe{person_id}@example.com",
+    }
+
+
+def links(path):
+    return {
+        "self": {"href": f"https://api.helpscout.net/v2{path}"},
+        "mailbox": {"href": "https://api.helpscout.net/v2/mailboxes/1"},
+        "createdByUser": {"href": "https://api.helpscout.net/v2/users/7"},
+    }
+
+
+def thread(conversation_id, index):
+    thread_id = conversation_id * 100 + index
+    return {
+        "id": thread_id,
+        "type": "customer" if index % 2 else "message",
+        "status": "active",
+        "state": "published",
+        "action": {"type": "default", "text": "", "associatedEntities": {}},
+        "body": "<div>Hello, I have a question about my last invoice. " * 8 + "</div>",
+        "source": {"type": "email", "via": "customer"},
+        "customer": person(5000 + conversation_id, "customer"),
+        "createdBy": person(7),
+        "assignedTo": person(7),
+        "savedReplyId": 0,
+        "to": ["support@example.com"],
+        "cc": [],
+        "bcc": [],
+        "createdAt": f"2023-01-{1 + index % 28:02d}T12:{index % 60:02d}:00Z",
+        "openedAt": "2023-01-22T12:00:00Z",
+        "_embedded": {
+            "attachments": [
+                {
+                    "id": thread_id,
+                    "filename": "invoice.pdf",
+                    "mimeType": "application/pdf",
+                    "width": 0,
+                    "height": 0,
+                    "size": 18234,
+                    "_links": {"data": {"href": f"https://api.helpscout.net/v2/attachments/{thread_id}/data"}},
+                }
+            ]
+        },
+        "_links": links(f"/conversations/{conversation_id}/threads/{thread_id}"),
+    }
+
+
+def conversation(conversation_id, threads=0):
+    record = {
+        "id": conversation_id,
+        "number": conversation_id + 1000,
+        "threads": 4,
+        "type": "email",
+        "folderId": 1234,
+        "status": "active",
+        "state": "published",
+        "subject": "Question about my last invoice",
+        "preview": "Hello, I have a question about my last invoice and the charges on it...",
+        "mailboxId": 1,
+        "assignee": person(7),
+        "createdBy": person(5000 + conversation_id, "customer"),
+        "createdAt": "2023-01-01T08:00:00Z",
+        "closedBy": 0,
+        "closedAt": None,
+        "userUpdatedAt": f"2023-01-{1 + conversation_id % 28:02d}T10:00:00Z",
+        "customerWaitingSince": {
+            "time": f"2023-01-{1 + conversation_id % 28:02d}T11:00:00Z",
+            "friendly": "2 hours ago",
+            "lastReplyFrom": "customer",
+        },
+        "source": {"type": "email", "via": "customer"},
+        "tags": [{"id": 10 + i, "color": "#929499", "tag": f"tag-{i}"} for i in range(3)],
+        "cc": ["cc@example.com"],
+        "bcc": [],
+        "primaryCustomer": person(5000 + conversation_id, "customer"),
+        "customFields": [
+            {"id": 8000 + i, "name": f"Field {i}", "value": str(i), "text": f"Value {i}"} for i in range(4)
+        ],
+        "_embedded": {},
+        "_links": links(f"/conversations/{conversation_id}"),
+    }
+    if threads:
+        record["_embedded"]["threads"] = [thread(conversation_id, index) for index in range(threads)]
+    return record
+
+
+def conversations_page(size=25, threads=0):
+    """Returns a page of the list conversations endpoint."""
+    return {
+        "_embedded": {"conversations": [conversation(1 + i, threads) for i in range(size)]},
+        "_links": {"self": {"href": "https://api.helpscout.net/v2/conversations?page=1"}},
+        "page": {"size": size, "totalElements": size * 40, "totalPages": 40, "number": 1},
+    }
+
+
+def threads_page(conversation_id=1, size=50):
+    """Returns a page of the list conversation threads endpoint."""
+    return {
+        "_embedded": {"threads": [thread(conversation_id, index) for index in range(size)]},
+        "page": {"size": size, "totalElements": size, "totalPages": 1, "number": 1},
+    }
+
+
+def customers_page(size=50):
+    """Returns a page of the list customers endpoint."""
+    return {
+        "_embedded": {
+            "customers": [
+                {
+                    "id": customer_id,
+                    "firstName": "Jane",
+                    "lastName": "Doe",
+                    "gender": "unknown",
+                    "jobTitle": "CFO",
+                    "location": "Boston, MA",
+                    "organization": "Example Inc",
+                    "photoType": "gravatar",
+                    "photoUrl": "https://example.com/photo.jpg",
+                    "age": "30-35",
+                    "createdAt": "2022-06-01T08:00:00Z",
+                    "updatedAt": f"2023-01-{1 + customer_id % 28:02d}T10:00:00Z",
+                    "background": "Long time customer. " * 5,
+                    "_embedded": {
+                        "address": {"city": "Boston", "state": "MA", "postalCode": "02110", "country": "US",
+                                    "lines": ["1 Main St"]},
+                        "emails": [{"id": customer_id * 10 + i, "value": f"jane{i}@example.com", "type": "work"}
+                                   for i in range(2)],
+                        "websites": [{"id": customer_id, "value": "https://example.com"}],
+                        "chats": [{"id": customer_id, "value": "jane", "type": "aim"}],
+                        "phones": [{"id": customer_id, "value": "555-0100", "type": "work"}],
+                        "socialProfiles": [{"id": customer_id, "value": "https://twitter.com/jane", "type": "twitter"}],
+                        "properties": [{"type": "text", "slug": "plan", "name": "Plan", "value": "pro"}],
+                    },
+                    "_links": links(f"/customers/{customer_id}"),
+                }
+                for customer_id in range(1, size + 1)
+            ]
+        },
+        "page": {"size": size, "totalElements": size, "totalPages": 1, "number": 1},
+    }
+
+
+def fresh(page):
+    """Returns a copy of a page, transforms mutate their input."""
+    return copy.deepcopy(page)
@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from tap_helpscout import exceptions
+from tap_helpscout.client import HelpScoutClient
+from tap_helpscout.streams import Customers, MailBoxFields
+
+try:
+    from aiohttp import web
+
+    from tap_helpscout.async_client import AsyncHelpScoutClient
+except ImportError:
+    web = None
+
+
+def mock_config_params():
+    return {
+        "client_id": "client_id",
+        "client_secret": "client_secret",
+        "refresh_token": "refresh_token",
+        "user_agent": "user_agent",
+        "access_token": "access_token",
+    }
+
+
+class MockServer:
+    """Serves Help Scout like responses from a background thread."""
+
+    def __init__(self):
+        self.requests = []
+        self.responses = {}
+        self.loop = asyncio.new_event_loop()
+        self.runner = None
+        self.url = None
+
+    async def handle(self, request):
+        self.requests.append((request.path, dict(request.query), dict(request.headers)))
+        status, body, headers = self.responses.get(request.path, (200, None, {}))
+        if callable(body):
+            body = body(request)
+        if isinstance(status, list):
+            status = status.pop(0) if len(status) > 1 else status[0]
+        return web.json_response(body, status=status, headers=headers)
+
+    async def start_app(self):
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    def start(self):
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self.start_app(), self.loop).result()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def get_page(data_key, page, total_pages, ids):
+    return {
+        "_embedded": {data_key: [{"id": record_id, "updatedAt": "2023-01-01T00:00:00Z"} for record_id in ids]},
+        "page": {"number": page, "totalPages": total_pages},
+    }
+
+
+@unittest.skipIf(web is None, "aiohttp is not installed")
+class TestAsyncClient(unittest.TestCase):
+    def setUp(self):
+        self.server = MockServer()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        patcher = mock.patch("tap_helpscout.async_client.BASE_URL", self.server.url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = HelpScoutClient("", mock_config_params(), dev_mode=True)
+
+    def request(self, path):
+        async def run():
+            async with AsyncHelpScoutClient(self.client) as client:
+                return await client.get(path, params="a=1", endpoint="customers")
+
+        return asyncio.run(run())
+
+    def test_successful_request(self):
+        """Verifies the json response is returned and the request is
+        authenticated."""
+        self.server.responses["/customers"] = (200, {"page": {"number": 1}}, {})
+        self.assertEqual(self.request("/customers"), {"page": {"number": 1}})
+        path, query, headers = self.server.requests[0]
+        self.assertEqual(query, {"a": "1"})
+        self.assertEqual(headers["Authorization"], "Bearer access_token")
+        self.assertEqual(headers["User-Agent"], "user_agent")
+
+    def test_other_success_statuses(self):
+        """Verifies 2xx responses other than 200 are not raised, a response
+        without a body returns None."""
+        self.server.responses["/customers"] = (202, {"page": {}}, {})
+        self.assertEqual(self.request("/customers"), {"page": {}})
+        self.server.responses["/empty"] = (204, None, {})
+        self.assertIsNone(self.request("/empty"))
+
+    def test_error_response(self):
+        """Verifies error status codes raise the same exceptions as the
+        synchronous client."""
+        self.server.responses["/customers"] = (404, {}, {})
+        with self.assertRaises(exceptions.Http404Error):
+            self.request("/customers")
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_429_is_retried(self):
+        """Verifies a 429 response is retried after the Retry-After delay."""
+        self.server.responses["/customers"] = ([429, 200], {"page": {}}, {"Retry-After": "0"})
+        self.assertEqual(self.request("/customers"), {"page": {}})
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_stream_pages(self):
+        """Verifies a parent stream fetches all pages with the asyncio client
+        and yields records in page order."""
+        self.server.responses["/customers"] = (
+            200,
+            lambda request: get_page("customers", int(request.query["page"]), 4, [int(request.query["page"])]),
+            {},
+        )
+        stream = Customers(self.client, "2019-01-01T00:00:00Z", {"async_requests": True})
+        with mock.patch.object(Customers, "params", {}):
+            self.assertEqual([record["id"] for record in stream.get_records({})], [1, 2, 3, 4])
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_first_page_not_requested_again(self):
+        """Verifies a page already requested is passed through, only the
+        following pages are requested."""
+        self.server.responses["/customers"] = (
+            200,
+            lambda request: get_page("customers", int(request.query["page"]), 3, [int(request.query["page"])]),
+            {},
+        )
+        stream = Customers(self.client, "2019-01-01T00:00:00Z", {"async_requests": True})
+        with mock.patch.object(Customers, "params", {}):
+            pages = stream.get_pages({}, first_page=get_page("customers", 1, 3, [1]))
+            self.assertEqual([page["page"]["number"] for page in pages], [1, 2, 3])
+        self.assertEqual(sorted(query["page"] for _, query, _ in self.server.requests), ["2", "3"])
+
+    @mock.patch("tap_helpscout.streams.abstract.singer.write_record")
+    def test_child_stream_sync(self, mocked_write_record):
+        """Verifies child records of all parents are written in parent order
+        with the parent id injected."""
+        for mailbox_id in range(1, 6):
+            self.server.responses[f"/mailboxes/{mailbox_id}/fields"] = (
+                200,
+                get_page("fields", 1, 1, [mailbox_id * 10, mailbox_id * 10 + 1]),
+                {},
+            )
+        stream = MailBoxFields(self.client, "2019-01-01T00:00:00Z", {"async_requests": "true"})
+        schema = {"type": "object", "properties": {"id": {"type": "integer"}, "mailbox_id": {"type": "integer"}}}
+        stream.sync({}, schema, {}, [1, 2, 3, 4, 5], True)
+        records = [call.args[1] for call in mocked_write_record.call_args_list]
+        self.assertEqual([record["id"] for record in records], [10, 11, 20, 21, 30, 31, 40, 41, 50, 51])
+        self.assertEqual([record["mailbox_id"] for record in records], [1, 1, 2, 2, 3, 3, 4, 4, 5, 5])
@@ -0,0 +1,113 @@
+import gzip
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from urllib.parse import urlparse
+
+from tap_helpscout.json_codec import JsonCodec
+from tap_helpscout.output import BatchWriter, MessageWriter, get_writer
+
+
+class TestBatchWriter(unittest.TestCase):
+    def setUp(self):
+        self.stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+        patcher = mock.patch("sys.stdout", self.stdout)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.batch_dir = directory.name
+
+    def get_messages(self):
+        self.stdout.flush()
+        return [json.loads(line) for line in self.stdout.buffer.getvalue().splitlines()]
+
+    @staticmethod
+    def read_batch(message):
+        path = urlparse(message["manifest"][0]).path
+        opener = gzip.open if message["encoding"]["compression"] == "gzip" else open
+        with opener(path, "rb") as batch:
+            return [json.loads(line) for line in batch.read().splitlines()]
+
+    def test_batches_rotated(self):
+        """Verifies batches are finalized at the row limit and on close, with
+        gzip compressed JSONL contents."""
+        writer = BatchWriter(JsonCodec(), self.batch_dir, max_rows=2)
+        for record_id in range(5):
+            writer.write_record("users", {"id": record_id})
+        self.assertEqual(len(self.get_messages()), 2)
+        writer.close()
+        messages = self.get_messages()
+        self.assertEqual([message["type"] for message in messages], ["BATCH"] * 3)
+        self.assertEqual(messages[0]["encoding"], {"format": "jsonl", "compression": "gzip"})
+        self.assertEqual([self.read_batch(message) for message in messages],
+                         [[{"id": 0}, {"id": 1}], [{"id": 2}, {"id": 3}], [{"id": 4}]])
+        self.assertEqual(len(list(Path(self.batch_dir).iterdir())), 3)
+        self.assertEqual(writer.batches_written, 3)
+
+    def test_batches_rotated_on_bytes(self):
+        """Verifies batches are finalized at the uncompressed byte limit."""
+        writer = BatchWriter(JsonCodec(), self.batch_dir, max_bytes=20, compression="none")
+        for record_id in range(4):
+            writer.write_record("users", {"id": record_id, "name": "Jane"})
+        writer.close()
+        messages = self.get_messages()
+        self.assertEqual(len(messages), 4)
+        self.assertEqual(self.read_batch(messages[0]), [{"id": 0, "name": "Jane"}])
+        self.assertTrue(messages[0]["manifest"][0].endswith(".jsonl"))
+
+    def test_state_follows_batches(self):
+        """Verifies a STATE message is written only once every batch holding
+        records written before it is finalized, superseded states are
+        dropped."""
+        writer = BatchWriter(JsonCodec(), self.batch_dir, max_rows=2)
+        writer.write_state({"bookmarks": {}})
+        writer.write_record("users", {"id": 1})
+        writer.write_record("teams", {"id": 1})
+        writer.write_state({"bookmarks": {"users": 1}})
+        writer.write_state({"bookmarks": {"users": 2}})
+        writer.write_record("users", {"id": 2})
+        self.assertEqual([message["type"] for message in self.get_messages()], ["STATE", "BATCH"])
+        writer.write_record("teams", {"id": 2})
+        messages = self.get_messages()
+        self.assertEqual([message["type"] for message in messages], ["STATE", "BATCH", "BATCH", "STATE"])
+        self.assertEqual(messages[-1]["value"], {"bookmarks": {"users": 2}})
+
+        writer.write_record("users", {"id": 3})
+        writer.write_state({"bookmarks": {"users": 3}})
+        writer.close()
+        messages = self.get_messages()
+        self.assertEqual([message["type"] for message in messages[4:]], ["BATCH", "STATE"])
+        self.assertEqual(messages[-1]["value"], {"bookmarks": {"users": 3}})
+
+    def test_state_written_at_stream_end(self):
+        """Verifies the batch of a stream is finalized when its sync ends, so
+        a STATE message waiting on it is written before the writer is
+        closed."""
+        writer = BatchWriter(JsonCodec(), self.batch_dir)
+        writer.write_record("users", {"id": 1})
+        writer.write_state({"bookmarks": {"users": 1}})
+        self.assertEqual(self.get_messages(), [])
+        writer.end_stream("teams")
+        self.assertEqual(self.get_messages(), [])
+        writer.end_stream("users")
+        messages = self.get_messages()
+        self.assertEqual([message["type"] for message in messages], ["BATCH", "STATE"])
+        self.assertEqual(self.read_batch(messages[0]), [{"id": 1}])
+        writer.close()
+        self.assertEqual(len(self.get_messages()), 2)
+
+    def test_get_writer(self):
+        """Verifies the writer is chosen by the output_mode config value."""
+        self.assertIs(type(get_writer({})), MessageWriter)
+        writer = get_writer({"output_mode": "batch", "batch_dir": self.batch_dir, "batch_max_rows": "10",
+                             "batch_compression": "none"})
+        self.assertIsInstance(writer, BatchWriter)
+        self.assertEqual((writer.max_rows, writer.compression), (10, "none"))
+        with self.assertRaises(ValueError):
+            get_writer({"output_mode": "csv"})
+        with self.assertRaises(ValueError):
+            get_writer({"output_mode": "batch", "batch_dir": self.batch_dir, "batch_compression": "zstd"})
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from singer import metadata
+
+from tap_helpscout.fingerprints import FingerprintStore
+from tap_helpscout.sync import sync
+
+from test_embedded_threads import get_catalog
+
+
+class MockClient:
+    def __init__(self, conversations):
+        self.conversations = conversations
+        self.requests = []
+
+    def get(self, path, params, endpoint):
+        self.requests.append(path)
+        if path == "/conversations":
+            conversations = [
+                {"id": conversation_id, "userUpdatedAt": "2023-01-02T00:00:00Z", "threads": threads,
+                 "customerWaitingSince": {"time": waiting_since}}
+                for conversation_id, threads, waiting_since in self.conversations
+            ]
+            return {"_embedded": {"conversations": conversations}, "page": {"number": 1, "totalPages": 1}}
+        conversation_id = int(path.split("/")[2])
+        return {"_embedded": {"threads": [{"id": conversation_id * 10}]}, "page": {"number": 1, "totalPages": 1}}
+
+
+@mock.patch("tap_helpscout.output.MessageWriter.write_state")
+@mock.patch("tap_helpscout.output.MessageWriter.write_schema")
+@mock.patch("tap_helpscout.streams.abstract.singer.write_record")
+class TestChildFingerprints(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "fingerprints.db")
+
+    def test_store(self, *_):
+        """Verifies a fingerprint is only stored once committed, and unchanged
+        fingerprints are counted."""
+        with FingerprintStore(self.path) as fingerprints:
+            self.assertTrue(fingerprints.changed(1, "a"))
+            # Not committed, the child records were not written
+            self.assertTrue(fingerprints.changed(1, "a"))
+            fingerprints.commit(1)
+            self.assertFalse(fingerprints.changed(1, "a"))
+            self.assertTrue(fingerprints.changed(1, "b"))
+            self.assertEqual((fingerprints.checked, fingerprints.unchanged, fingerprints.committed), (4, 1, 1))
+        with FingerprintStore(self.path) as fingerprints:
+            self.assertFalse(fingerprints.changed(1, "a"))
+
+    def test_unchanged_threads_skipped(self, *_):
+        """Verifies threads are only requested for conversations whose thread
+        count or customer waiting time changed, even when those fields are
+        not selected."""
+        catalog = get_catalog({"conversations", "conversation_threads"})
+        stream = catalog.get_stream("conversations")
+        mdata = metadata.to_map(stream.metadata)
+        for field in ("threads", "customer_waiting_since"):
+            mdata = metadata.write(mdata, ("properties", field), "selected", False)
+        stream.metadata = metadata.to_list(mdata)
+        config = {"child_fingerprints_path": self.path}
+        conversations = [(1, 2, "2023-01-01T00:00:00Z"), (2, 1, "2023-01-01T00:00:00Z"), (3, 1, None)]
+
+        client = MockClient(conversations)
+        sync(client, catalog, {}, "2019-01-01T00:00:00Z", config)
+        self.assertEqual(client.requests.count("/conversations"), 1)
+        self.assertEqual(len(client.requests), 4)
+
+        client = MockClient(conversations)
+        sync(client, catalog, {}, "2019-01-01T00:00:00Z", config)
+        self.assertEqual(client.requests, ["/conversations"])
+
+        client = MockClient([(1, 3, "2023-01-01T00:00:00Z"), (2, 1, "2023-01-03T00:00:00Z"), (3, 1, None)])
+        sync(client, catalog, {}, "2019-01-01T00:00:00Z", config)
+        self.assertEqual(client.requests, ["/conversations", "/conversations/1/threads", "/conversations/2/threads"])
+
+    def test_sync_without_config(self, *_):
+        """Verifies threads are requested for every conversation when no
+        config is passed."""
+        catalog = get_catalog({"conversations", "conversation_threads"})
+        client = MockClient([(1, 1, None), (2, 1, None)])
+        sync(client, catalog, {}, "2019-01-01T00:00:00Z")
+        self.assertEqual(len(client.requests), 3)
+
+    def test_fingerprints_disabled(self, *_):
+        """Verifies threads are requested for every conversation by
+        default."""
+        catalog = get_catalog({"conversations", "conversation_threads"})
+        for _ in range(2):
+            client = MockClient([(1, 1, None), (2, 1, None)])
+            sync(client, catalog, {}, "2019-01-01T00:00:00Z", {})
+            self.assertEqual(len(client.requests), 3)
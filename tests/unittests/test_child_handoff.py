@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest import mock
+
+from tap_helpscout.pipeline import Handoff, HandoffCancelled, async_ordered_map, iterate_in_executor
+from tap_helpscout.sync import sync
+
+from test_embedded_threads import get_catalog
+
+PAGES = 3
+
+
+class MockClient:
+    def __init__(self, failing_conversation=None):
+        self.failing_conversation = failing_conversation
+        self.lock = threading.Lock()
+        self.requests = []
+
+    def get(self, path, params, endpoint):
+        with self.lock:
+            self.requests.append(path)
+        if path == "/conversations":
+            page = int(params.rsplit("page=", 1)[1])
+            # Leaves time for the child stream to request threads of the first pages
+            time.sleep(0.05)
+            conversations = [
+                {"id": page * 10 + i, "userUpdatedAt": f"2023-01-0{page}T00:00:00Z", "threads": 1} for i in range(2)
+            ]
+            return {"_embedded": {"conversations": conversations}, "page": {"number": page, "totalPages": PAGES}}
+        conversation_id = int(path.split("/")[2])
+        if conversation_id == self.failing_conversation:
+            raise RuntimeError("Threads failed")
+        return {"_embedded": {"threads": [{"id": conversation_id * 10}]}, "page": {"number": 1, "totalPages": 1}}
+
+
+class TestHandoff(unittest.TestCase):
+    def test_items_consumed_in_order(self):
+        """Verifies the consumer sees every item in order once closed."""
+        consumed = []
+        handoff = Handoff(consumed.extend, 2, "test-handoff")
+        for item in range(10):
+            handoff.put(item)
+        handoff.close()
+        self.assertEqual(consumed, list(range(10)))
+
+    def test_producer_held_back(self):
+        """Verifies `put` blocks while the queue is full."""
+        release = threading.Event()
+
+        def consume(items):
+            release.wait()
+            list(items)
+
+        handoff = Handoff(consume, 2, "test-handoff")
+        handoff.put(1)
+        handoff.put(2)
+        blocked = threading.Thread(target=handoff.put, args=(3,))
+        blocked.start()
+        blocked.join(0.3)
+        self.assertTrue(blocked.is_alive())
+        release.set()
+        blocked.join()
+        handoff.close()
+
+    def test_consumer_error_raised_to_producer(self):
+        """Verifies an error of the consumer is raised by the next `put`."""
+
+        def consume(items):
+            next(items)
+            raise ValueError("Child failed")
+
+        handoff = Handoff(consume, 1, "test-handoff")
+        with self.assertRaises(ValueError):
+            for item in range(100):
+                handoff.put(item)
+
+    def test_consumed_from_event_loop(self):
+        """Verifies a coroutine consuming a handoff through
+        `iterate_in_executor` keeps its event loop running while it waits on
+        the producer."""
+        ticks = []
+
+        async def fetch(item):
+            await asyncio.sleep(0)
+            return item
+
+        async def tick():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0.01)
+
+        async def consume_async(items):
+            ticker = asyncio.ensure_future(tick())
+            consumed = [item async for item in async_ordered_map(fetch, iterate_in_executor(items), 2)]
+            ticker.cancel()
+            return consumed
+
+        consumed = []
+        handoff = Handoff(lambda items: consumed.extend(asyncio.run(consume_async(items))), 2, "test-handoff")
+        handoff.put(1)
+        time.sleep(0.3)
+        handoff.put(2)
+        handoff.close()
+        self.assertEqual(consumed, [1, 2])
+        self.assertGreater(len(ticks), 10)
+
+    def test_cancel(self):
+        """Verifies a cancelled handoff stops its consumer."""
+        errors = []
+
+        def consume(items):
+            try:
+                list(items)
+            except HandoffCancelled as err:
+                errors.append(err)
+                raise
+
+        handoff = Handoff(consume, 5, "test-handoff")
+        handoff.put(1)
+        handoff.cancel()
+        self.assertFalse(handoff.consumer.is_alive())
+        self.assertEqual(len(errors), 1)
+
+
+@mock.patch("tap_helpscout.output.MessageWriter.write_state")
+@mock.patch("tap_helpscout.output.MessageWriter.write_schema")
+@mock.patch("tap_helpscout.streams.abstract.singer.write_record")
+class TestChildHandoff(unittest.TestCase):
+    def test_threads_synced_while_paginating(self, mocked_write_record, mocked_write_schema, _):
+        """Verifies threads are requested before the last page of
+        conversations, every thread is written after its schema, and no
+        parent ids are kept."""
+        client = MockClient()
+        catalog = get_catalog({"conversations", "conversation_threads"})
+        sync(client, catalog, {}, "2019-01-01T00:00:00Z", {"child_queue_size": "2"})
+
+        last_page = max(index for index, path in enumerate(client.requests) if path == "/conversations")
+        first_thread = client.requests.index("/conversations/10/threads")
+        self.assertLess(first_thread, last_page)
+        threads = [call.args[1]["id"] for call in mocked_write_record.call_args_list
+                   if call.args[0] == "conversation_threads"]
+        self.assertEqual(threads, [100, 110, 200, 210, 300, 310])
+        self.assertEqual([call.args[0] for call in mocked_write_schema.call_args_list],
+                         ["conversations", "conversation_threads"])
+
+    def test_child_failure_stops_parent(self, *_):
+        """Verifies a failed child stream fails the sync before the parent
+        pages are all requested."""
+        client = MockClient(failing_conversation=10)
+        catalog = get_catalog({"conversations", "conversation_threads"})
+        with self.assertRaises(RuntimeError):
+            sync(client, catalog, {}, "2019-01-01T00:00:00Z", {"child_queue_size": "1"})
+        self.assertLess(client.requests.count("/conversations"), PAGES)
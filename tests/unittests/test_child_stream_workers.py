@@ -0,0 +1,71 @@
+import time
+import unittest
+from unittest import mock
+
+from singer import metadata
+
+from tap_helpscout.discover import get_schemas
+from tap_helpscout.streams import MailBoxFields, MailBoxFolders
+
+
+class MockClient:
+    def __init__(self):
+        self.requested_paths = []
+
+    def get(self, path, params, endpoint):
+        self.requested_paths.append(path)
+        mailbox_id = int(path.split("/")[2])
+        # Lower mailbox ids respond slower, so responses complete out of order
+        time.sleep(0.01 * (5 - mailbox_id))
+        data_key = path.rsplit("/", 1)[1]
+        return {
+            "_embedded": {
+                data_key: [
+                    {"id": mailbox_id * 100 + i, "name": f"item {i}", "updatedAt": f"2023-01-0{mailbox_id}T00:00:00Z"}
+                    for i in range(3)
+                ]
+            },
+            "page": {"number": 1, "totalPages": 1},
+        }
+
+
+def get_selected_metadata(stream_name):
+    schemas, schema_metadata = get_schemas()
+    mdata = metadata.to_map(schema_metadata[stream_name])
+    mdata = metadata.write(mdata, (), "selected", True)
+    for field in schemas[stream_name]["properties"]:
+        mdata = metadata.write(mdata, ("properties", field), "selected", True)
+    return schemas[stream_name], mdata
+
+
+@mock.patch("tap_helpscout.output.MessageWriter.write_state")
+@mock.patch("tap_helpscout.streams.abstract.singer.write_record")
+class TestChildStreamWorkers(unittest.TestCase):
+    def sync_child(self, stream_class, config, mocked_write_record):
+        schema, mdata = get_selected_metadata(stream_class.tap_stream_id)
+        client = MockClient()
+        state = {}
+        stream_class(client, "2019-01-01T00:00:00Z", config).sync(state, schema, mdata, [1, 2, 3, 4], True)
+        return [call.args[1] for call in mocked_write_record.call_args_list], state, client
+
+    def test_incremental_child_matches_sequential_sync(self, mocked_write_record, mocked_write_state):
+        """Verifies concurrent child syncs write the same records and bookmark
+        as a sequential sync."""
+        sequential_records, sequential_state, _ = self.sync_child(MailBoxFolders, {}, mocked_write_record)
+        mocked_write_record.reset_mock()
+        concurrent_records, concurrent_state, client = self.sync_child(
+            MailBoxFolders, {"child_workers": 3}, mocked_write_record
+        )
+        self.assertEqual(len(client.requested_paths), 4)
+        self.assertEqual(concurrent_records, sequential_records)
+        self.assertEqual(concurrent_state, sequential_state)
+        self.assertEqual(concurrent_state["bookmarks"]["mailbox_folders"], "2023-01-04T00:00:00Z")
+
+    def test_parent_id_is_injected(self, mocked_write_record, mocked_write_state):
+        """Verifies each child record holds the id of the parent it was
+        fetched for."""
+        records, _, _ = self.sync_child(MailBoxFields, {"child_workers": 4}, mocked_write_record)
+        self.assertEqual([record["id"] for record in records], [mailbox * 100 + i for mailbox in (1, 2, 3, 4)
+                                                                for i in range(3)])
+        for record in records:
+            self.assertEqual(record["mailbox_id"], record["id"] // 100)
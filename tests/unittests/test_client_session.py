@@ -0,0 +1,94 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from tap_helpscout.client import HelpScoutClient
+
+
+def mock_config_params(**kwargs):
+    return {
+        "client_id": "client_id",
+        "client_secret": "client_secret",
+        "refresh_token": "refresh_token",
+        "user_agent": "user_agent",
+        "access_token": "access_token",
+        **kwargs,
+    }
+
+
+class MockResponse:
+    status_code = 200
+    headers = {}
+    content = b"{}"
+
+    def json(self):
+        return {}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"page": {"number": 1}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestClientSession(unittest.TestCase):
+    @mock.patch("requests.Session.request", return_value=MockResponse())
+    def test_default_timeouts(self, mocked_request):
+        """Verifies requests are sent with the default connect and read
+        timeouts."""
+        client = HelpScoutClient("", mock_config_params(), dev_mode=True)
+        client.get("/customers")
+        self.assertEqual(mocked_request.call_args.kwargs["timeout"], (10, 300))
+
+    @mock.patch("requests.Session.request", return_value=MockResponse())
+    def test_configured_timeouts(self, mocked_request):
+        """Verifies timeouts are read from the config."""
+        client = HelpScoutClient(
+            "", mock_config_params(connect_timeout="5", read_timeout=30.5, keep_alive="false"), dev_mode=True
+        )
+        client.get("/customers")
+        self.assertEqual(mocked_request.call_args.kwargs["timeout"], (5, 30.5))
+        self.assertEqual(client._HelpScoutClient__session.headers["Connection"], "close")
+
+    def test_other_success_statuses(self):
+        """Verifies 2xx responses other than 200 are not raised, a response
+        without a body returns None, as with the asyncio client."""
+        created, empty = MockResponse(), MockResponse()
+        created.status_code = 201
+        empty.status_code, empty.content = 204, b""
+        client = HelpScoutClient("", mock_config_params(), dev_mode=True)
+        with mock.patch("requests.Session.request", side_effect=[created, empty]):
+            self.assertEqual(client.request("POST", "/customers"), {})
+            self.assertIsNone(client.request("GET", "/customers"))
+
+    def test_pool_size_covers_workers(self):
+        """Verifies the pool holds a connection for each concurrent worker
+        unless configured explicitly."""
+        self.assertEqual(HelpScoutClient("", mock_config_params(), dev_mode=True).pool_maxsize, 10)
+        self.assertEqual(HelpScoutClient("", mock_config_params(child_workers=25), dev_mode=True).pool_maxsize, 25)
+        self.assertEqual(HelpScoutClient("", mock_config_params(pool_maxsize="4"), dev_mode=True).pool_maxsize, 4)
+
+    def test_pool_stats(self):
+        """Verifies connections are reused and counted in the pool
+        statistics."""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_address[1]}/customers"
+
+        with HelpScoutClient("", mock_config_params(), dev_mode=True) as client:
+            for _ in range(3):
+                self.assertEqual(client.request("GET", "", url=url), {"page": {"number": 1}})
+            self.assertEqual(client.get_pool_stats(), {"requests": 3, "connections_opened": 1, "connections_reused": 2})
@@ -0,0 +1,103 @@
+import io
+import json
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+from urllib.parse import urlparse
+
+from singer import Transformer, metadata
+
+from tap_helpscout import columnar
+from tap_helpscout.discover import get_schemas
+from tap_helpscout.json_codec import JsonCodec
+from tap_helpscout.output import BatchWriter, get_writer
+from tap_helpscout.transform import transform_record
+
+CONVERSATION = {
+    "id": 1,
+    "number": 100,
+    "subject": "Invoice",
+    "createdAt": "2023-01-22T09:00:00Z",
+    "userUpdatedAt": "2023-01-22T10:00:00Z",
+    "customerWaitingSince": {"time": "2023-01-22T11:00:00Z", "lastReplyFrom": "customer"},
+    "tags": [{"id": 1, "tag": "vip", "color": "#fff"}],
+    "customFields": [{"id": 1, "name": "Plan", "value": "pro", "text": "Pro"}],
+    "cc": ["a@example.com"],
+    "_links": {"self": {"href": "self"}},
+}
+
+
+@unittest.skipIf(columnar.pyarrow is None, "pyarrow is not installed")
+class TestColumnarOutput(unittest.TestCase):
+    def setUp(self):
+        self.stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+        patcher = mock.patch("sys.stdout", self.stdout)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.batch_dir = directory.name
+        self.schemas, self.metadata = get_schemas()
+
+    def get_messages(self):
+        self.stdout.flush()
+        return [json.loads(line) for line in self.stdout.buffer.getvalue().splitlines()]
+
+    def test_arrow_types(self):
+        """Verifies the arrow schema derived from the conversations schema
+        maps nested fields to structs and lists."""
+        pyarrow = columnar.pyarrow
+        schema = columnar.ColumnLayout(self.schemas["conversations"]).schema
+        self.assertEqual(schema.field("id").type, pyarrow.int64())
+        self.assertEqual(schema.field("updated_at").type, pyarrow.timestamp("us", tz="UTC"))
+        self.assertTrue(pyarrow.types.is_list(schema.field("tags").type))
+        self.assertTrue(pyarrow.types.is_struct(schema.field("tags").type.value_type))
+        self.assertTrue(pyarrow.types.is_list(schema.field("custom_fields").type))
+        self.assertEqual(schema.field("cc").type, pyarrow.list_(pyarrow.string()))
+        self.assertTrue(pyarrow.types.is_struct(schema.field("customer_waiting_since").type))
+        # Every stream schema has an arrow schema
+        for stream_name, stream_schema in self.schemas.items():
+            with self.subTest(stream=stream_name):
+                self.assertEqual(len(columnar.ColumnLayout(stream_schema).schema), len(stream_schema["properties"]))
+
+    def test_parquet_batches(self):
+        """Verifies transformed records are written to Parquet batches read
+        back with their nested values and UTC timestamps."""
+        schema = self.schemas["conversations"]
+        stream_metadata = metadata.to_map(self.metadata["conversations"])
+        writer = BatchWriter(JsonCodec(), self.batch_dir, max_rows=2, batch_format="parquet")
+        writer.write_schema("conversations", schema, ["id"])
+        for conversation_id in range(3):
+            record = transform_record(dict(CONVERSATION, id=conversation_id), "conversations")
+            writer.write_record("conversations", Transformer().transform(record, schema, stream_metadata))
+        writer.close()
+        messages = self.get_messages()
+        self.assertEqual([message["type"] for message in messages], ["SCHEMA", "BATCH", "BATCH"])
+        self.assertEqual(messages[1]["encoding"], {"format": "parquet", "compression": "gzip"})
+
+        tables = [columnar.pyarrow.parquet.read_table(urlparse(message["manifest"][0]).path)
+                  for message in messages[1:]]
+        self.assertEqual([table.num_rows for table in tables], [2, 1])
+        row = tables[0].to_pylist()[1]
+        self.assertEqual(row["id"], 1)
+        self.assertEqual(row["subject"], "Invoice")
+        self.assertEqual(row["updated_at"], datetime(2023, 1, 22, 11, tzinfo=timezone.utc))
+        self.assertEqual(row["customer_waiting_since"]["time"], datetime(2023, 1, 22, 11, tzinfo=timezone.utc))
+        self.assertEqual(row["tags"], [{"id": 1, "tag": "vip", "color": "#fff"}])
+        self.assertEqual(row["custom_fields"][0]["value"], "pro")
+        self.assertEqual(row["cc"], ["a@example.com"])
+        self.assertIsNone(row["bcc"])
+        self.assertEqual(writer.batches_written, 2)
+        self.assertGreater(writer.batch_bytes, 0)
+
+    def test_get_writer_parquet(self):
+        """Verifies the batch format and its compression are read from the
+        config."""
+        writer = get_writer({"output_mode": "batch", "batch_dir": self.batch_dir, "batch_format": "parquet",
+                             "batch_compression": "zstd"})
+        self.assertEqual((writer.batch_format, writer.compression), ("parquet", "zstd"))
+        with self.assertRaises(ValueError):
+            get_writer({"output_mode": "batch", "batch_dir": self.batch_dir, "batch_compression": "zstd"})
+        with self.assertRaises(ValueError):
+            get_writer({"output_mode": "batch", "batch_dir": self.batch_dir, "batch_format": "avro"})
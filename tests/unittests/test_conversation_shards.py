@@ -0,0 +1,116 @@
+import threading
+import unittest
+from urllib.parse import parse_qsl
+
+from tap_helpscout.output import StateManager
+from tap_helpscout.streams import Conversations
+
+from test_child_stream_workers import get_selected_metadata
+from test_state_manager import MockWriter
+
+# Conversations of each mailbox with their status and modification time
+CONVERSATIONS = {
+    1: [(101, "active", "2023-01-02T00:00:00Z"), (102, "closed", "2023-01-05T00:00:00Z")],
+    2: [(201, "pending", "2023-01-03T00:00:00Z"), (202, "spam", "2023-01-04T00:00:00Z")],
+}
+
+
+class MockClient:
+    def __init__(self, failing_mailbox=None):
+        self.failing_mailbox = failing_mailbox
+        self.lock = threading.Lock()
+        self.queries = []
+
+    def get(self, path, params, endpoint):
+        if path == "/mailboxes":
+            mailboxes = [{"id": mailbox_id, "updatedAt": "2023-01-01T00:00:00Z"} for mailbox_id in CONVERSATIONS]
+            return {"_embedded": {"mailboxes": mailboxes}, "page": {"number": 1, "totalPages": 1}}
+        query = dict(parse_qsl(params))
+        with self.lock:
+            self.queries.append(query)
+        mailbox_id = int(query["mailbox"])
+        if mailbox_id == self.failing_mailbox:
+            raise RuntimeError("Mailbox failed")
+        conversations = [
+            {"id": conversation_id, "status": status, "userUpdatedAt": modified_at, "mailboxId": mailbox_id}
+            for conversation_id, status, modified_at in CONVERSATIONS[mailbox_id]
+            if query["status"] in ("all", status) and modified_at >= query["modifiedSince"]
+        ]
+        return {"_embedded": {"conversations": conversations}, "page": {"number": 1, "totalPages": 1}}
+
+
+class TestConversationShards(unittest.TestCase):
+    def sync(self, client, state, config):
+        schema, mdata = get_selected_metadata("conversations")
+        writer = MockWriter()
+        written = []
+        lock = threading.Lock()
+
+        def write_record(stream, record):
+            with lock:
+                written.append(record["id"])
+                writer.records_written += 1
+
+        writer.write_record = write_record
+        stream = Conversations(client, "2023-01-01T00:00:00Z", config, writer, StateManager(writer))
+        parent_ids = stream.sync(state, schema, mdata)
+        self.states = writer.states
+        return written, parent_ids
+
+    def test_mailbox_partitions(self):
+        """Verifies a query is sent per mailbox, each partition keeps its own
+        bookmark and the stream bookmark is the least recent one."""
+        client = MockClient()
+        state = {}
+        written, parent_ids = self.sync(client, state, {"shard_conversations": "mailbox"})
+        self.assertEqual(written, [101, 102, 201, 202])
+        self.assertEqual(parent_ids, {101, 102, 201, 202})
+        self.assertEqual([(query["mailbox"], query["status"]) for query in client.queries],
+                         [("1", "all"), ("2", "all")])
+        self.assertEqual(
+            state["partition_bookmarks"]["conversations"], {"1": "2023-01-05T00:00:00Z", "2": "2023-01-04T00:00:00Z"}
+        )
+        self.assertEqual(state["bookmarks"]["conversations"], "2023-01-04T00:00:00Z")
+
+        # Each partition resumes from its own bookmark
+        client = MockClient()
+        written, _ = self.sync(client, state, {"shard_conversations": "mailbox"})
+        self.assertEqual([query["modifiedSince"] for query in client.queries],
+                         ["2023-01-05T00:00:00Z", "2023-01-04T00:00:00Z"])
+        self.assertEqual(written, [102, 202])
+
+    def test_mailbox_listing_not_checkpointed(self):
+        """Verifies the mailboxes listed for the partitions leave no page
+        checkpoint in the written states."""
+        state = {}
+        self.sync(MockClient(), state, {"shard_conversations": "mailbox", "checkpoint_pages": "1"})
+        self.assertTrue(self.states)
+        self.assertFalse(any("page_checkpoints" in written_state for written_state in self.states))
+        self.assertNotIn("page_checkpoints", state)
+
+    def test_mailbox_status_partitions(self):
+        """Verifies mailboxes are split by status, synced concurrently."""
+        client = MockClient()
+        state = {}
+        written, _ = self.sync(client, state, {"shard_conversations": "mailbox_status", "partition_workers": "4"})
+        self.assertEqual(sorted(written), [101, 102, 201, 202])
+        self.assertEqual(len(client.queries), 8)
+        self.assertEqual(len(state["partition_bookmarks"]["conversations"]), 8)
+        self.assertEqual(state["partition_bookmarks"]["conversations"]["1:closed"], "2023-01-05T00:00:00Z")
+        # Partitions without records keep the stream start
+        self.assertEqual(state["bookmarks"]["conversations"], "2023-01-01T00:00:00Z")
+
+    def test_failed_partition(self):
+        """Verifies a failed mailbox does not stop the others, whose bookmarks
+        are saved, and the stream bookmark is left as it was."""
+        client = MockClient(failing_mailbox=1)
+        state = {}
+        with self.assertRaises(RuntimeError):
+            self.sync(client, state, {"shard_conversations": "mailbox"})
+        self.assertEqual(state["partition_bookmarks"]["conversations"], {"2": "2023-01-04T00:00:00Z"})
+        self.assertNotIn("bookmarks", state)
+
+    def test_unsupported_shard_mode(self):
+        """Verifies an unknown sharding mode is rejected."""
+        with self.assertRaises(ValueError):
+            Conversations(config={"shard_conversations": "team"})
@@ -0,0 +1,91 @@
+import unittest
+from unittest import mock
+
+from singer import metadata
+
+from tap_helpscout.discover import discover
+from tap_helpscout.sync import sync
+
+
+def get_catalog(selected_streams):
+    catalog = discover()
+    for stream in catalog.streams:
+        if stream.tap_stream_id in selected_streams:
+            mdata = metadata.to_map(stream.metadata)
+            mdata = metadata.write(mdata, (), "selected", True)
+            stream.metadata = metadata.to_list(mdata)
+    return catalog
+
+
+class MockClient:
+    def __init__(self):
+        self.requests = []
+
+    def get(self, path, params, endpoint):
+        self.requests.append((path, params))
+        if path == "/conversations":
+            return {
+                "_embedded": {
+                    "conversations": [
+                        {
+                            "id": conversation_id,
+                            "userUpdatedAt": "2023-01-22T12:00:00Z",
+                            "threads": 2,
+                            "_embedded": {
+                                "threads": [
+                                    {"id": conversation_id * 10 + i, "createdAt": "2023-01-22T11:00:00Z"}
+                                    for i in range(2)
+                                ]
+                            },
+                        }
+                        for conversation_id in (1, 2)
+                    ]
+                },
+                "page": {"number": 1, "totalPages": 1},
+            }
+        return {"_embedded": {"threads": [{"id": 99}]}, "page": {"number": 1, "totalPages": 1}}
+
+
+@mock.patch("tap_helpscout.output.MessageWriter.write_state")
+@mock.patch("tap_helpscout.output.MessageWriter.write_schema")
+@mock.patch("tap_helpscout.streams.abstract.singer.write_record")
+class TestEmbeddedThreads(unittest.TestCase):
+    def test_threads_are_written_from_conversation_responses(self, mocked_write_record, *_):
+        """Verifies threads embedded in conversations are written without
+        requesting the threads endpoint."""
+        client = MockClient()
+        catalog = get_catalog({"conversations", "conversation_threads"})
+        sync(client, catalog, {}, "2019-01-01T00:00:00Z", {"embed_threads": "true"})
+
+        self.assertEqual(len(client.requests), 1)
+        self.assertIn("embed=threads", client.requests[0][1])
+        records = [(call.args[0], call.args[1]["id"]) for call in mocked_write_record.call_args_list]
+        self.assertEqual(
+            records,
+            [
+                ("conversations", 1),
+                ("conversation_threads", 10),
+                ("conversation_threads", 11),
+                ("conversations", 2),
+                ("conversation_threads", 20),
+                ("conversation_threads", 21),
+            ],
+        )
+        for call in mocked_write_record.call_args_list:
+            if call.args[0] == "conversation_threads":
+                self.assertEqual(call.args[1]["conversation_id"], call.args[1]["id"] // 10)
+            else:
+                self.assertEqual(call.args[1]["threads"], 2)
+                self.assertNotIn("embedded_threads", call.args[1])
+
+    def test_threads_are_requested_per_conversation_by_default(self, mocked_write_record, *_):
+        """Verifies threads are requested for each conversation when embedding
+        is not enabled."""
+        client = MockClient()
+        catalog = get_catalog({"conversations", "conversation_threads"})
+        sync(client, catalog, {}, "2019-01-01T00:00:00Z", {})
+
+        self.assertNotIn("embed=threads", client.requests[0][1])
+        self.assertEqual(
+            sorted(path for path, _ in client.requests[1:]), ["/conversations/1/threads", "/conversations/2/threads"]
+        )
@@ -0,0 +1,123 @@
+import copy
+import random
+import unittest
+
+from singer import Transformer, metadata
+
+from tap_helpscout.discover import get_schemas
+from tap_helpscout.streams import STREAMS, Conversations, ConversationThreads
+from tap_helpscout.transform import get_kept_fields, transform_record
+
+
+def get_thread(thread_id):
+    return {
+        "id": thread_id,
+        "body": "<div>Hello</div>" * 20,
+        "createdAt": "2023-01-22T12:00:00Z",
+        "createdBy": {"id": 7, "first": "Jane", "photoUrl": "jane.jpg"},
+        "_embedded": {"attachments": [{"id": 1, "mimeType": "text/plain", "_links": {"data": {"href": "data"}}}]},
+        "_links": {"self": {"href": "self"}},
+    }
+
+
+def get_conversation(conversation_id):
+    return {
+        "id": conversation_id,
+        "threads": 2,
+        "subject": "Invoice",
+        "mailboxId": 1,
+        "createdAt": "2023-01-22T09:00:00Z",
+        "userUpdatedAt": "2023-01-22T10:00:00Z",
+        "customerWaitingSince": {"time": "2023-01-22T11:00:00Z", "lastReplyFrom": "customer"},
+        "tags": [{"id": 1, "tag": "vip"}],
+        "customFields": [{"id": 1, "name": "Plan", "value": "pro"}],
+        "_embedded": {"threads": [get_thread(conversation_id * 10 + i) for i in range(2)]},
+        "_links": {"self": {"href": "self"}},
+    }
+
+
+def get_customer(customer_id):
+    return {
+        "id": customer_id,
+        "firstName": "Jane",
+        "updatedAt": "2023-01-22T10:00:00Z",
+        "background": "Long time customer",
+        "_embedded": {
+            "address": {"city": "Boston", "lines": ["1 Main St"]},
+            "emails": [{"id": 1, "value": "jane@example.com"}],
+            "phones": [{"id": 1, "value": "555-0100"}],
+            "social_profiles": [{"id": 1, "value": "jane"}],
+        },
+        "_links": {"self": {"href": "self"}},
+    }
+
+
+def select(stream_metadata, fields):
+    """Returns the stream metadata with only `fields` selected, automatic
+    fields are kept regardless."""
+    stream_metadata = copy.deepcopy(stream_metadata)
+    for breadcrumb, field_metadata in stream_metadata.items():
+        if breadcrumb:
+            field_metadata["selected"] = breadcrumb[1] in fields
+    return stream_metadata
+
+
+class TestFieldPruning(unittest.TestCase):
+    def setUp(self):
+        schemas, schema_metadata = get_schemas()
+        self.schemas = schemas
+        self.metadata = {name: metadata.to_map(value) for name, value in schema_metadata.items()}
+
+    def assert_same_output(self, stream_name, records, selected_fields):
+        schema = self.schemas[stream_name]
+        stream_metadata = select(self.metadata[stream_name], selected_fields)
+        kept_fields = STREAMS[stream_name](config={}).get_kept_fields(schema, stream_metadata)
+        for record in records:
+            expected = Transformer().transform(transform_record(record, stream_name), schema, stream_metadata)
+            pruned = transform_record(record, stream_name, kept_fields)
+            self.assertEqual(Transformer().transform(pruned, schema, stream_metadata), expected)
+            self.assertLessEqual(set(pruned), kept_fields | {"updated_at", "conversation_id", "thread_id", "user_id"})
+
+    def test_random_selections(self):
+        """Verifies pruned records transform to the same output as records
+        pruned by the singer Transformer, for random field selections."""
+        generator = random.Random(5)
+        for stream_name, records in [
+            ("conversations", [get_conversation(1), get_conversation(2)]),
+            ("customers", [get_customer(1)]),
+            ("conversation_threads", [get_thread(1)]),
+            ("happiness_ratings_report", [{"id": 1, "threadid": 10, "ratingCustomerId": 1, "ratingComments": "ok"}]),
+            ("team_members", [{"id": 1, "firstName": "Jane", "email": "jane@example.com"}]),
+        ]:
+            properties = list(self.schemas[stream_name]["properties"])
+            for _ in range(20):
+                selected_fields = set(generator.sample(properties, generator.randrange(len(properties))))
+                with self.subTest(stream=stream_name, selected_fields=selected_fields):
+                    self.assert_same_output(stream_name, records, selected_fields)
+
+    def test_unselected_subtrees_dropped(self):
+        """Verifies unselected nodes are dropped, and embedded threads are
+        pruned to the thread fields."""
+        kept_fields = get_kept_fields("conversations", {"id", "subject", "embedded_threads"})
+        record = transform_record(get_conversation(1), "conversations", kept_fields, {"id", "created_at"})
+        self.assertNotIn("custom_fields", record)
+        self.assertNotIn("tags", record)
+        self.assertEqual(record["embedded_threads"][0], {"id": 10, "created_at": "2023-01-22T12:00:00Z"})
+
+        record = transform_record(get_customer(1), "customers", {"id", "emails"})
+        self.assertEqual(record, {"id": 1, "emails": [{"id": 1, "value": "jane@example.com"}]})
+
+    def test_stream_kept_fields(self):
+        """Verifies streams prune records to the catalog selection, keeping
+        automatic fields and the embedded child records."""
+        stream_metadata = select(self.metadata["conversations"], {"subject"})
+        stream = Conversations(config={})
+        child = ConversationThreads(config={})
+        stream.set_embedded_child(child, self.schemas["conversation_threads"],
+                                  select(self.metadata["conversation_threads"], {"body"}))
+        stream.kept_fields = stream.get_kept_fields(self.schemas["conversations"], stream_metadata)
+        self.assertTrue({"id", "updated_at", "subject", "embedded_threads"} <= stream.kept_fields)
+        self.assertNotIn("custom_fields", stream.kept_fields)
+        record = stream.transform_records({"_embedded": {"conversations": [get_conversation(1)]}})[0]
+        self.assertNotIn("custom_fields", record)
+        self.assertEqual(set(record["embedded_threads"][0]), {"id", "body"})
@@ -0,0 +1,96 @@
+import copy
+import json
+import unittest
+
+from tap_helpscout.transform import transform_json, transform_record
+
+
+def get_thread(thread_id):
+    return {
+        "id": thread_id,
+        "createdBy": {"id": 7, "firstName": "Jane", "photoUrl": "jane.jpg"},
+        "to": ["support@example.com"],
+        "action": {"associatedEntities": {}},
+        "_embedded": {"attachments": [{"id": 1, "mimeType": "text/plain", "_links": {"data": {"href": "data"}}}]},
+        "_links": {"self": {"href": "self"}},
+    }
+
+
+def get_conversation(conversation_id, threads=0):
+    record = {
+        "id": conversation_id,
+        "threads": threads,
+        "mailboxId": 1,
+        "userUpdatedAt": "2023-01-22T10:00:00Z",
+        "customerWaitingSince": {"time": "2023-01-22T11:00:00Z", "lastReplyFrom": "customer"},
+        "tags": [{"id": 1, "tag": "vip", "_links": {"self": {"href": "tag"}}}],
+        "customFields": [[{"FieldId": 1}], "TextValue", None],
+        "_embedded": {},
+        "_links": {"self": {"href": "self"}},
+    }
+    if threads:
+        record["_embedded"]["threads"] = [get_thread(conversation_id * 10 + i) for i in range(threads)]
+    return record
+
+
+def get_customer(customer_id):
+    return {
+        "id": customer_id,
+        "firstName": "Jane",
+        "emails": "replaced in place",
+        "_links": {"self": {"href": "self"}},
+        "_embedded": {
+            "address": {"postalCode": "02110", "lines": ["1 Main St"]},
+            "emails": [{"id": 1, "value": "jane@example.com"}],
+            "chats": [],
+            "phones": [{"id": 1, "value": "555-0100"}],
+            "socialProfiles": [{"id": 1, "value": "jane"}],
+            "social_profiles": [{"id": 2, "profileType": "twitter"}],
+            "websites": [{"id": 1, "value": "https://example.com"}],
+            "properties": [{"slug": "plan", "value": "pro"}],
+        },
+    }
+
+
+class TestFusedTransform(unittest.TestCase):
+    def assert_same_output(self, data, path, stream_name):
+        expected = transform_json(copy.deepcopy(data), path, stream_name)[path]
+        records = [transform_record(record, stream_name) for record in data[path]]
+        # Compare serialized output so key order is checked as well
+        self.assertEqual(json.dumps(records), json.dumps(expected))
+
+    def test_conversations(self):
+        """Verifies conversations, with and without embedded threads, match
+        transform_json."""
+        self.assert_same_output({"conversations": [get_conversation(1), get_conversation(2, 3)]},
+                                "conversations", "conversations")
+
+    def test_conversation_threads(self):
+        """Verifies conversation threads match transform_json."""
+        self.assert_same_output({"threads": [get_thread(1), get_thread(2)]}, "threads", "conversation_threads")
+
+    def test_customers(self):
+        """Verifies de-nested customer nodes match transform_json, including
+        nodes replacing existing keys."""
+        self.assert_same_output({"customers": [get_customer(1), get_customer(2)]}, "customers", "customers")
+
+    def test_happiness_ratings_report(self):
+        """Verifies the ratings report derived fields match transform_json."""
+        data = {
+            "results": [
+                {"id": 1, "threadid": 10, "ratingCustomerId": 1, "ratingCustomerName": "Jane"},
+                {"threadid": 20, "ratingCustomerId": 2},
+            ]
+        }
+        self.assert_same_output(data, "results", "happiness_ratings_report")
+
+    def test_team_members(self):
+        """Verifies team members match transform_json."""
+        self.assert_same_output({"users": [{"id": 1, "firstName": "Jane", "_links": {}}]}, "users", "team_members")
+
+    def test_input_not_mutated(self):
+        """Verifies the fused transform leaves the raw record untouched."""
+        record = get_conversation(1, 2)
+        raw = copy.deepcopy(record)
+        transform_record(record, "conversations")
+        self.assertEqual(record, raw)
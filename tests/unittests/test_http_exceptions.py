@@ -8,10 +8,11 @@ from tap_helpscout import exceptions
 
 
 class MockResponse:
-    def __init__(self, status_code, json, raise_error, content=None):
+    def __init__(self, status_code, json, raise_error, content=None, headers=None):
         self.status_code = status_code
         self.raise_error = raise_error
-        self.text = content
+        self.text = self.content = content
+        self.headers = headers or {}
 
     def raise_for_status(self):
         if not self.raise_error:
@@ -23,10 +24,10 @@ class MockResponse:
         return self.text
 
 
-def get_response(status_code, json=None, raise_error=False, content=None):
+def get_response(status_code, json=None, raise_error=False, content=None, headers=None):
     if json is None:
         json = {}
-    return MockResponse(status_code, json, raise_error, content=content)
+    return MockResponse(status_code, json, raise_error, content=content, headers=headers)
 
 
 def mock_config_params():
@@ -157,3 +158,18 @@ class TestExceptionHandling(unittest.TestCase):
             "Gateway Timeout. An internal call timed-out and the" " API was not able to finish your request.",
         )
         self.assertEqual(mocked_request.call_count, 7)
+
+    @mock.patch("time.sleep")
+    def test_429_retry_after_header(self, mocked_sleep, mocked_access_token, mocked_request):
+        """Verifies a 429 response is retried after the delay given in the
+        Retry-After header."""
+        mocked_request.side_effect = [
+            get_response(429, raise_error=True, content="", headers={"X-RateLimit-Retry-After": "7"}),
+            get_response(200, content={"page": {}}),
+        ]
+        hp_client = client.HelpScoutClient("", mock_config_params(), dev_mode=False)
+        self.assertEqual(hp_client.request("GET", "/customers"), {"page": {}})
+        self.assertEqual(mocked_request.call_count, 2)
+        waits = [call.args[0] for call in mocked_sleep.call_args_list if call.args[0] > 0]
+        self.assertEqual(len(waits), 1)
+        self.assertAlmostEqual(waits[0], 7, delta=0.5)
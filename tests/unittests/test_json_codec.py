@@ -0,0 +1,73 @@
+import io
+import json
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from tap_helpscout import json_codec
+from tap_helpscout.json_codec import JsonCodec, get_codec
+
+RECORD = {
+    "id": 1,
+    "subject": "Café – invoice",
+    "tags": [{"id": 2, "tag": "vip"}],
+    "closed_at": None,
+    "created_at": "2023-01-22T12:00:00.000000Z",
+}
+
+
+class TestJsonCodec(unittest.TestCase):
+    def test_default_codec(self):
+        """Verifies the standard library codec is used unless configured
+        otherwise."""
+        self.assertEqual(get_codec().name, "json")
+        self.assertEqual(get_codec(None).name, "json")
+
+    def test_auto_codec(self):
+        """Verifies `auto` prefers orjson and falls back to the standard
+        library."""
+        self.assertEqual(get_codec("auto").name, "orjson" if json_codec.orjson else "json")
+        with mock.patch.object(json_codec, "orjson", None):
+            self.assertEqual(get_codec("auto").name, "json")
+
+    def test_unknown_codec(self):
+        """Verifies an unsupported codec name raises an error."""
+        with self.assertRaises(ValueError):
+            get_codec("ujson")
+
+    def test_json_record_matches_singer(self):
+        """Verifies the standard library codec writes the singer message
+        format."""
+        stdout = io.StringIO()
+        with mock.patch("sys.stdout", stdout):
+            JsonCodec().write_record("conversations", RECORD)
+        self.assertEqual(stdout.getvalue().encode(), JsonCodec().dump_record("conversations", RECORD))
+
+
+@unittest.skipIf(json_codec.orjson is None, "orjson is not installed")
+class TestOrjsonCodec(unittest.TestCase):
+    def test_record_message(self):
+        """Verifies orjson RECORD messages decode to the singer message."""
+        codec = get_codec("orjson")
+        message = codec.dump_record("conversations", {**RECORD, "amount": Decimal("1.5")})
+        self.assertTrue(message.endswith(b"\n"))
+        self.assertEqual(
+            json.loads(message),
+            {"type": "RECORD", "stream": "conversations", "record": {**RECORD, "amount": 1.5}},
+        )
+        self.assertEqual(
+            json.loads(message), json.loads(JsonCodec().dump_record("conversations", {**RECORD, "amount": 1.5}))
+        )
+
+    def test_write_record_writes_bytes(self):
+        """Verifies records are written to the stdout byte stream."""
+        stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+        with mock.patch("sys.stdout", stdout):
+            get_codec("orjson").write_record("users", {"id": 1})
+        self.assertEqual(stdout.buffer.getvalue(), b'{"type":"RECORD","stream":"users","record":{"id":1}}\n')
+
+    def test_decode_response(self):
+        """Verifies responses are decoded from the raw body bytes."""
+        response = mock.Mock(content=json.dumps({"page": {"number": 1}}).encode())
+        self.assertEqual(get_codec("orjson").decode_response(response), {"page": {"number": 1}})
+        response.json.assert_not_called()
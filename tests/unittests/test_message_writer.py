@@ -0,0 +1,85 @@
+import io
+import json
+import time
+import unittest
+from unittest import mock
+
+import singer
+
+from tap_helpscout.json_codec import JsonCodec
+from tap_helpscout.output import LOGGER, MessageWriter
+
+
+class TestMessageWriter(unittest.TestCase):
+    def setUp(self):
+        self.stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+        patcher = mock.patch("sys.stdout", self.stdout)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_messages(self):
+        self.stdout.flush()
+        return [json.loads(line) for line in self.stdout.buffer.getvalue().splitlines()]
+
+    def test_unbuffered_matches_singer(self):
+        """Verifies messages are written as singer writes them when buffering
+        is disabled."""
+        writer = MessageWriter(JsonCodec())
+        writer.write_schema("users", {"type": "object"}, ["id"])
+        writer.write_record("users", {"id": 1})
+        writer.write_state({"bookmarks": {"users": "2023-01-01"}})
+        output = self.stdout.buffer.getvalue()
+        self.stdout.buffer.seek(0)
+        self.stdout.buffer.truncate()
+        singer.write_schema("users", {"type": "object"}, ["id"])
+        singer.write_record("users", {"id": 1})
+        singer.write_state({"bookmarks": {"users": "2023-01-01"}})
+        self.stdout.flush()
+        self.assertEqual(output, self.stdout.buffer.getvalue())
+        self.assertEqual(writer.records_written, 1)
+
+    def test_records_buffered_until_size(self):
+        """Verifies records are written once the buffer reaches its size."""
+        writer = MessageWriter(JsonCodec(), buffer_bytes=300, flush_interval=60)
+        for record_id in range(3):
+            writer.write_record("users", {"id": record_id, "name": "Jane Doe"})
+        self.assertEqual(self.get_messages(), [])
+        for record_id in range(3, 6):
+            writer.write_record("users", {"id": record_id, "name": "Jane Doe"})
+        self.assertEqual([message["record"]["id"] for message in self.get_messages()], list(range(4)))
+        writer.close()
+        self.assertEqual(len(self.get_messages()), 6)
+        self.assertEqual(writer.bytes_written, len(self.stdout.buffer.getvalue()))
+
+    def test_bytes_logged_when_counted(self):
+        """Verifies the bytes written are only logged when the records
+        written by the codec are counted too."""
+        for buffer_bytes, logged in ((0, False), (1 << 20, True)):
+            writer = MessageWriter(JsonCodec(), buffer_bytes=buffer_bytes, flush_interval=60)
+            writer.write_record("users", {"id": 1})
+            writer.close()
+            with self.assertLogs(LOGGER, "INFO") as logs:
+                writer.log_stats()
+            self.assertEqual("bytes written" in logs.output[0], logged)
+
+    def test_state_flushes_records_first(self):
+        """Verifies buffered records are written before a STATE message."""
+        writer = MessageWriter(JsonCodec(), buffer_bytes=1 << 20, flush_interval=60)
+        writer.write_record("users", {"id": 1})
+        writer.write_state({"bookmarks": {"users": "2023-01-01"}})
+        writer.write_record("users", {"id": 2})
+        self.assertEqual([message["type"] for message in self.get_messages()], ["RECORD", "STATE"])
+        writer.close()
+        self.assertEqual([message["type"] for message in self.get_messages()], ["RECORD", "STATE", "RECORD"])
+
+    def test_records_flushed_on_time(self):
+        """Verifies buffered records are written after the flush interval
+        without further writes."""
+        writer = MessageWriter(JsonCodec(), buffer_bytes=1 << 20, flush_interval=0.05)
+        writer.write_record("users", {"id": 1})
+        deadline = time.monotonic() + 5
+        while not self.get_messages() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.get_messages()), 1)
+        writer.close()
+        self.assertGreater(writer.seconds_blocked, 0)
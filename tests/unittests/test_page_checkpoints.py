@@ -0,0 +1,121 @@
+import unittest
+from urllib.parse import parse_qsl
+
+from tap_helpscout.output import StateManager
+from tap_helpscout.streams import Customers
+
+from test_child_stream_workers import get_selected_metadata
+from test_state_manager import MockWriter
+
+PAGE_SIZE = 2
+# Customers in modification order, two per page
+CUSTOMERS = [{"id": index, "updatedAt": f"2023-01-{index + 10}T00:00:00Z"} for index in range(10)]
+
+
+class MockClient:
+    def __init__(self, customers=CUSTOMERS, fail_on_page=None):
+        self.customers = customers
+        self.fail_on_page = fail_on_page
+        self.queries = []
+
+    def get(self, path, params, endpoint):
+        query = dict(parse_qsl(params))
+        page = int(query["page"])
+        self.queries.append((query["modifiedSince"], page))
+        if page == self.fail_on_page:
+            raise RuntimeError("Interrupted")
+        customers = sorted(
+            (customer for customer in self.customers if customer["updatedAt"] >= query["modifiedSince"]),
+            key=lambda customer: customer["updatedAt"],
+        )
+        total_pages = (len(customers) + PAGE_SIZE - 1) // PAGE_SIZE
+        return {
+            "_embedded": {"customers": [dict(customer) for customer in
+                                        customers[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]]},
+            "page": {"number": page, "totalPages": total_pages},
+        }
+
+
+class TestPageCheckpoints(unittest.TestCase):
+    def sync(self, client, state, config):
+        schema, mdata = get_selected_metadata("customers")
+        writer = MockWriter()
+        written = []
+
+        def write_record(stream, record):
+            written.append(record["id"])
+            writer.records_written += 1
+
+        writer.write_record = write_record
+        stream = Customers(client, "2023-01-01T00:00:00Z", config, writer, StateManager(writer))
+        try:
+            stream.sync(state, schema, mdata)
+        finally:
+            self.states = writer.states
+        return written
+
+    def test_resume_mid_pagination(self):
+        """Verifies an interrupted sync checkpoints the max bookmark of the
+        pages it wrote, and resumes with a query for the records modified
+        since from the first page."""
+        client = MockClient(fail_on_page=4)
+        config = {"checkpoint_pages": "2"}
+        with self.assertRaises(RuntimeError):
+            self.sync(client, {}, config)
+        checkpoint = self.states[-1]["page_checkpoints"]["customers"]
+        self.assertEqual(checkpoint, {"bookmark": "2023-01-01T00:00:00Z", "max_bookmark": CUSTOMERS[3]["updatedAt"]})
+        self.assertNotIn("bookmarks", self.states[-1])
+
+        resumed = MockClient()
+        state = self.states[-1]
+        written = self.sync(resumed, state, config)
+        self.assertEqual(resumed.queries, [(CUSTOMERS[3]["updatedAt"], page) for page in range(1, 5)])
+        self.assertEqual(written, list(range(3, 10)))
+        self.assertEqual(state["bookmarks"]["customers"], CUSTOMERS[-1]["updatedAt"])
+        self.assertNotIn("page_checkpoints", state)
+
+    def test_resume_after_records_moved(self):
+        """Verifies no record is skipped on resume when more than a page of
+        records moved to the end of the sort order since the interruption."""
+        config = {"checkpoint_pages": "1"}
+        with self.assertRaises(RuntimeError):
+            self.sync(MockClient(fail_on_page=3), {}, config)
+        state = self.states[-1]
+        self.assertEqual(state["page_checkpoints"]["customers"]["max_bookmark"], CUSTOMERS[3]["updatedAt"])
+
+        # Written and unwritten customers are modified before the sync resumes
+        modified = {0, 1, 2, 4, 5}
+        customers = [
+            {"id": customer["id"], "updatedAt": f"2023-02-0{customer['id'] + 1}T00:00:00Z"}
+            if customer["id"] in modified else customer
+            for customer in CUSTOMERS
+        ]
+        written = self.sync(MockClient(customers), state, config)
+        self.assertEqual(written, [3, 6, 7, 8, 9, 0, 1, 2, 4, 5])
+        self.assertEqual(state["bookmarks"]["customers"], "2023-02-06T00:00:00Z")
+
+    def test_bookmark_kept_when_last_pages_filtered(self):
+        """Verifies the max bookmark of the checkpointed pages is saved even
+        when no later record is newer."""
+        state = {"page_checkpoints": {"customers": {
+            "bookmark": "2023-01-01T00:00:00Z", "max_bookmark": "2023-02-01T00:00:00Z"
+        }}}
+        self.sync(MockClient(), state, {"checkpoint_pages": "2"})
+        self.assertEqual(state["bookmarks"]["customers"], "2023-02-01T00:00:00Z")
+
+    def test_stale_checkpoint_ignored(self):
+        """Verifies a checkpoint taken for another bookmark is not resumed."""
+        state = {
+            "bookmarks": {"customers": "2023-01-01T00:00:00Z"},
+            "page_checkpoints": {"customers": {"bookmark": "2022-12-01T00:00:00Z",
+                                               "max_bookmark": CUSTOMERS[5]["updatedAt"]}},
+        }
+        client = MockClient()
+        written = self.sync(client, state, {"checkpoint_pages": "2"})
+        self.assertEqual(client.queries, [("2023-01-01T00:00:00Z", page) for page in range(1, 6)])
+        self.assertEqual(written, list(range(10)))
+
+    def test_checkpoints_disabled(self):
+        """Verifies no checkpoint is written without checkpoint_pages."""
+        self.sync(MockClient(), {}, {})
+        self.assertFalse(any("page_checkpoints" in state for state in self.states))
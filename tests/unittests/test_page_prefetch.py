@@ -0,0 +1,55 @@
+import time
+import unittest
+from unittest import mock
+
+from tap_helpscout.streams import Customers
+
+
+def get_page(page, total_pages):
+    return {
+        "_embedded": {"customers": [{"id": page * 10 + i, "updatedAt": "2023-01-01T00:00:00Z"} for i in range(2)]},
+        "page": {"number": page, "totalPages": total_pages},
+    }
+
+
+class MockClient:
+    def __init__(self, total_pages):
+        self.total_pages = total_pages
+        self.requested_pages = []
+
+    def get(self, path, params, endpoint):
+        page = int(params.rsplit("page=", 1)[1])
+        self.requested_pages.append(page)
+        # Later pages respond faster, so responses complete out of order
+        time.sleep(0.01 * (self.total_pages - page))
+        return get_page(page, self.total_pages)
+
+
+class TestPagePrefetch(unittest.TestCase):
+    def get_record_ids(self, config, total_pages=6):
+        client = MockClient(total_pages)
+        stream = Customers(client, "2019-01-01T00:00:00Z", config)
+        with mock.patch.object(Customers, "params", {}):
+            ids = [record["id"] for record in stream.get_records({})]
+        return ids, client
+
+    def test_sequential_fetch(self):
+        """Verifies pages are fetched one by one when no page workers are
+        configured."""
+        ids, client = self.get_record_ids({})
+        self.assertEqual(client.requested_pages, [1, 2, 3, 4, 5, 6])
+        self.assertEqual(ids, [page * 10 + i for page in range(1, 7) for i in range(2)])
+
+    def test_concurrent_fetch_preserves_page_order(self):
+        """Verifies records are yielded in page order when pages are fetched
+        concurrently."""
+        ids, client = self.get_record_ids({"page_workers": "3"})
+        self.assertEqual(sorted(client.requested_pages), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(client.requested_pages[0], 1)
+        self.assertEqual(ids, [page * 10 + i for page in range(1, 7) for i in range(2)])
+
+    def test_single_page(self):
+        """Verifies no extra requests are made when only one page exists."""
+        ids, client = self.get_record_ids({"page_workers": 4}, total_pages=1)
+        self.assertEqual(client.requested_pages, [1])
+        self.assertEqual(ids, [10, 11])
@@ -0,0 +1,97 @@
+import io
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+
+from tap_helpscout.streams import Conversations
+from tap_helpscout.sync import sync
+
+from test_embedded_threads import get_catalog
+
+STREAM_PATHS = {"/users": "users", "/teams": "teams", "/workflows": "workflows", "/mailboxes": "mailboxes"}
+
+
+class MockClient:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = self.max_active = 0
+
+    def get(self, path, params, endpoint):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        if path in STREAM_PATHS:
+            data_key = STREAM_PATHS[path]
+            records = [
+                {"id": i, "updatedAt": f"2023-01-0{i}T00:00:00Z", "modifiedAt": f"2023-01-0{i}T00:00:00Z"}
+                for i in (1, 2)
+            ]
+        else:
+            data_key = path.rsplit("/", 1)[1]
+            records = [{"id": int(path.split("/")[2]) * 10}]
+        return {"_embedded": {data_key: records}, "page": {"number": 1, "totalPages": 1}}
+
+
+class TestParallelStreams(unittest.TestCase):
+    def setUp(self):
+        self.stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+        patcher = mock.patch("sys.stdout", self.stdout)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_sync(self, config, state=None):
+        self.stdout.buffer.seek(0)
+        self.stdout.buffer.truncate()
+        client = MockClient()
+        catalog = get_catalog({"users", "teams", "workflows", "mailboxes", "mailbox_fields"})
+        sync(client, catalog, state or {}, "2019-01-01T00:00:00Z", config)
+        self.stdout.flush()
+        return [json.loads(line) for line in self.stdout.buffer.getvalue().splitlines()], client
+
+    def test_parallel_matches_sequential(self):
+        """Verifies streams synced in parallel write the same records and
+        bookmarks as a sequential sync, with each stream's SCHEMA first."""
+        sequential, client = self.run_sync({})
+        self.assertEqual(client.max_active, 1)
+        parallel, client = self.run_sync({"stream_workers": "4"})
+        self.assertGreater(client.max_active, 1)
+
+        def records(messages):
+            return sorted((message["stream"], message["record"]["id"]) for message in messages
+                          if message["type"] == "RECORD")
+
+        self.assertEqual(records(parallel), records(sequential))
+        self.assertEqual(parallel[-1], sequential[-1])
+        self.assertEqual(
+            parallel[-1]["value"]["bookmarks"],
+            {stream: "2023-01-02T00:00:00Z" for stream in ("users", "teams", "workflows", "mailboxes")},
+        )
+        schemas = set()
+        for message in parallel:
+            if message["type"] == "SCHEMA":
+                schemas.add(message["stream"])
+            elif message["type"] == "RECORD":
+                self.assertIn(message["stream"], schemas)
+
+    def test_stream_progress_in_state(self):
+        """Verifies the streams being synced are listed in the state, and
+        interrupted streams are synced first."""
+        messages, _ = self.run_sync({"stream_workers": "2"}, {"currently_syncing_streams": ["workflows"]})
+        states = [message["value"] for message in messages if message["type"] == "STATE"]
+        self.assertEqual(states[0]["currently_syncing_streams"], ["workflows"])
+        self.assertTrue(any(len(state.get("currently_syncing_streams", [])) == 2 for state in states))
+        self.assertNotIn("currently_syncing_streams", states[-1])
+        self.assertIsNone(states[-1]["currently_syncing"])
+
+    def test_params_not_shared(self):
+        """Verifies stream objects do not share request params."""
+        first = Conversations(config={})
+        second = Conversations(config={})
+        first.make_request_params({"bookmarks": {"conversations": "2023-01-01T00:00:00Z"}})
+        self.assertNotIn("2023-01-01", second.make_request_params({}))
+        self.assertNotIn("modifiedSince", Conversations.params)
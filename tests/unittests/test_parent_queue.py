@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from tap_helpscout.parent_queue import ParentQueue
+from tap_helpscout.sync import sync
+
+from test_embedded_threads import get_catalog
+
+
+class MockClient:
+    def __init__(self, conversation_ids, failing_conversation=None):
+        self.conversation_ids = conversation_ids
+        self.failing_conversation = failing_conversation
+        self.requests = []
+
+    def get(self, path, params, endpoint):
+        self.requests.append(path)
+        if path == "/conversations":
+            conversations = [
+                {"id": conversation_id, "userUpdatedAt": "2023-01-02T00:00:00Z", "threads": 1}
+                for conversation_id in self.conversation_ids
+            ]
+            return {"_embedded": {"conversations": conversations}, "page": {"number": 1, "totalPages": 1}}
+        conversation_id = int(path.split("/")[2])
+        if conversation_id == self.failing_conversation:
+            raise RuntimeError("Threads failed")
+        return {"_embedded": {"threads": [{"id": conversation_id * 10}]}, "page": {"number": 1, "totalPages": 1}}
+
+
+class TestParentQueue(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "parents.db")
+
+    def test_pending_ids(self):
+        """Verifies ids are pending per child stream in the order they were
+        added until completed, across several reads."""
+        with ParentQueue(self.path, ["mailbox_fields", "mailbox_folders"]) as parent_queue, \
+                mock.patch("tap_helpscout.parent_queue.READ_SIZE", 2):
+            for parent_id in (3, 1, 2, 5, 4):
+                parent_queue.put(parent_id)
+            parent_queue.complete("mailbox_fields", 2)
+            self.assertEqual(list(parent_queue.pending("mailbox_fields")), [3, 1, 5, 4])
+            self.assertEqual(list(parent_queue.pending("mailbox_folders")), [3, 1, 2, 5, 4])
+            # A parent added again is pending again
+            parent_queue.put(2)
+            self.assertEqual(list(parent_queue.pending("mailbox_fields")), [3, 1, 5, 4, 2])
+            parent_queue.clear("mailbox_fields")
+            self.assertEqual(parent_queue.count("mailbox_fields"), 0)
+            self.assertEqual(parent_queue.count("mailbox_folders"), 5)
+
+        # The ids are kept in the file
+        with ParentQueue(self.path, ["mailbox_folders"]) as parent_queue:
+            self.assertEqual(list(parent_queue.pending("mailbox_folders")), [3, 1, 5, 4, 2])
+
+    @mock.patch("tap_helpscout.output.MessageWriter.write_schema")
+    @mock.patch("tap_helpscout.streams.abstract.singer.write_record")
+    @mock.patch("tap_helpscout.output.MessageWriter.write_state")
+    def test_resume_child_sync(self, mocked_write_state, mocked_write_record, _):
+        """Verifies an interrupted child sync resumes with the parents whose
+        child records were not written, after the parent bookmark advanced."""
+        catalog = get_catalog({"conversations", "conversation_threads"})
+        config = {"parent_queue_path": self.path}
+        client = MockClient([1, 2, 3, 4], failing_conversation=3)
+        with self.assertRaises(RuntimeError):
+            sync(client, catalog, {}, "2019-01-01T00:00:00Z", config)
+        state = mocked_write_state.call_args.args[0]
+        self.assertEqual(state["bookmarks"]["conversations"], "2023-01-02T00:00:00Z")
+        self.assertEqual(state["parent_queues"], {"conversation_threads": self.path})
+
+        mocked_write_record.reset_mock()
+        client = MockClient([5])
+        sync(client, catalog, state, "2019-01-01T00:00:00Z", config)
+        self.assertEqual(client.requests[1:],
+                         ["/conversations/3/threads", "/conversations/4/threads", "/conversations/5/threads"])
+        threads = [call.args[1]["id"] for call in mocked_write_record.call_args_list
+                   if call.args[0] == "conversation_threads"]
+        self.assertEqual(threads, [30, 40, 50])
+        state = mocked_write_state.call_args.args[0]
+        self.assertNotIn("parent_queues", state)
+        with ParentQueue(self.path, []) as parent_queue:
+            self.assertEqual(parent_queue.count("conversation_threads", done=True), 0)
+
+    @mock.patch("tap_helpscout.output.MessageWriter.write_schema")
+    @mock.patch("tap_helpscout.streams.abstract.singer.write_record")
+    @mock.patch("tap_helpscout.output.MessageWriter.write_state")
+    def test_stale_ids_cleared(self, *_):
+        """Verifies ids left in the file are dropped when the state does not
+        reference it."""
+        with ParentQueue(self.path, ["conversation_threads"]) as parent_queue:
+            parent_queue.put(9)
+        catalog = get_catalog({"conversations", "conversation_threads"})
+        client = MockClient([1])
+        sync(client, catalog, {}, "2019-01-01T00:00:00Z", {"parent_queue_path": self.path})
+        self.assertEqual(client.requests[1:], ["/conversations/1/threads"])
+
+    @mock.patch("tap_helpscout.output.MessageWriter.write_schema")
+    @mock.patch("tap_helpscout.streams.abstract.singer.write_record")
+    @mock.patch("tap_helpscout.output.MessageWriter.write_state")
+    def test_sync_without_config(self, *_):
+        """Verifies child streams are synced from the collected parent ids
+        when no config is passed."""
+        catalog = get_catalog({"conversations", "conversation_threads"})
+        client = MockClient([1, 2])
+        sync(client, catalog, {}, "2019-01-01T00:00:00Z")
+        self.assertEqual(client.requests[1:], ["/conversations/1/threads", "/conversations/2/threads"])
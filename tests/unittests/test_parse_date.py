@@ -0,0 +1,58 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+
+from tap_helpscout.helpers import DATE_FORMATS, parse_date
+
+
+def strptime_date(date_value):
+    """parse_date before the ISO-8601 fast path."""
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_value, date_format)
+        except ValueError:
+            continue
+
+
+def random_datetimes(count, seed=7):
+    generator = random.Random(seed)
+    start = datetime(1970, 1, 1)
+    for _ in range(count):
+        yield start + timedelta(
+            seconds=generator.randrange(0, 200 * 365 * 86400),
+            microseconds=generator.choice([0, generator.randrange(0, 1000000)]),
+        )
+
+
+class TestParseDate(unittest.TestCase):
+    def test_all_formats_match_strptime(self):
+        """Verifies every format parses to the value strptime returns, for
+        random datetimes."""
+        for value in random_datetimes(500):
+            for date_format in DATE_FORMATS:
+                date_value = value.strftime(date_format)
+                with self.subTest(date_value=date_value):
+                    self.assertEqual(parse_date(date_value), strptime_date(date_value))
+
+    def test_formats_compare_as_utc(self):
+        """Verifies the same instant compares equal across formats and the
+        order of instants is kept."""
+        values = sorted(value.replace(microsecond=0) for value in random_datetimes(200))
+        for date_format in DATE_FORMATS[:4]:
+            parsed = [parse_date(value.strftime(date_format)) for value in values]
+            self.assertEqual(parsed, values)
+        self.assertEqual(parse_date("2023-01-22T12:00:00Z"), parse_date("2023-01-22T12:00:00.000000+00:00"))
+
+    def test_short_fractions(self):
+        """Verifies fractions of less than six digits are read as strptime
+        reads them."""
+        for date_value in ["2023-01-22T12:00:00.5Z", "2023-01-22T12:00:00.123+00:00", "2023-01-22T12:00:00.000001Z"]:
+            self.assertEqual(parse_date(date_value), strptime_date(date_value))
+
+    def test_unpadded_and_invalid_values(self):
+        """Verifies values outside the fast path fall back to strptime and
+        unparseable values return None."""
+        self.assertEqual(parse_date("2023-1-2T3:04:05Z"), datetime(2023, 1, 2, 3, 4, 5))
+        for date_value in ["2023-13-01", "2023-02-30T00:00:00Z", "2023-01-22T12:00:00", "2023-01-22T12:00:00+01:00"]:
+            with self.subTest(date_value=date_value):
+                self.assertIsNone(parse_date(date_value))
@@ -0,0 +1,69 @@
+import unittest
+from unittest import mock
+
+from tap_helpscout.rate_limit import RateLimiter
+
+
+class MockClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = MockClock()
+        patcher = mock.patch("tap_helpscout.rate_limit.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_no_pacing_until_limit_is_known(self):
+        """Verifies requests are not delayed before any limit is known."""
+        limiter = RateLimiter()
+        for _ in range(100):
+            limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_requests_are_paced_once_quota_is_used(self):
+        """Verifies requests are spread at the refill rate once the reported
+        remaining quota is used up."""
+        limiter = RateLimiter()
+        limiter.update({"X-RateLimit-Limit-Minute": "60", "X-RateLimit-Remaining-Minute": "2"})
+        for _ in range(4):
+            limiter.acquire()
+        # Two requests use the remaining quota, the next ones wait one second each for a token
+        self.assertEqual(self.clock.sleeps, [1.0, 1.0])
+
+    def test_configured_limit(self):
+        """Verifies the configured limit paces requests before any response is
+        received."""
+        limiter = RateLimiter(120)
+        for _ in range(121):
+            limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [0.5])
+
+    def test_exhausted_quota_waits_for_reset(self):
+        """Verifies requests wait for the window reset when no quota
+        remains."""
+        limiter = RateLimiter()
+        limiter.update(
+            {"X-RateLimit-Limit-Minute": "400", "X-RateLimit-Remaining-Minute": "0", "X-RateLimit-Reset": "12"}
+        )
+        limiter.acquire()
+        self.assertEqual(len(self.clock.sleeps), 1)
+        self.assertGreaterEqual(self.clock.sleeps[0], 12)
+
+    def test_pause_uses_retry_after(self):
+        """Verifies a 429 holds back the next request for exactly the
+        Retry-After delay."""
+        limiter = RateLimiter()
+        self.assertEqual(limiter.pause({"Retry-After": "3"}), 3)
+        limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [3])
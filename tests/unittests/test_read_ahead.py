@@ -0,0 +1,97 @@
+import threading
+import time
+import unittest
+
+from tap_helpscout.pipeline import StageTimings, read_ahead
+from tap_helpscout.streams import Users
+
+
+class TestReadAhead(unittest.TestCase):
+    def test_pages_are_yielded_in_order(self):
+        """Verifies pages are passed through in the order they were
+        produced."""
+        self.assertEqual(list(read_ahead(iter(range(20)), 3)), list(range(20)))
+
+    def test_producer_stays_within_depth(self):
+        """Verifies the producer never runs more than `depth` pages ahead of
+        the consumer."""
+        produced = []
+
+        def pages():
+            for page in range(10):
+                produced.append(page)
+                yield page
+
+        pages_iter = read_ahead(pages(), 2)
+        self.assertEqual(next(pages_iter), 0)
+        time.sleep(0.3)
+        # One page consumed, two buffered and one blocked on the full queue
+        self.assertLessEqual(len(produced), 4)
+        self.assertEqual(list(pages_iter), list(range(1, 10)))
+
+    def test_exception_is_raised_in_consumer(self):
+        """Verifies errors raised while fetching are re-raised to the
+        consumer after the pages fetched before the error."""
+
+        def pages():
+            yield 1
+            raise ValueError("fetch failed")
+
+        pages_iter = read_ahead(pages(), 2)
+        self.assertEqual(next(pages_iter), 1)
+        with self.assertRaises(ValueError):
+            next(pages_iter)
+
+    def test_early_close_stops_producer(self):
+        """Verifies the background thread exits when the consumer stops
+        early."""
+        closed = threading.Event()
+
+        def pages():
+            try:
+                while True:
+                    yield 1
+            finally:
+                closed.set()
+
+        pages_iter = read_ahead(pages(), 1)
+        next(pages_iter)
+        pages_iter.close()
+        self.assertTrue(closed.is_set())
+
+
+class MockClient:
+    def get(self, path, params, endpoint):
+        page = int(params.rsplit("page=", 1)[1])
+        return {
+            "_embedded": {"users": [{"id": page, "updatedAt": "2023-01-01T00:00:00Z"}]},
+            "page": {"number": page, "totalPages": 3},
+        }
+
+
+class TestStreamReadAhead(unittest.TestCase):
+    def test_read_ahead_records(self):
+        """Verifies records and stage timings when read ahead is enabled."""
+        stream = Users(MockClient(), "2019-01-01T00:00:00Z", {"read_ahead_pages": 2})
+        self.assertEqual([record["id"] for record in stream.get_records({})], [1, 2, 3])
+        self.assertGreater(stream.timings.seconds["fetch"], 0)
+        self.assertGreater(stream.timings.seconds["transform"], 0)
+        self.assertGreater(stream.timings.seconds["wait"], 0)
+
+    def test_no_wait_without_read_ahead(self):
+        """Verifies the time spent fetching pages is not counted as waiting
+        without read ahead."""
+        stream = Users(MockClient(), "2019-01-01T00:00:00Z", {})
+        self.assertEqual([record["id"] for record in stream.get_records({})], [1, 2, 3])
+        self.assertGreater(stream.timings.seconds["fetch"], 0)
+        self.assertEqual(stream.timings.seconds["wait"], 0)
+
+    def test_stage_timings(self):
+        """Verifies time spent in a stage is accumulated."""
+        timings = StageTimings()
+        with timings.time("write"):
+            pass
+        with timings.time("write"):
+            pass
+        self.assertGreater(timings.seconds["write"], 0)
+        self.assertEqual(timings.seconds["fetch"], 0)
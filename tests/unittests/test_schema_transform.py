@@ -0,0 +1,120 @@
+import copy
+import json
+import random
+import unittest
+
+from singer import Transformer, metadata
+from singer.transform import SchemaMismatch
+
+from tap_helpscout.discover import get_schemas
+from tap_helpscout.schema_transform import SchemaTransformer
+from tap_helpscout.streams import Conversations
+
+VALUES = {
+    "string": ["text", 5, 1.5, True],
+    "integer": [1, "1,000", 2.7, "7", False],
+    "number": [1.5, "2,5", 3, "4"],
+    "boolean": [True, "false", "False", 0, "yes", 1],
+    "null": [None, ""],
+    "date-time": [
+        "2023-01-22T12:00:00Z",
+        "2023-01-22T12:00:00.5+00:00",
+        "2023-01-22T12:00:00.123456Z",
+        "2023-01-22",
+        "2023-01-22T14:00:00+02:00",
+        "0999-01-22T12:00:00Z",
+    ],
+}
+
+
+def generate(schema, generator):
+    """Returns a random value accepted by the schema, with fields outside the
+    schema added to objects."""
+    if "anyOf" in schema:
+        return generate(generator.choice(schema["anyOf"]), generator)
+    if "type" not in schema:
+        return {"untyped": 1}
+    types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+    typ = generator.choice(types)
+    if typ == "null":
+        return generator.choice(VALUES["null"])
+    if schema.get("format") == "date-time":
+        return generator.choice(VALUES["date-time"])
+    if typ == "object":
+        record = {
+            key: generate(subschema, generator)
+            for key, subschema in schema.get("properties", {}).items()
+            if generator.random() < 0.9
+        }
+        if generator.random() < 0.3:
+            record["notInSchema"] = {"nested": [1, 2]}
+        return record
+    if typ == "array":
+        return [generate(schema["items"], generator) for _ in range(generator.randrange(3))]
+    return generator.choice(VALUES[typ])
+
+
+class TestSchemaTransformer(unittest.TestCase):
+    def setUp(self):
+        self.schemas, self.metadata = get_schemas()
+
+    def assert_same_transform(self, record, schema, stream_metadata):
+        expected_record, record = copy.deepcopy(record), copy.deepcopy(record)
+        singer_transformer, transformer = Transformer(), SchemaTransformer()
+        expected = singer_transformer.transform(expected_record, schema, stream_metadata)
+        self.assertEqual(json.dumps(transformer.transform(record, schema, stream_metadata)), json.dumps(expected))
+        # Unselected fields are removed from the input record as well
+        self.assertEqual(record, expected_record)
+        self.assertEqual(transformer.filtered, singer_transformer.filtered)
+        self.assertEqual(transformer.removed, singer_transformer.removed)
+
+    def test_generated_records(self):
+        """Verifies generated records of every stream transform exactly as
+        with singer.Transformer."""
+        generator = random.Random(11)
+        for stream_name, schema in self.schemas.items():
+            stream_metadata = metadata.to_map(self.metadata[stream_name])
+            for _ in range(50):
+                record = generate(schema, generator)
+                with self.subTest(stream=stream_name, record=record):
+                    self.assert_same_transform(record, schema, stream_metadata)
+
+    def test_field_selection(self):
+        """Verifies unselected and unsupported fields are removed, while
+        automatic fields are kept."""
+        schema = self.schemas["conversations"]
+        stream_metadata = metadata.to_map(self.metadata["conversations"])
+        stream_metadata[("properties", "subject")]["selected"] = False
+        stream_metadata[("properties", "tags")]["inclusion"] = "unsupported"
+        stream_metadata[("properties", "id")]["selected"] = False
+        record = generate(schema, random.Random(3))
+        record.update({"id": 1, "subject": "Invoice", "tags": []})
+        self.assert_same_transform(record, schema, stream_metadata)
+        self.assertEqual(SchemaTransformer().transform(copy.deepcopy(record), schema, stream_metadata)["id"], 1)
+
+    def test_nested_selection(self):
+        """Verifies metadata selecting nested fields is applied as singer
+        applies it."""
+        schema = self.schemas["conversations"]
+        stream_metadata = metadata.to_map(self.metadata["conversations"])
+        stream_metadata[("properties", "source", "properties", "via")] = {"selected": False}
+        record = {"id": 1, "source": {"type": "email", "via": "customer"}}
+        self.assert_same_transform(record, schema, stream_metadata)
+
+    def test_schema_mismatch(self):
+        """Verifies records not matching the schema raise singer's error."""
+        schema = self.schemas["conversations"]
+        stream_metadata = metadata.to_map(self.metadata["conversations"])
+        for record in [{"id": "abc"}, {"id": 1, "created_at": "2023-02-30T12:00:00Z"}, {"id": 1, "tags": "vip"}]:
+            with self.subTest(record=record):
+                with self.assertRaises(SchemaMismatch) as expected:
+                    Transformer().transform(copy.deepcopy(record), schema, stream_metadata)
+                with self.assertRaises(SchemaMismatch) as error:
+                    SchemaTransformer().transform(copy.deepcopy(record), schema, stream_metadata)
+                self.assertEqual(str(error.exception), str(expected.exception))
+
+    def test_opt_in(self):
+        """Verifies streams use the compiled transformer only when
+        configured."""
+        self.assertIs(type(Conversations(config={}).get_transformer()), Transformer)
+        self.assertIsInstance(Conversations(config={"compiled_transform": "true"}).get_transformer(), SchemaTransformer)
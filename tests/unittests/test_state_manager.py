@@ -0,0 +1,85 @@
+import copy
+import unittest
+from unittest import mock
+
+from tap_helpscout.output import StateManager
+from tap_helpscout.streams import MailBoxFolders
+
+from test_child_stream_workers import MockClient, get_selected_metadata
+
+
+class MockWriter:
+    def __init__(self):
+        self.records_written = 0
+        self.states = []
+
+    def write_record(self, stream, record):
+        self.records_written += 1
+
+    def write_state(self, state):
+        self.states.append(copy.deepcopy(state))
+
+
+class TestStateManager(unittest.TestCase):
+    def test_every_update_written_by_default(self):
+        """Verifies each bookmark update is written without intervals."""
+        writer = MockWriter()
+        state_manager = StateManager(writer)
+        for value in range(3):
+            state_manager.update({"bookmarks": {"users": value}})
+        self.assertEqual([state["bookmarks"]["users"] for state in writer.states], [0, 1, 2])
+
+    def test_record_interval(self):
+        """Verifies updates are written once enough records were written
+        since the last STATE message, and pending updates on flush."""
+        writer = MockWriter()
+        state_manager = StateManager(writer, interval_records=5)
+        for value in range(12):
+            writer.write_record("users", {})
+            state_manager.update({"bookmarks": {"users": value}})
+        self.assertEqual([state["bookmarks"]["users"] for state in writer.states], [4, 9])
+        state_manager.flush()
+        state_manager.flush()
+        self.assertEqual([state["bookmarks"]["users"] for state in writer.states], [4, 9, 11])
+        self.assertEqual((state_manager.updates, state_manager.states_written), (12, 3))
+
+    @mock.patch("tap_helpscout.output.time.monotonic")
+    def test_seconds_interval(self, mocked_monotonic):
+        """Verifies updates are written at most every interval, while
+        stream boundaries are written at once."""
+        mocked_monotonic.return_value = 0
+        writer = MockWriter()
+        state_manager = StateManager(writer, interval_seconds=10)
+        state_manager.update({"bookmarks": {"users": 1}})
+        mocked_monotonic.return_value = 9
+        state_manager.update({"bookmarks": {"users": 2}})
+        self.assertEqual(writer.states, [])
+        mocked_monotonic.return_value = 10
+        state_manager.update({"bookmarks": {"users": 3}})
+        self.assertEqual(writer.states, [{"bookmarks": {"users": 3}}])
+        state_manager.write({"currently_syncing": "teams", "bookmarks": {"users": 3}})
+        self.assertEqual(len(writer.states), 2)
+
+    def test_child_stream_bookmarks_coalesced(self):
+        """Verifies a child stream writes fewer STATE messages than parents,
+        none ahead of the records written before it."""
+        schema, mdata = get_selected_metadata("mailbox_folders")
+        writer = MockWriter()
+        written = []
+
+        def write_record(stream, record):
+            written.append(record)
+            writer.records_written += 1
+
+        writer.write_record = write_record
+        state_manager = StateManager(writer, interval_records=6)
+        state = {}
+        stream = MailBoxFolders(MockClient(), "2019-01-01T00:00:00Z", {}, writer, state_manager)
+        stream.sync(state, schema, mdata, [1, 2, 3, 4], True)
+        state_manager.flush()
+        self.assertEqual(state_manager.updates, 4)
+        self.assertEqual(
+            [state["bookmarks"]["mailbox_folders"] for state in writer.states],
+            ["2023-01-02T00:00:00Z", "2023-01-04T00:00:00Z"],
+        )
+        self.assertEqual(len(written), 12)
@@ -0,0 +1,140 @@
+import io
+import json
+import unittest
+from unittest import mock
+
+from tap_helpscout import json_codec
+from tap_helpscout.client import HelpScoutClient
+from tap_helpscout.json_codec import iter_items
+from tap_helpscout.streams import Customers, HappinessRatingsReport
+
+
+def get_customers_page(page, total_pages):
+    return {
+        "_embedded": {
+            "customers": [
+                {
+                    "id": page * 10 + i,
+                    "firstName": "Jane",
+                    "updatedAt": "2023-01-01T00:00:00Z",
+                    "score": 1.5,
+                    "_embedded": {"emails": [{"id": 1, "value": "jane@example.com"}]},
+                    "_links": {"self": {"href": "https://api.helpscout.net/v2/customers/1"}},
+                }
+                for i in range(3)
+            ]
+        },
+        "_links": {"self": {"href": "https://api.helpscout.net/v2/customers"}},
+        "page": {"size": 3, "totalElements": 3 * total_pages, "totalPages": total_pages, "number": page},
+    }
+
+
+class MockClient:
+    """Serves the same pages as whole documents and as byte streams."""
+
+    def __init__(self, get_page):
+        self.get_page = get_page
+        self.requests = 0
+
+    def get(self, path, params, endpoint):
+        self.requests += 1
+        return self.get_page(int(params.rsplit("page=", 1)[1]))
+
+    def stream_items(self, path, items_prefix, params, endpoint):
+        page = self.get(path, params, endpoint)
+        return iter_items(io.BytesIO(json.dumps(page).encode()), items_prefix)
+
+
+@unittest.skipIf(json_codec.ijson is None, "ijson is not installed")
+class TestStreamingPages(unittest.TestCase):
+    def test_iter_items(self):
+        """Verifies records are yielded one by one followed by the rest of the
+        document."""
+        page = get_customers_page(1, 4)
+        events = list(iter_items(io.BytesIO(json.dumps(page).encode()), "_embedded.customers.item"))
+        self.assertEqual([kind for kind, _ in events], ["item", "item", "item", "page"])
+        self.assertEqual([value for _, value in events[:3]], page["_embedded"]["customers"])
+        self.assertEqual(events[3][1]["page"], page["page"])
+        self.assertEqual(events[3][1]["_embedded"], {"customers": []})
+
+    def test_streamed_records_match_pages(self):
+        """Verifies streamed records are transformed exactly like records of a
+        whole page."""
+        expected_client = MockClient(lambda page: get_customers_page(page, 3))
+        with mock.patch.object(Customers, "params", {}):
+            expected = list(Customers(expected_client, "2019-01-01T00:00:00Z").get_records({}))
+            client = MockClient(lambda page: get_customers_page(page, 3))
+            stream = Customers(client, "2019-01-01T00:00:00Z", {"stream_pages": "true"})
+            records = list(stream.get_records({}))
+        self.assertEqual(len(records), 9)
+        self.assertEqual(records, expected)
+        self.assertEqual(client.requests, 3)
+
+    def test_ratings_report_pages(self):
+        """Verifies the happiness ratings report layout is streamed."""
+
+        def get_page(page):
+            return {
+                "results": [{"id": page, "threadid": page * 10, "ratingCustomerId": 1}],
+                "page": page,
+                "pages": 2,
+                "count": 2,
+            }
+
+        stream = HappinessRatingsReport(MockClient(get_page), "2019-01-01T00:00:00Z", {"stream_pages": True})
+        records = list(stream.get_records({}))
+        self.assertEqual(
+            records,
+            [
+                {"conversation_id": 1, "thread_id": 10, "rating_customer_id": 1},
+                {"conversation_id": 2, "thread_id": 20, "rating_customer_id": 1},
+            ],
+        )
+
+    @mock.patch("requests.Session.request")
+    def test_client_stream_items(self, mocked_request):
+        """Verifies the client parses the raw response stream."""
+        response = mock.MagicMock(status_code=200, headers={})
+        response.raw = io.BytesIO(json.dumps(get_customers_page(1, 1)).encode())
+        response.__enter__.return_value = response
+        mocked_request.return_value = response
+        client = HelpScoutClient(
+            "",
+            {"client_id": "", "client_secret": "", "refresh_token": "", "user_agent": "", "access_token": "token"},
+            dev_mode=True,
+        )
+        events = list(client.stream_items("/customers", "_embedded.customers.item"))
+        self.assertEqual(len(events), 4)
+        self.assertTrue(mocked_request.call_args.kwargs["stream"])
+
+    @mock.patch("tap_helpscout.client.time.sleep")
+    @mock.patch("requests.Session.request")
+    def test_client_stream_items_retried(self, mocked_request, mocked_sleep):
+        """Verifies a body cut short is requested again and the items already
+        yielded are not yielded twice."""
+        body = json.dumps(get_customers_page(1, 1)).encode()
+
+        class BrokenStream(io.BytesIO):
+            def read(self, size=-1):
+                if self.tell() > 0:
+                    raise ConnectionResetError("Connection reset by peer")
+                # Cut after the second customer
+                return super().read(body.index(b'"id": 12'))
+
+        responses = []
+        for raw in (BrokenStream(body), io.BytesIO(body)):
+            response = mock.MagicMock(status_code=200, headers={})
+            response.raw = raw
+            response.__enter__.return_value = response
+            responses.append(response)
+        mocked_request.side_effect = responses
+        client = HelpScoutClient(
+            "",
+            {"client_id": "", "client_secret": "", "refresh_token": "", "user_agent": "", "access_token": "token"},
+            dev_mode=True,
+        )
+        events = list(client.stream_items("/customers", "_embedded.customers.item"))
+        self.assertEqual([value["id"] for kind, value in events if kind == "item"], [10, 11, 12])
+        self.assertEqual(events[-1][0], "page")
+        self.assertEqual(mocked_request.call_count, 2)
+        self.assertEqual(mocked_sleep.call_count, 1)
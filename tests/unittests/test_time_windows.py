@@ -0,0 +1,135 @@
+import re
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+from urllib.parse import unquote
+
+from tap_helpscout.output import StateManager
+from tap_helpscout.streams import Customers
+
+from test_child_stream_workers import get_selected_metadata
+from test_state_manager import MockWriter
+
+WINDOW_QUERY = re.compile(r"query=\(modifiedAt:\[(\S+) TO (\S+)\]\)")
+FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+PAGE_SIZE = 10
+
+
+def get_customers():
+    """Returns customers sparse over January and dense over the first days
+    of February."""
+    start = datetime(2023, 1, 1)
+    times = [start + timedelta(days=day, hours=6) for day in range(31)]
+    times += [datetime(2023, 2, 1) + timedelta(hours=hour, minutes=30) for hour in range(72)]
+    return [{"id": index, "updatedAt": time.strftime(FORMAT)} for index, time in enumerate(times)]
+
+
+class MockClient:
+    def __init__(self, customers, fail_on_window=None):
+        self.customers = customers
+        self.fail_on_window = fail_on_window
+        self.windows = []
+
+    def get(self, path, params, endpoint):
+        start, end = WINDOW_QUERY.search(unquote(params)).groups()
+        page = int(params.rsplit("page=", 1)[1])
+        if page == 1:
+            self.windows.append((start, end))
+            if len(self.windows) == self.fail_on_window:
+                raise RuntimeError("Interrupted")
+        matches = [customer for customer in self.customers if start <= customer["updatedAt"] <= end]
+        total_pages = max((len(matches) + PAGE_SIZE - 1) // PAGE_SIZE, 1)
+        return {
+            "_embedded": {"customers": matches[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]},
+            "page": {"number": page, "totalPages": total_pages, "totalElements": len(matches)},
+        }
+
+
+class TestTimeWindows(unittest.TestCase):
+    def sync(self, client, state, config):
+        schema, mdata = get_selected_metadata("customers")
+        writer = MockWriter()
+        written = []
+
+        def write_record(stream, record):
+            written.append(record["id"])
+            writer.records_written += 1
+
+        writer.write_record = write_record
+        stream = Customers(client, "2023-01-01T00:00:00Z", config, writer, StateManager(writer))
+        try:
+            stream.sync(state, schema, mdata)
+        finally:
+            self.states = writer.states
+        return written
+
+    def test_windows_cover_backfill(self):
+        """Verifies windows cover the bookmark until now without gaps, are
+        sized to the target record count, and every record is written."""
+        customers = get_customers()
+        client = MockClient(customers)
+        state = {}
+        written = self.sync(client, state, {"window_days": "2", "window_target_records": "12"})
+        self.assertEqual(set(written), {customer["id"] for customer in customers})
+        # A window holding too many records is split before its other pages are requested
+        windows = [window for window, following in zip(client.windows, client.windows[1:] + [(None, None)])
+                   if window[0] != following[0]]
+        self.assertLess(len(windows), len(client.windows))
+        self.assertEqual(windows[0][0], "2023-01-01T00:00:00Z")
+        for (_, end), (start, _) in zip(windows, windows[1:]):
+            self.assertEqual(end, start)
+        yesterday = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(1)
+        self.assertGreaterEqual(datetime.strptime(windows[-1][1], FORMAT), yesterday)
+        sizes = {window: datetime.strptime(window[1], FORMAT) - datetime.strptime(window[0], FORMAT)
+                 for window in windows}
+        # Windows shrink over the dense days and grow again after them
+        dense = [size for (start, _), size in sizes.items() if "2023-02-01" <= start < "2023-02-04"]
+        self.assertLess(max(dense), timedelta(days=1))
+        self.assertGreater(sizes[windows[-1]], timedelta(days=30))
+        self.assertEqual(state["bookmarks"]["customers"], customers[-1]["updatedAt"])
+        self.assertNotIn("window_checkpoints", state)
+        self.assertIn("window_checkpoints", self.states[0])
+
+    def test_resume_at_failed_window(self):
+        """Verifies an interrupted backfill checkpoints the completed windows
+        and resumes at the window that failed."""
+        customers = get_customers()
+        client = MockClient(customers, fail_on_window=3)
+        state = {}
+        config = {"window_days": "10"}
+        with self.assertRaises(RuntimeError):
+            self.sync(client, state, config)
+        checkpoint = self.states[-1]["window_checkpoints"]["customers"]
+        self.assertEqual(checkpoint, client.windows[2][0])
+        self.assertNotIn("bookmarks", self.states[-1])
+
+        resumed = MockClient(customers)
+        written = self.sync(resumed, self.states[-1], config)
+        self.assertEqual(resumed.windows[0][0], checkpoint)
+        self.assertEqual(set(written),
+                         {customer["id"] for customer in customers if customer["updatedAt"] >= checkpoint})
+
+    def test_resume_with_empty_windows(self):
+        """Verifies the bookmark moves to the end of the windows completed
+        before the interruption when the resumed windows hold no record."""
+        customers = get_customers()[:4]
+        client = MockClient(customers, fail_on_window=3)
+        config = {"window_days": "2"}
+        with self.assertRaises(RuntimeError):
+            self.sync(client, {}, config)
+        state = self.states[-1]
+        checkpoint = state["window_checkpoints"]["customers"]
+        self.assertGreater(checkpoint, customers[-1]["updatedAt"])
+
+        written = self.sync(MockClient(customers), state, config)
+        self.assertEqual(written, [])
+        self.assertEqual(state["bookmarks"]["customers"], checkpoint)
+        self.assertNotIn("window_checkpoints", state)
+
+    def test_windows_disabled(self):
+        """Verifies a single query is sent without window_days."""
+        client = mock.Mock()
+        client.get.return_value = {"_embedded": {"customers": []}, "page": {"number": 1, "totalPages": 1}}
+        self.sync(client, {}, {})
+        self.assertEqual(client.get.call_count, 1)
+        self.assertNotIn("query=", client.get.call_args.kwargs["params"])
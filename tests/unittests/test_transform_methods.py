@@ -53,3 +53,36 @@ class TransformMethods(unittest.TestCase):
 
         self.assertEquals(transform.transform_json(mock_input, "conversations", "conversations"),
                           expected_output)
+
+    def test_denest_embedded_threads(self):
+        """Tests threads embedded in conversations are de-nested along with
+        their own embedded nodes."""
+        mock_input = {"conversations": [{"id": 12345,
+                                         "userUpdatedAt": "2023-01-22T12:00:00Z",
+                                         "_links": {"self": {"href": "https://api.helpscout.net/v2/conversations/1"}},
+                                         "_embedded": {"threads": [{"id": 1,
+                                                                    "createdAt": "2023-01-22T11:00:00Z",
+                                                                    "_embedded": {
+                                                                        "attachments": [{"fileName": "a.txt"}]},
+                                                                    "_links": {"createdByUser": {"href": "users/1"}}}]}}
+                                        ]}
+        expected_output = {"conversations": [{"id": 12345,
+                                              "user_updated_at": "2023-01-22T12:00:00Z",
+                                              "updated_at": "2023-01-22T12:00:00Z",
+                                              "embedded_threads": [{"id": 1,
+                                                                    "created_at": "2023-01-22T11:00:00Z",
+                                                                    "attachments": [{"file_name": "a.txt"}]}]}]}
+
+        self.assertEqual(transform.transform_json(mock_input, "conversations", "conversations"),
+                         expected_output)
+
+    def test_convert_cache(self):
+        """Verifies repeated key conversions are served from the cache and
+        counted."""
+        transform.convert.cache_clear()
+        for _ in range(3):
+            self.assertEqual(transform.convert("customerWaitingSince"), "customer_waiting_since")
+        stats = transform.get_convert_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (2, 1, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 2 / 3)
+        self.assertEqual(transform.convert.cache_info().maxsize, transform.CONVERT_CACHE_SIZE)